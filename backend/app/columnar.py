@@ -0,0 +1,134 @@
+"""
+columnar list responses: ?format=columnar answers a list route with
+
+    {"columns": ["id", "name", ...], "rows": [[1, "..."], ...], "total": 123}
+
+instead of one object per row, so a large page does not repeat every key name
+in every row. the route class adds the parameter to every list route and
+turns the items of the usual response into rows; routers that can, build the
+rows straight from their sql cursor with from_rows() when requested() is set
+"""
+import asyncio
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Sequence
+
+from fastapi import Query
+
+from . import fieldsets, responses
+
+FORMATS = ("objects", "columnar")
+
+_requested: ContextVar[bool] = ContextVar("nojoy_columnar", default=False)
+
+
+def requested() -> bool:
+    # whether the current request asked for format=columnar
+    return _requested.get()
+
+
+def from_rows(
+    columns: Sequence[str],
+    rows,
+    total: int,
+    convert: Optional[Dict[str, Callable]] = None,
+) -> dict:
+    """
+    columnar page of sql rows (or any sequences) with the given column names,
+    no dict per row. convert maps a column to a function applied to its values
+    (e.g. decoding json text); ?fields= narrows the columns
+    """
+    fields = fieldsets.requested()
+    keep = [i for i, c in enumerate(columns) if fields is None or c in fields]
+    convert = {columns.index(c): f for c, f in (convert or {}).items() if c in columns}
+    convert = {i: f for i, f in convert.items() if i in keep}
+    if len(keep) == len(columns) and not convert:
+        out = [tuple(row) for row in rows]
+    elif not convert:
+        out = [[row[i] for i in keep] for row in rows]
+    else:
+        out = [[convert[i](row[i]) if i in convert else row[i] for i in keep] for row in rows]
+    return {"columns": [columns[i] for i in keep], "rows": out, "total": total}
+
+
+def from_items(content: dict, model=None) -> dict:
+    """
+    columnar form of a usual list response {items: [...], total, ...}. the
+    columns follow the item model when there is one, the keys of the items
+    (first seen first) otherwise
+    """
+    items = [item for item in content["items"] if isinstance(item, dict)]
+    if model is not None:
+        columns = fieldsets.field_names(model)
+    else:
+        columns = list(dict.fromkeys(key for item in items for key in item))
+    fields = fieldsets.requested()
+    if fields is not None:
+        columns = [c for c in columns if c in fields]
+    ret = {k: v for k, v in content.items() if k != "items"}
+    ret["columns"] = columns
+    ret["rows"] = [[item.get(c) for c in columns] for item in items]
+    return ret
+
+
+def columnar(endpoint, response_model=None):
+    """
+    wrap a list endpoint so it takes a format query parameter. with
+    format=columnar requested() is set while the endpoint runs and the result
+    is answered as columns and rows
+    """
+    model = fieldsets.item_model(response_model)
+    signature = inspect.signature(endpoint)
+    if "format" in signature.parameters:
+        return endpoint
+    parameter = inspect.Parameter(
+        "format",
+        inspect.Parameter.KEYWORD_ONLY,
+        default=Query(
+            "objects",
+            pattern=f"^({'|'.join(FORMATS)})$",
+            description="objects (one object per item) or columnar (columns and rows)",
+        ),
+        annotation=str,
+    )
+
+    def finish(ret):
+        if isinstance(ret, list):
+            # bare list routes: columns and rows, next_cursor stays in the header
+            ret = {"items": ret}
+        if isinstance(ret, responses.Response) or not isinstance(ret, dict):
+            return ret
+        if "rows" not in ret and isinstance(ret.get("items"), list):
+            ret = from_items(ret, model)
+        return responses.FastJSONResponse(ret)
+
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, format: str = "objects", **kwargs):
+            if format != "columnar":
+                return await endpoint(*args, **kwargs)
+            token = _requested.set(True)
+            try:
+                return finish(await endpoint(*args, **kwargs))
+            finally:
+                _requested.reset(token)
+
+        wrapper = async_wrapper
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, format: str = "objects", **kwargs):
+            if format != "columnar":
+                return endpoint(*args, **kwargs)
+            token = _requested.set(True)
+            try:
+                return finish(endpoint(*args, **kwargs))
+            finally:
+                _requested.reset(token)
+
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), parameter]
+    )
+    return wrapper
@@ -1,8 +1,112 @@
 from sqlalchemy.orm.session import Session
 from sqlalchemy import text
+from .instrumentation import record_list_result
+from . import config, cursors, database, fieldsets, metrics, precomputed, responses
 import json
 
 
+def paginate(results: list, skip: int, limit: int):
+    """
+    slice one page out of the filtered and sorted results, the page after the
+    request's ?cursor= when it has one. returns (total, page)
+    """
+    total = len(results)
+    start = cursors.start_of(results, skip)
+    page = results[start : start + limit]
+    cursors.set_next(page[-1] if page and start + limit < total else None)
+    record_list_result(total, len(page))
+    return total, page
+
+
+def detail_payload(read_core, obj_id: int, db: Session) -> bytes:
+    """
+    serialized result of a read_*_core(obj_id, db) detail function. the bytes
+    are kept in the session's database generation, which never changes, so a
+    repeated request skips both the queries and the encoding. the cache holds
+    PAYLOAD_CACHE_SIZE entries and drops the least recently used one first
+    """
+    fields = fieldsets.requested()
+
+    def build():
+        ret = read_core(obj_id, db)
+        return responses.dumps(fieldsets.select(ret, fields) if fields else ret)
+
+    if config.PAYLOAD_CACHE_SIZE <= 0:
+        return build()
+    cache = database.generation_of(db).cache("detail_payloads")
+    key = (read_core.__module__, read_core.__name__, obj_id, fields)
+    data = cache.get(key)
+    metrics.record_cache("detail_payloads", data is not None)
+    if data is not None:
+        # reinserted at the end of the (insertion ordered) dict, eviction starts at the front
+        try:
+            cache[key] = cache.pop(key)
+        except KeyError:
+            # evicted by another request meanwhile
+            pass
+    else:
+        data = build()
+        while len(cache) >= config.PAYLOAD_CACHE_SIZE:
+            # least recently used entry first
+            try:
+                cache.pop(next(iter(cache)), None)
+            except (StopIteration, RuntimeError):
+                break
+        cache[key] = data
+    return data
+
+
+def list_projection(columns: dict, *needed) -> str:
+    """
+    select list of a list route's columns (name -> sql expression), narrowed to
+    the fields the request asked for plus the ones the route itself reads
+    (sort column, filtered columns)
+    """
+    fields = fieldsets.requested()
+    return ", ".join(
+        expr if expr == name else f"{expr} AS {name}"
+        for name, expr in columns.items()
+        if fields is None or name in fields or name in needed
+    )
+
+
+def decode_json(value):
+    # json text column decoded like the routers' json.loads fallbacks: invalid text becomes None
+    if value and isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return None
+    return value
+
+
+def raw_json(value):
+    """
+    json text from sqlite as a response fragment, written out without decoding
+    and encoding it again. only for text sqlite generated (json_object,
+    json_group_array ...) or checked with json_valid_columns; empty stays None
+    """
+    return responses.fragment(value.encode("utf-8")) if value else None
+
+
+def json_valid_columns(fields, alias: str = "") -> str:
+    # select list items telling passthrough_json which json text columns are valid
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f'json_valid({prefix}"{f}") AS "{f}__valid"' for f in fields)
+
+
+def passthrough_json(ret: dict, fields):
+    """
+    replace the json text columns of a row dict by raw json fragments. the row
+    has to carry the json_valid_columns flags of the fields; text that is not
+    valid json becomes None, as the json.loads fallbacks made it
+    """
+    for field in fields:
+        valid = ret.pop(f"{field}__valid", None)
+        if ret.get(field) and isinstance(ret[field], str):
+            ret[field] = raw_json(ret[field]) if valid else None
+
+
 def fetch_quest_rewarding_id(item_id: int, db: Session):
     fetched = db.execute(
         text(
@@ -610,54 +714,84 @@ def fetch_private_farm_producing_id(itemid: int, db: Session):
     return None
 
 
+def _may_obtain_from(sources, kind: str) -> bool:
+    # without the precomputed index every lookup runs
+    return sources is None or kind in sources
+
+
 def fetch_all_obtain_methods(itemid: int, db: Session):
 
+    # a detail request whose fields leave out obtain_method needs none of the lookups
+    if not fieldsets.wants("obtain_method"):
+        return None
+
+    # the precomputed index knows which source tables mention the item at all,
+    # lookups of the other sources would scan their whole table for nothing
+    index = precomputed.index_for(db)
+    sources = index.sources(itemid) if index is not None else None
+
     # fetch obtain from quest
     obtain_method_list = []
-    obtainable_quest_list = fetch_quest_rewarding_id(itemid, db)
+    obtainable_quest_list = None
+    if _may_obtain_from(sources, "quest"):
+        obtainable_quest_list = fetch_quest_rewarding_id(itemid, db)
     if obtainable_quest_list:
         obtain_method_list.append(
             {"from": "quest", "quest_list": obtainable_quest_list}
         )
 
-    obtainable_recipe_list = fetch_recipe_producing_id(itemid, db)
+    obtainable_recipe_list = None
+    if _may_obtain_from(sources, "recipe"):
+        obtainable_recipe_list = fetch_recipe_producing_id(itemid, db)
     if obtainable_recipe_list:
         obtain_method_list.append(
             {"from": "recipe", "recipe_list": obtainable_recipe_list}
         )
 
-    obtainable_npcsale_list = fetch_sellernpc_selling_id(itemid, db)
+    obtainable_npcsale_list = None
+    if _may_obtain_from(sources, "npcsale"):
+        obtainable_npcsale_list = fetch_sellernpc_selling_id(itemid, db)
     if obtainable_npcsale_list:
         obtain_method_list.append(
             {"from": "npcsale", "npcsale_list": obtainable_npcsale_list}
         )
 
-    obt_shipwreck_list = fetch_shipwreck_producing_id(itemid, db)
+    obt_shipwreck_list = None
+    if _may_obtain_from(sources, "shipwreck"):
+        obt_shipwreck_list = fetch_shipwreck_producing_id(itemid, db)
     if obt_shipwreck_list:
         obtain_method_list.append(
             {"from": "shipwreck", "shipwreck_list": obt_shipwreck_list}
         )
 
-    obt_treasurebox_list = fetch_treasurebox_producing_id(itemid, db)
+    obt_treasurebox_list = None
+    if _may_obtain_from(sources, "treasurebox"):
+        obt_treasurebox_list = fetch_treasurebox_producing_id(itemid, db)
     if obt_treasurebox_list:
         obtain_method_list.append(
             {"from": "treasurebox", "treasurebox_list": obt_treasurebox_list}
         )
-    obt_treasuremap_list = fetch_treasuremp_producing_id(itemid, db)
+    obt_treasuremap_list = None
+    if _may_obtain_from(sources, "treasuremap"):
+        obt_treasuremap_list = fetch_treasuremp_producing_id(itemid, db)
     if obt_treasuremap_list:
         obtain_method_list.append(
             {"from": "treasuremap", "treasuremap_list": obt_treasuremap_list}
         )
 
-    obt_field_gatherable_list = fetch_gathering_producing_id(itemid, db)
+    obt_field_gatherable_list = None
+    if _may_obtain_from(sources, "field_gatherable"):
+        obt_field_gatherable_list = fetch_gathering_producing_id(itemid, db)
     if obt_field_gatherable_list:
         obtain_method_list.append(
             {"from": "field_gatherable", "field_list": obt_field_gatherable_list}
         )
 
-    obt_field_resurvey_reward_list = fetch_field_resurvey_reward_producing_id(
-        itemid, db
-    )
+    obt_field_resurvey_reward_list = None
+    if _may_obtain_from(sources, "field_resurvey_reward"):
+        obt_field_resurvey_reward_list = fetch_field_resurvey_reward_producing_id(
+            itemid, db
+        )
     if obt_field_resurvey_reward_list:
         obtain_method_list.append(
             {
@@ -666,48 +800,64 @@ def fetch_all_obtain_methods(itemid: int, db: Session):
             }
         )
 
-    obt_consumable_list = fetch_consumable_producing_id(itemid, db)
+    obt_consumable_list = None
+    if _may_obtain_from(sources, "consumable"):
+        obt_consumable_list = fetch_consumable_producing_id(itemid, db)
     if obt_consumable_list:
         obtain_method_list.append(
             {"from": "consumable", "consumable_list": obt_consumable_list}
         )
 
-    obt_landnpc_drop_list = fetch_field_npc_drop_producing_id(itemid, db)
+    obt_landnpc_drop_list = None
+    if _may_obtain_from(sources, "landnpc_drop"):
+        obt_landnpc_drop_list = fetch_field_npc_drop_producing_id(itemid, db)
     if obt_landnpc_drop_list:
         obtain_method_list.append(
             {"from": "landnpc_drop", "landnpc_list": obt_landnpc_drop_list}
         )
 
-    obt_marinenpc_drop_list = fetch_marine_npc_drop_producing_id(itemid, db)
+    obt_marinenpc_drop_list = None
+    if _may_obtain_from(sources, "marinenpc_drop"):
+        obt_marinenpc_drop_list = fetch_marine_npc_drop_producing_id(itemid, db)
     if obt_marinenpc_drop_list:
         obtain_method_list.append(
             {"from": "marinenpc_drop", "marinenpc_list": obt_marinenpc_drop_list}
         )
 
-    obt_ganador_list = fetch_ganador_producing_id(itemid, db)
+    obt_ganador_list = None
+    if _may_obtain_from(sources, "ganador"):
+        obt_ganador_list = fetch_ganador_producing_id(itemid, db)
     if obt_ganador_list:
         obtain_method_list.append(
             {"from": "ganador", "ganador_list": obt_ganador_list}
         )
 
-    obt_citynpc_gift_list = fetch_citynpc_gift_producing_id(itemid, db)
+    obt_citynpc_gift_list = None
+    if _may_obtain_from(sources, "citynpc_gift"):
+        obt_citynpc_gift_list = fetch_citynpc_gift_producing_id(itemid, db)
     if obt_citynpc_gift_list:
         obtain_method_list.append(
             {"from": "citynpc_gift", "citynpc_list": obt_citynpc_gift_list}
         )
 
-    obt_dungoen_list = fetch_dungeon_producing_id(itemid, db)
+    obt_dungoen_list = None
+    if _may_obtain_from(sources, "dungeon"):
+        obt_dungoen_list = fetch_dungeon_producing_id(itemid, db)
     if obt_dungoen_list:
         obtain_method_list.append(
             {"from": "dungeon", "dungeon_list": obt_dungoen_list}
         )
-    obt_sea_list = fetch_sea_producing_id(itemid, db)
+    obt_sea_list = None
+    if _may_obtain_from(sources, "sea"):
+        obt_sea_list = fetch_sea_producing_id(itemid, db)
     if obt_sea_list:
         obtain_method_list.append(
             {"from": "sea", "sea_list": obt_sea_list}
         )
 
-    obt_privatefarm_list = fetch_private_farm_producing_id(itemid, db)
+    obt_privatefarm_list = None
+    if _may_obtain_from(sources, "private_farm"):
+        obt_privatefarm_list = fetch_private_farm_producing_id(itemid, db)
     if obt_privatefarm_list:
         obtain_method_list.append(
             {"from": "private_farm", "privatefarm_list": obt_privatefarm_list}
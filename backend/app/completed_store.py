@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completed (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+
+class SQLiteCompletedStore:
+    """
+    completed ids shared by every worker process through a sqlite file in WAL
+    mode. each write bumps a version counter in the same transaction; readers
+    keep the whole set in memory and reload it only when PRAGMA data_version
+    says another connection committed since, or after a write of their own
+    """
+
+    def __init__(self, path: str, import_file: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=10, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._cache: Dict[int, str] = {}
+        # data_version the cache was read at; it does not move on this connection's own writes
+        self._data_version = None
+        self._stale = True
+        if import_file:
+            self._import_json(import_file)
+
+    def _import_json(self, path: str):
+        # first start in this mode: take over what the single process mode saved
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                items = json.load(f).get("completed_items", [])
+            except (json.JSONDecodeError, AttributeError):
+                return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT COUNT(*) FROM completed").fetchone()[0]:
+                    self._conn.execute("ROLLBACK")
+                    return
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO completed (id, name) VALUES (?, ?)",
+                    [(item["id"], item["name"]) for item in items],
+                )
+                self._bump()
+                self._conn.execute("COMMIT")
+                self._stale = True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info("imported %s completed items from %s", len(items), path)
+
+    def _bump(self):
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def version(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()[0]
+
+    def snapshot(self) -> Dict[int, str]:
+        with self._lock:
+            # answered from the connection's state, no table is read
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._stale or data_version != self._data_version:
+                self._cache = dict(self._conn.execute("SELECT id, name FROM completed").fetchall())
+                self._data_version = data_version
+                self._stale = False
+            return self._cache
+
+    def contains(self, _id: int) -> bool:
+        return _id in self.snapshot()
+
+    def _write(self, sql: str, params) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = self._conn.execute(sql, params).rowcount > 0
+                if changed:
+                    self._bump()
+                self._conn.execute("COMMIT")
+                self._stale = self._stale or changed
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def set(self, _id: int, name: str) -> bool:
+        return self._write(
+            "INSERT INTO completed (id, name) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name WHERE name != excluded.name",
+            (_id, name),
+        )
+
+    def remove(self, _id: int) -> bool:
+        return self._write("DELETE FROM completed WHERE id = ?", (_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,233 @@
+"""
+response compression: gzip (brotli when the brotli package is installed) for
+the api, and precompressed siblings for the built frontend assets.
+
+    cd backend
+    # after building the frontend into ../dist
+    python -m app.compression ../dist/assets
+
+writes a .br (when brotli is installed) and a .gz next to every compressible
+file, which PrecompressedStaticFiles serves to clients that accept them
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import re
+import sys
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+# vite names built assets like index-C4J6EcIB.js, the hash changes with the content
+_HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def accepted_encodings(accept_encoding: str) -> list:
+    """
+    encodings from an Accept-Encoding header we can send, best first
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted[name.strip().lower()] = q
+    ret = [e for e in ("br", "gzip") if e in accepted or "*" in accepted]
+    # equal q prefers brotli, it is smaller
+    return sorted(ret, key=lambda e: -accepted.get(e, accepted.get("*", 0)))
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=4)
+            self._flush = self._c.flush
+            self._finish = self._c.finish
+            self._process = self._c.process
+        else:
+            self._c = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush = lambda: self._c.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._c.flush
+            self._process = self._c.compress
+
+    def chunk(self, data: bytes, last: bool) -> bytes:
+        # a streamed chunk is flushed, so the client gets it without waiting for more
+        out = self._process(data)
+        return out + (self._finish() if last else self._flush())
+
+
+class CompressionMiddleware:
+    """
+    compress responses of at least minimum_size bytes with the best encoding
+    the client accepts. responses that are already encoded (precompressed
+    assets) or not text are passed as they are; streamed responses are
+    compressed chunk by chunk
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is None and "br" in encodings:
+            encodings.remove("br")
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = encodings[0]
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def compress_send(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if (
+                    "content-encoding" in headers
+                    or not _compressible(headers.get("content-type", ""))
+                    or (not more and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                data = compressor.chunk(body, not more)
+                if more:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+                return
+            await send({"type": "http.response.body", "body": compressor.chunk(body, not more), "more_body": more})
+
+        await self.app(scope, receive, compress_send)
+        if start is not None and compressor is None and not passthrough:
+            # no body message at all
+            await send(start)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles serving the .br / .gz sibling of a file when the client accepts
+    it, with long lived caching for hashed asset names
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        response = None
+        for encoding in accepted_encodings(request_headers.get("accept-encoding", "")):
+            sibling = f"{full_path}{SUFFIXES[encoding]}"
+            try:
+                sibling_stat = os.stat(sibling)
+            except OSError:
+                continue
+            response = FileResponse(
+                sibling,
+                status_code=status_code,
+                stat_result=sibling_stat,
+                media_type=mimetypes.guess_type(str(full_path))[0] or "text/plain",
+            )
+            response.headers["Content-Encoding"] = encoding
+            break
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["Vary"] = "Accept-Encoding"
+        if _HASHED_NAME.search(os.path.basename(str(full_path))):
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def precompress(directory: str, minimum_size: int = 256) -> list:
+    """
+    write .gz and .br siblings of the compressible files under directory.
+    siblings not smaller than the file are not kept. returns the written paths
+    """
+    written = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(tuple(SUFFIXES.values())):
+                continue
+            path = os.path.join(root, name)
+            content_type = mimetypes.guess_type(path)[0] or ""
+            if not _compressible(content_type) or os.path.getsize(path) < minimum_size:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                target = path + suffix
+                if len(compressed) >= len(data):
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                with open(target, "wb") as f:
+                    f.write(compressed)
+                written.append(target)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="write precompressed siblings of built frontend files")
+    parser.add_argument("directory", nargs="?", default="../dist/assets")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        sys.exit(f"{args.directory} is not a directory")
+    if brotli is None:
+        print("brotli not installed, writing .gz only", file=sys.stderr)
+    for path in precompress(args.directory):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
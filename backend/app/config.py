@@ -0,0 +1,55 @@
+import os
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# add Server-Timing header with sql statement count / time to every response
+SERVER_TIMING_ENABLED = _env_flag("NOJOY_SERVER_TIMING", True)
+
+# log per-request sql stats through the 'app.instrumentation' logger
+SQL_STATS_LOG_ENABLED = _env_flag("NOJOY_SQL_STATS_LOG", False)
+
+# aggregate rows fetched / filtered / returned per list endpoint for /api/diagnostics/efficiency
+EFFICIENCY_TRACKING_ENABLED = _env_flag("NOJOY_EFFICIENCY_TRACKING", True)
+
+# per-route latency / size / db statement metrics exposed at /metrics
+METRICS_ENABLED = _env_flag("NOJOY_METRICS", True)
+
+# allow profiling single requests with 'X-Profile: 1'. off by default, the report
+# exposes file paths and source structure
+PROFILING_ENABLED = _env_flag("NOJOY_PROFILING", False)
+
+# path of the sqlite database to serve instead of the bundled dhoDatabase.sqlite3,
+# e.g. a file written by bench/synthetic_db.py
+DATABASE_PATH = os.environ.get("NOJOY_DATABASE")
+
+# sqlite file holding the completed ids instead of completed.json, shared by every
+# worker process, e.g. NOJOY_COMPLETED_DB=completed.sqlite3 uvicorn app.main:app --workers 4
+COMPLETED_DB_PATH = os.environ.get("NOJOY_COMPLETED_DB")
+
+# map a precomputed allData / item source index (app/precomputed.py) built next to
+# the database, shared by every worker process, and keep the sort permutations of
+# app/sortindex.py in snapshots next to it
+PRECOMPUTED_INDEX_ENABLED = _env_flag("NOJOY_PRECOMPUTED_INDEX", True)
+
+# /api/admin endpoints (database reload). off by default, they swap what the
+# server serves
+ADMIN_ENABLED = _env_flag("NOJOY_ADMIN", False)
+
+# seconds between checks of the database file for a replaced copy, which is then
+# loaded as a new generation without a restart (app/reloader.py). 0 turns it off
+DB_WATCH_INTERVAL = float(os.environ.get("NOJOY_DB_WATCH_INTERVAL", "0"))
+
+# detail payloads kept serialized per database generation, so repeated requests
+# for the same object skip building and encoding it. 0 turns the cache off
+PAYLOAD_CACHE_SIZE = int(os.environ.get("NOJOY_PAYLOAD_CACHE_SIZE", "4096"))
+
+# gzip (brotli when the brotli package is installed) responses of at least
+# NOJOY_COMPRESSION_MIN_SIZE bytes
+COMPRESSION_ENABLED = _env_flag("NOJOY_COMPRESSION", True)
+COMPRESSION_MIN_SIZE = int(os.environ.get("NOJOY_COMPRESSION_MIN_SIZE", "1024"))
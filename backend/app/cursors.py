@@ -0,0 +1,244 @@
+"""
+keyset pagination: list routes take ?cursor=, an opaque token of the sort
+value and id of the last row of the previous page, and answer with
+next_cursor for the page after theirs (null on the last page). a page by
+cursor starts right after that row instead of skipping skip rows, so deep
+pages and infinite scrolling cost what the first page costs. skip / limit
+keep working, limit also sizes cursor pages.
+
+routes that page in sql put keyset_where() into their query; the others
+page with common.paginate, which reads the cursor from here
+"""
+import asyncio
+import base64
+import functools
+import inspect
+import json
+from contextvars import ContextVar
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, Query
+from pydantic import create_model
+
+from . import fieldsets, responses
+
+_state: ContextVar[Optional[dict]] = ContextVar("nojoy_cursor", default=None)
+
+# bare list responses (no room for next_cursor) carry it in this header
+HEADER = "X-Next-Cursor"
+
+
+def encode(value: Any, row_id: Any) -> str:
+    data = json.dumps([value, row_id], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode(token: str) -> Tuple[Any, Any]:
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, row_id
+
+
+def after() -> Optional[Tuple[Any, Any]]:
+    # (sort value, id) of the row the requested page starts after, None without a cursor
+    state = _state.get()
+    return state["after"] if state else None
+
+
+def sort_column(default: str = "id") -> str:
+    state = _state.get()
+    return (state and state["sort_by"]) or default
+
+
+def row_value(row, key):
+    if isinstance(row, dict):
+        return row.get(key)
+    mapping = getattr(row, "_mapping", None)
+    if mapping is not None:
+        return mapping.get(key)
+    return getattr(row, key, None)
+
+
+def set_next(row):
+    """
+    the last row of the page when rows follow it, None on the last page
+    """
+    state = _state.get()
+    if state is not None:
+        state["next"] = None if row is None else encode(row_value(row, sort_column()), row_value(row, "id"))
+
+
+def start_of(rows: list, skip: int) -> int:
+    """
+    index of the first row of the requested page in the sorted rows: right
+    after the cursor's row, or skip without a cursor. the row is found by id
+    (and its sort value, when ids repeat)
+    """
+    cursor = after()
+    if cursor is None:
+        return skip
+    value, row_id = cursor
+    key = sort_column()
+    fallback = None
+    for i, row in enumerate(rows):
+        if row_value(row, "id") == row_id:
+            if row_value(row, key) == value:
+                return i + 1
+            if fallback is None:
+                fallback = i + 1
+    if fallback is None:
+        raise HTTPException(status_code=400, detail="Cursor row not found")
+    return fallback
+
+
+def keyset_where(column: str, descending: bool, id_column: str = "id") -> Tuple[str, dict]:
+    """
+    sql condition for the rows after the cursor in ORDER BY column asc|desc,
+    id asc order, and its bind parameters. sqlite puts NULL first ascending
+    and last descending
+    """
+    value, row_id = after()
+    params = {"cursor_id": row_id}
+    tie = f"{id_column} > :cursor_id"
+    if column == id_column:
+        return (f"{id_column} < :cursor_id" if descending else tie), params
+    params["cursor_value"] = value
+    if value is None:
+        if descending:
+            return f"({column} IS NULL AND {tie})", params
+        return f"(({column} IS NULL AND {tie}) OR {column} IS NOT NULL)", params
+    if descending:
+        return (
+            f"({column} < :cursor_value OR {column} IS NULL OR ({column} = :cursor_value AND {tie}))",
+            params,
+        )
+    return f"({column} > :cursor_value OR ({column} = :cursor_value AND {tie}))", params
+
+
+def where_after(query: str, has_where: bool, params: dict, column: str, descending: bool) -> str:
+    # query (SELECT ... [WHERE ...]) narrowed to the rows after the cursor, when there is one
+    if after() is None:
+        return query
+    clause, keyset_params = keyset_where(column, descending)
+    params.update(keyset_params)
+    return query + (" AND " if has_where else " WHERE ") + clause
+
+
+def trim(rows: list, limit: int) -> list:
+    """
+    page of rows fetched with LIMIT limit + 1, the extra row only tells that a
+    page follows
+    """
+    page = rows[:limit]
+    set_next(page[-1] if len(rows) > limit else None)
+    return page
+
+
+def response_model(model):
+    """
+    list response model with a next_cursor field, so validating the response
+    keeps it
+    """
+    fields = fieldsets.field_names(model) if isinstance(model, type) else []
+    if "items" not in fields or "next_cursor" in fields:
+        return model
+    return create_model(model.__name__, __base__=model, next_cursor=(Optional[str], None))
+
+
+def keyset(endpoint):
+    """
+    wrap a list endpoint so its response objects carry next_cursor. this is
+    the innermost wrapper, so next_cursor is in place before format / fields
+    shape the result; the cursor state itself is set up by paged() around
+    everything
+    """
+    if "cursor" in inspect.signature(endpoint).parameters:
+        return endpoint
+
+    def finish(ret):
+        state = _state.get()
+        if state is None:
+            return ret
+        state["bare"] = isinstance(ret, list)
+        if isinstance(ret, dict) and ("items" in ret or "rows" in ret):
+            ret["next_cursor"] = state["next"]
+        return ret
+
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            return finish(await endpoint(*args, **kwargs))
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        return finish(endpoint(*args, **kwargs))
+
+    return wrapper
+
+
+def paged(endpoint):
+    """
+    wrap a list endpoint, outermost, so it takes a cursor query parameter.
+    the cursor state lives for the whole call; a bare list result (which has
+    no room for next_cursor, whether ?fields= cut it or not) answers with it
+    in the HEADER
+    """
+    signature = inspect.signature(endpoint)
+    if "cursor" in signature.parameters:
+        return endpoint
+    parameter = inspect.Parameter(
+        "cursor",
+        inspect.Parameter.KEYWORD_ONLY,
+        default=Query(None, description="next_cursor of the previous page, instead of skip"),
+        annotation=Optional[str],
+    )
+
+    def start(cursor, kwargs):
+        return _state.set(
+            {
+                "after": decode(cursor) if cursor else None,
+                "sort_by": kwargs.get("sort_by"),
+                "next": None,
+                "bare": False,
+            }
+        )
+
+    def finish(ret):
+        state = _state.get()
+        if not (state["bare"] and state["next"]):
+            return ret
+        if isinstance(ret, responses.Response):
+            ret.headers[HEADER] = state["next"]
+            return ret
+        return responses.FastJSONResponse(ret, headers={HEADER: state["next"]})
+
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, cursor: Optional[str] = None, **kwargs):
+            token = start(cursor, kwargs)
+            try:
+                return finish(await endpoint(*args, **kwargs))
+            finally:
+                _state.reset(token)
+
+        wrapper = async_wrapper
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, cursor: Optional[str] = None, **kwargs):
+            token = start(cursor, kwargs)
+            try:
+                return finish(endpoint(*args, **kwargs))
+            finally:
+                _state.reset(token)
+
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), parameter]
+    )
+    return wrapper
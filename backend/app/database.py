@@ -1,36 +1,183 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import sys, os
+import threading
+from app import config, delta, instrumentation
+
+logger = logging.getLogger(__name__)
 
 
 # Determine database path
-if getattr(sys, "frozen", False):
+if config.DATABASE_PATH:
+    DATABASE_PATH = os.path.abspath(config.DATABASE_PATH)
+elif getattr(sys, "frozen", False):
     # Running as PyInstaller exe
     base_path = os.path.dirname(sys.executable)
-    SQLALCHEMY_DATABASE_URL = (
-        f"sqlite:///{os.path.join(base_path, 'dhoDatabase.sqlite3')}"
-    )
+    DATABASE_PATH = os.path.join(base_path, "dhoDatabase.sqlite3")
 else:
     # Development
     base_path = os.path.dirname(__file__)
-    SQLALCHEMY_DATABASE_URL = (
-        f"sqlite:///{os.path.join(base_path, '../../dhoDatabase.sqlite3')}"
-    )
+    DATABASE_PATH = os.path.join(base_path, "../../dhoDatabase.sqlite3")
 
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 # SQLALCHEMY_DATABASE_URL = "sqlite:///../dhoDatabase.sqlite3"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def create_db_engine(path: str):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={
+            "check_same_thread": False,
+            "factory": instrumentation.CountingConnection,
+        },
+    )
+    instrumentation.install(engine)
+    return engine
+
+
+class TableCache(dict):
+    """
+    values derived from some tables of a database generation. a reload keeps
+    the cache when none of its tables changed; tables=None marks values that
+    may read any table, dropped on every change
+    """
+
+    def __init__(self, tables=None):
+        super().__init__()
+        self.tables = frozenset(tables) if tables is not None else None
+
+    def depends_on(self, changed) -> bool:
+        return self.tables is None or bool(self.tables & set(changed))
+
+
+class Generation:
+    """
+    one opened database file with everything derived from it (engine, session
+    factory, precomputed index). requests hold the generation they started on
+    until they finish, so swapping in a new database never changes the data
+    under a running request; a retired generation is closed by its last user
+    """
+
+    def __init__(self, number: int, path: str):
+        self.number = number
+        self.path = path
+        self.engine = create_db_engine(path)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # app.precomputed.PrecomputedIndex, set once it is mapped
+        self.index = None
+        # name -> TableCache, see cache()
+        self.caches = {}
+        # tables that differ from the generation this one replaced
+        self.changed_tables = None
+        # delta.table_hashes of the file as it was when opened, see hash_tables()
+        self.table_hashes = None
+        self._lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+
+    @property
+    def retired(self) -> bool:
+        return self._retired
+
+    def cache(self, name: str, tables=None) -> TableCache:
+        with self._lock:
+            ret = self.caches.get(name)
+            if ret is None:
+                ret = self.caches[name] = TableCache(tables)
+            return ret
+
+    def hash_tables(self) -> dict:
+        """
+        hash the tables of the file now and keep the result. taken when the
+        generation opens: the path may be overwritten later (a reload of the
+        same file), and hashing then would describe the new data
+        """
+        self.table_hashes = delta.table_hashes(self.path)
+        return self.table_hashes
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self._close()
+
+    def retire(self):
+        with self._lock:
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self._close()
+
+    def _close(self):
+        logger.info("closing database generation %s (%s)", self.number, self.path)
+        self.engine.dispose()
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def info(self) -> dict:
+        return {
+            "generation": self.number,
+            "path": self.path,
+            "index": self.index.path if self.index is not None else None,
+            "in_flight": self._users,
+            "changed_tables": self.changed_tables,
+            "caches": {name: len(cache) for name, cache in self.caches.items()},
+        }
+
+
+current = Generation(1, DATABASE_PATH)
+# the current generation's engine and session factory, kept for code that is not
+# request scoped (startup, scripts, benchmarks)
+engine = current.engine
+SessionLocal = current.SessionLocal
+_swap_lock = threading.Lock()
 
 Base = declarative_base()
 
 
+def acquire_current() -> Generation:
+    # read and pin under the swap lock, so a generation is never acquired after it retired
+    with _swap_lock:
+        generation = current
+        generation.acquire()
+    return generation
+
+
+def swap(new: Generation) -> Generation:
+    """
+    make new the generation later requests use and retire the old one, which
+    closes as soon as the requests still running on it are done
+    """
+    global current, engine, SessionLocal
+    with _swap_lock:
+        old = current
+        current = new
+        engine = new.engine
+        SessionLocal = new.SessionLocal
+    old.retire()
+    logger.info("database generation %s -> %s (%s)", old.number, new.number, new.path)
+    return old
+
+
+def generation_of(db) -> Generation:
+    # generation a session reads from; sessions not made by get_db use the current one
+    return db.info.get("generation") or current
+
+
 def get_db():
-    db = SessionLocal()
+    generation = acquire_current()
+    db = generation.SessionLocal()
+    db.info["generation"] = generation
     try:
         yield db
     finally:
         db.close()
+        generation.release()
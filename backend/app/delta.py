@@ -0,0 +1,244 @@
+"""
+per-table content hashes of a database file, and compact deltas between two
+releases of it.
+
+a release usually changes a few tables. the hashes tell which ones, so the
+server keeps what it derived from the others (app/reloader.py), and a delta
+carries only the rows that changed:
+
+    python -m app.delta diff old.sqlite3 new.sqlite3 --out release.delta.json
+    python -m app.delta apply old.sqlite3 release.delta.json --out new.sqlite3
+"""
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def _tables(conn) -> Dict[str, str]:
+    return dict(
+        conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+    )
+
+
+def _row_digest(row) -> bytes:
+    return hashlib.blake2b(repr(tuple(row)).encode("utf-8"), digest_size=8).digest()
+
+
+def _rows(conn, table: str):
+    return conn.execute(f'SELECT rowid, * FROM "{table}" ORDER BY rowid')
+
+
+def _table_hash(conn, table: str, sql: str) -> str:
+    digest = hashlib.blake2b(sql.encode("utf-8"), digest_size=8)
+    for row in _rows(conn, table):
+        digest.update(_row_digest(row))
+    return digest.hexdigest()
+
+
+def _connect(path: str):
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def table_hashes(db_path: str) -> Dict[str, str]:
+    """
+    content hash of every table of db_path, schema included. reading every row
+    of a large file on each launch would cost more than what the hashes save,
+    so they are remembered next to the database together with the size and
+    mtime they were computed for, and only recomputed when those change
+    """
+    stat = os.stat(db_path)
+    memo_path = f"{db_path}.tablehashes"
+    try:
+        with open(memo_path, "r", encoding="utf-8") as f:
+            memo = json.load(f)
+        if memo["size"] == stat.st_size and memo["mtime_ns"] == stat.st_mtime_ns:
+            return memo["tables"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    conn = _connect(db_path)
+    try:
+        ret = {table: _table_hash(conn, table, sql) for table, sql in _tables(conn).items()}
+    finally:
+        conn.close()
+    try:
+        with open(memo_path, "w", encoding="utf-8") as f:
+            json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "tables": ret}, f)
+    except OSError as e:
+        logger.debug("could not write %s: %s", memo_path, e)
+    return ret
+
+
+def changed_tables(old: Dict[str, str], new: Dict[str, str]) -> set:
+    # tables added, removed or changed between two table_hashes results
+    return {table for table in set(old) | set(new) if old.get(table) != new.get(table)}
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return {"$blob": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        return base64.b64decode(value["$blob"])
+    return value
+
+
+def _indexes(conn, table: str) -> list:
+    return [
+        row[0]
+        for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,),
+        )
+    ]
+
+
+def diff(old_path: str, new_path: str) -> dict:
+    """
+    delta turning old_path into new_path. a table whose schema is unchanged
+    lists the rows (by rowid) that were written or deleted; a new table or one
+    whose schema changed is carried whole
+    """
+    old_hashes = table_hashes(old_path)
+    new_hashes = table_hashes(new_path)
+    old_conn = _connect(old_path)
+    new_conn = _connect(new_path)
+    try:
+        old_schema = _tables(old_conn)
+        new_schema = _tables(new_conn)
+        tables = {}
+        for table in sorted(changed_tables(old_hashes, new_hashes)):
+            if table not in new_schema:
+                tables[table] = {"drop": True}
+                continue
+            if old_schema.get(table) != new_schema[table]:
+                tables[table] = {
+                    "schema": new_schema[table],
+                    "indexes": _indexes(new_conn, table),
+                    "rows": [[_encode(v) for v in row] for row in _rows(new_conn, table)],
+                }
+                continue
+            old_rows = {row[0]: _row_digest(row) for row in _rows(old_conn, table)}
+            rows = []
+            for row in _rows(new_conn, table):
+                if old_rows.pop(row[0], None) != _row_digest(row):
+                    rows.append([_encode(v) for v in row])
+            tables[table] = {"rows": rows, "deleted": sorted(old_rows)}
+    finally:
+        old_conn.close()
+        new_conn.close()
+    return {
+        "version": FORMAT_VERSION,
+        "from": old_hashes,
+        "to": new_hashes,
+        "tables": tables,
+    }
+
+
+def apply(db_path: str, delta: dict, out_path: str):
+    """
+    write db_path with delta applied to out_path. db_path has to be the file
+    the delta was made from, and the result is checked against the hashes of
+    the file it was made for
+    """
+    if delta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"not a version {FORMAT_VERSION} delta")
+    if table_hashes(db_path) != delta["from"]:
+        raise ValueError(f"{db_path} is not the database the delta was made from")
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    shutil.copyfile(db_path, tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        with conn:
+            for table, change in delta["tables"].items():
+                if change.get("drop") or "schema" in change:
+                    conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+                if change.get("drop"):
+                    continue
+                if "schema" in change:
+                    conn.execute(change["schema"])
+                    for sql in change["indexes"]:
+                        conn.execute(sql)
+                conn.executemany(
+                    f'DELETE FROM "{table}" WHERE rowid = ?',
+                    [(rowid,) for rowid in change.get("deleted", ())],
+                )
+                rows = change["rows"]
+                if rows:
+                    columns = [c[1] for c in conn.execute(f'PRAGMA table_info("{table}")')]
+                    names = ", ".join(["rowid"] + [f'"{c}"' for c in columns])
+                    marks = ", ".join("?" * (len(columns) + 1))
+                    conn.executemany(
+                        f'INSERT OR REPLACE INTO "{table}" ({names}) VALUES ({marks})',
+                        ([_decode(v) for v in row] for row in rows),
+                    )
+    finally:
+        conn.close()
+    if table_hashes(tmp_path) != delta["to"]:
+        for path in (tmp_path, f"{tmp_path}.tablehashes"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise ValueError("applied delta does not match the database it was made for")
+    os.replace(tmp_path, out_path)
+    if os.path.exists(f"{tmp_path}.tablehashes"):
+        os.replace(f"{tmp_path}.tablehashes", f"{out_path}.tablehashes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="per-table database deltas")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("hashes", help="print the table hashes of a database")
+    p.add_argument("db")
+    p = commands.add_parser("diff", help="write the delta between two databases")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--out", default="release.delta.json")
+    p = commands.add_parser("apply", help="apply a delta to the database it was made from")
+    p.add_argument("db")
+    p.add_argument("delta")
+    p.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "hashes":
+        json.dump(table_hashes(args.db), sys.stdout, indent=1)
+        print()
+    elif args.command == "diff":
+        delta = diff(args.old, args.new)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(delta, f, ensure_ascii=False)
+        for table, change in delta["tables"].items():
+            if change.get("drop"):
+                summary = "dropped"
+            elif "schema" in change:
+                summary = f"replaced, {len(change['rows'])} rows"
+            else:
+                summary = f"{len(change['rows'])} written, {len(change['deleted'])} deleted"
+            print(f"{table}: {summary}")
+        print(f"{len(delta['tables'])} of {len(delta['to'])} tables changed, wrote {args.out}")
+    else:
+        with open(args.delta, "r", encoding="utf-8") as f:
+            delta = json.load(f)
+        try:
+            apply(args.db, delta, args.out)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
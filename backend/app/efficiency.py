@@ -0,0 +1,114 @@
+import threading
+from urllib.parse import parse_qsl
+
+# query params that do not change which rows match
+_NON_FILTER_PARAMS = {
+    "skip",
+    "limit",
+    "sort_by",
+    "sort_order",
+    "profile",
+    "profile_format",
+    "fields",
+    "cursor",
+    "format",
+    "facet_counts",
+}
+
+
+def request_signature(scope) -> str:
+    """
+    route path template plus the names of the filter params given, e.g.
+    '/api/ships/?name_search&purpose_search'
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    query_string = scope.get("query_string", b"").decode("latin-1")
+    names = sorted(
+        {
+            name
+            for name, value in parse_qsl(query_string, keep_blank_values=False)
+            if name not in _NON_FILTER_PARAMS
+        }
+    )
+    if names:
+        return f"{path}?{'&'.join(names)}"
+    return path
+
+
+class EfficiencyReport:
+    """
+    rows fetched from sqlite vs rows left after python filtering vs rows returned,
+    aggregated per request signature
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, scope, stats):
+        signature = request_signature(scope)
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                entry = self._entries[signature] = {
+                    "signature": signature,
+                    "requests": 0,
+                    "rows_fetched": 0,
+                    "rows_filtered": 0,
+                    "rows_returned": 0,
+                    "sql_time": 0.0,
+                }
+            entry["requests"] += 1
+            entry["rows_fetched"] += stats.rows
+            entry["rows_filtered"] += stats.list_filtered or 0
+            entry["rows_returned"] += stats.list_returned
+            entry["sql_time"] += stats.sql_time
+
+    def reset(self):
+        with self._lock:
+            self._entries = {}
+
+    def ranking(self, limit: int = None):
+        """
+        entries sorted by amplification (rows fetched per row returned), worst first
+        """
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+
+        ret = []
+        for entry in entries:
+            requests = entry["requests"]
+            returned = max(entry["rows_returned"], 1)
+            ret.append(
+                {
+                    "signature": entry["signature"],
+                    "requests": requests,
+                    "avg_rows_fetched": entry["rows_fetched"] / requests,
+                    "avg_rows_filtered": entry["rows_filtered"] / requests,
+                    "avg_rows_returned": entry["rows_returned"] / requests,
+                    "amplification": entry["rows_fetched"] / returned,
+                    "filter_amplification": entry["rows_fetched"]
+                    / max(entry["rows_filtered"], 1),
+                    "avg_sql_ms": round(entry["sql_time"] * 1000 / requests, 3),
+                }
+            )
+        ret.sort(key=lambda x: x["amplification"], reverse=True)
+        if limit is not None:
+            ret = ret[:limit]
+        return ret
+
+    def format_text(self, limit: int = None) -> str:
+        lines = [
+            f"{'amplif':>8} {'fetched':>9} {'filtered':>9} {'returned':>9} {'reqs':>6}  signature"
+        ]
+        for row in self.ranking(limit):
+            lines.append(
+                f"{row['amplification']:>8.1f} {row['avg_rows_fetched']:>9.1f} "
+                f"{row['avg_rows_filtered']:>9.1f} {row['avg_rows_returned']:>9.1f} "
+                f"{row['requests']:>6}  {row['signature']}"
+            )
+        return "\n".join(lines)
+
+
+report = EfficiencyReport()
@@ -0,0 +1,170 @@
+"""
+bitmaps of the categorical list filters of app/filters.py: per table and
+filter parameter, for every value the rows that have it, as a python int
+with bit i set for the row at position i (app/sortindex.py numbering). they
+are built per database generation, at startup and before a reload swaps the
+new file in, and kept over reloads that leave the table alone.
+
+a filter is then OR-ing the bitmaps of the requested values and AND-ing
+those of the parameters, instead of testing every row on every request; the
+mask goes straight to sortindex.order() (or keep()) with the route's rows.
+list routes with ?facet_counts=true also answer with counts(), the matches
+per value under the current filters, from the same bitmaps
+"""
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import database, filters
+from .cursors import row_value
+from .sortindex import row_positions
+
+logger = logging.getLogger(__name__)
+
+# tables whose list routes filter through the bitmaps, built ahead by warm()
+TABLES = ("ship", "equipment", "tradegoods", "treasuremap", "field", "job")
+
+
+def _cache(db: Session, table: str):
+    return database.generation_of(db).cache(f"facets:{table}", tables={table})
+
+
+def bitmaps(db: Session, table: str, param: str) -> Dict:
+    """
+    value -> bitmap of the rows with that value for a filter parameter of
+    table. values are the stored ones (the elements, for elements_ci), NULL
+    has none
+    """
+    cache = _cache(db, table)
+    ret = cache.get(param)
+    if ret is None:
+        expr, match = filters.FILTERS[table][param]
+        positions = row_positions(db, table)
+        size = (len(positions) + 7) // 8
+        bits = {}
+        for row_id, value in db.execute(text(f'SELECT id, {expr} FROM "{table}"')):
+            if value is None:
+                continue
+            if match == "elements_ci":
+                keys = {e.strip() for e in str(value).split(",") if e.strip()}
+            else:
+                keys = (value,)
+            position = positions[row_id]
+            for key in keys:
+                if key not in bits:
+                    bits[key] = bytearray(size)
+                bits[key][position >> 3] |= 1 << (position & 7)
+        ret = cache[param] = {key: int.from_bytes(b, "little") for key, b in bits.items()}
+    return ret
+
+
+def _matches(key, match: str, terms) -> bool:
+    if match == "in":
+        return key in terms
+    if match == "contains_ci":
+        return terms[0] in str(key).lower()
+    # in_ci, eq_ci, elements_ci
+    return str(key).lower() in terms
+
+
+def param_mask(db: Session, table: str, param: str, value: Optional[str]) -> Optional[int]:
+    # rows one filter parameter keeps, None when it is not set
+    if not value:
+        return None
+    match = filters.FILTERS[table][param][1]
+    terms = filters.terms(value, match)
+    if not terms:
+        return None
+    ret = 0
+    for key, bitmap in bitmaps(db, table, param).items():
+        if _matches(key, match, terms):
+            ret |= bitmap
+    return ret
+
+
+def match(db: Session, table: str, values: Dict[str, Optional[str]]) -> Optional[int]:
+    """
+    bitmap of the rows every filter parameter set in values keeps (any of a
+    parameter's values), None when none is set
+    """
+    ret = None
+    for param in filters.params_of(table):
+        mask = param_mask(db, table, param, values.get(param))
+        if mask is not None:
+            ret = mask if ret is None else ret & mask
+    return ret
+
+
+def mask_of(db: Session, table: str, rows: list) -> int:
+    # bitmap of the rows (anything with an id) of table
+    positions = row_positions(db, table)
+    bits = bytearray((len(positions) + 7) // 8)
+    for row in rows:
+        position = positions.get(row_value(row, "id"))
+        if position is not None:
+            bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def counts(
+    db: Session, table: str, values: Dict[str, Optional[str]], rows: Optional[list] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    facet counts: for every filter parameter of table, value -> number of
+    rows with that value among rows (the route's rows before the bitmap
+    filters; default all of them) that the other parameters set in values
+    keep. a parameter's own selection is left out, so its counts tell what
+    picking another value of it gives
+    """
+    scope = None if rows is None else mask_of(db, table, rows)
+    masks = {param: param_mask(db, table, param, values.get(param)) for param in filters.params_of(table)}
+    ret = {}
+    for param in masks:
+        within = scope
+        for other, mask in masks.items():
+            if other != param and mask is not None:
+                within = mask if within is None else within & mask
+        ret[param] = {
+            str(key): (bitmap if within is None else bitmap & within).bit_count()
+            for key, bitmap in sorted(bitmaps(db, table, param).items(), key=lambda item: str(item[0]))
+        }
+    return ret
+
+
+def keep(rows: list, db: Session, table: str, mask: Optional[int]) -> list:
+    """
+    the rows (anything with an id) whose bit is set in mask, all of them for
+    mask None
+    """
+    if mask is None:
+        return rows
+    positions = row_positions(db, table)
+    flags = format(mask, "b")[::-1]
+    ret = []
+    for row in rows:
+        position = positions.get(row_value(row, "id"))
+        if position is not None and position < len(flags) and flags[position] == "1":
+            ret.append(row)
+    return ret
+
+
+def warm(generation: database.Generation):
+    """
+    build the bitmaps of TABLES for a generation; the ones a reload carried
+    over are there already. a table the file lacks is logged and skipped
+    """
+    db = generation.SessionLocal()
+    db.info["generation"] = generation
+    try:
+        for table in TABLES:
+            try:
+                for param in filters.params_of(table):
+                    bitmaps(db, table, param)
+            except SQLAlchemyError as e:
+                db.rollback()
+                logger.warning("no facet bitmaps for %s: %s", table, e)
+    finally:
+        db.close()
@@ -0,0 +1,147 @@
+"""
+sparse fieldsets: every list and detail route takes ?fields=id,name,... and
+answers with only those keys of each item (list) or of the object (detail).
+
+the route class adds the parameter and cuts the response down; routers that
+can do less work for fewer fields read requested() / wants() while they run,
+e.g. to narrow their sql projection or skip lookups nobody asked for
+"""
+import asyncio
+import functools
+import inspect
+import typing
+from contextvars import ContextVar
+from typing import FrozenSet, Optional
+
+from fastapi import Query
+
+from . import responses
+
+_requested: ContextVar[Optional[FrozenSet[str]]] = ContextVar("nojoy_fields", default=None)
+
+# always kept, the frontend links rows by it
+ALWAYS = frozenset({"id"})
+
+
+def parse(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    if not value:
+        return None
+    ret = frozenset(f.strip() for f in value.split(",") if f.strip())
+    return (ret | ALWAYS) if ret else None
+
+
+def requested() -> Optional[FrozenSet[str]]:
+    # fields asked for by the current request, None for all of them
+    return _requested.get()
+
+
+def wants(field: str) -> bool:
+    fields = _requested.get()
+    return fields is None or field in fields
+
+
+def project(row: dict, fields) -> dict:
+    return {k: v for k, v in row.items() if k in fields}
+
+
+def _model_fields(model) -> Optional[dict]:
+    # pydantic v2 / v1
+    return getattr(model, "model_fields", None) or getattr(model, "__fields__", None)
+
+
+def field_names(model) -> list:
+    return list(_model_fields(model) or ())
+
+
+def item_model(response_model):
+    """
+    pydantic model of the items of a list response model ({items: List[Model]}),
+    or of a detail response model; None for plain dicts
+    """
+    fields = _model_fields(response_model) if isinstance(response_model, type) else None
+    if not fields:
+        return None
+    if "items" not in fields:
+        return response_model
+    annotation = getattr(fields["items"], "annotation", None) or getattr(fields["items"], "outer_type_", None)
+    args = typing.get_args(annotation)
+    if args and isinstance(args[0], type) and _model_fields(args[0]):
+        return args[0]
+    return None
+
+
+def _dump(model, value: dict, fields) -> dict:
+    # value shaped by its model first, as the response model would have done
+    if hasattr(model, "model_validate"):
+        return model.model_validate(value).model_dump(include=set(fields))
+    return model.parse_obj(value).dict(include=set(fields))
+
+
+def select(content, fields, model=None):
+    """
+    cut a route result down to fields: the items of a list response (or of a
+    bare list), or the object of a detail response. a Response is already
+    final and kept as is
+    """
+    if isinstance(content, responses.Response):
+        return content
+    cut = (lambda item: _dump(model, item, fields)) if model else (lambda item: project(item, fields))
+    if isinstance(content, list):
+        return [cut(item) if isinstance(item, dict) else item for item in content]
+    if isinstance(content, dict) and isinstance(content.get("items"), list):
+        return {**content, "items": [cut(item) if isinstance(item, dict) else item for item in content["items"]]}
+    if isinstance(content, dict):
+        return _dump(model, content, fields) if model else project(content, fields)
+    return content
+
+
+def sparse(endpoint, response_model=None):
+    """
+    wrap a GET endpoint so it takes a fields query parameter. while the
+    endpoint runs requested() returns the fields; the result is then cut to
+    them and answered without the response model pass (the model no longer
+    matches a cut down object)
+    """
+    model = item_model(response_model)
+    signature = inspect.signature(endpoint)
+    if "fields" in signature.parameters:
+        return endpoint
+    parameter = inspect.Parameter(
+        "fields",
+        inspect.Parameter.KEYWORD_ONLY,
+        default=Query(None, description="Comma-separated list of fields to return"),
+        annotation=Optional[str],
+    )
+
+    def finish(ret, fields):
+        if fields is None or isinstance(ret, responses.Response):
+            return ret
+        return responses.FastJSONResponse(select(ret, fields, model))
+
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, fields: Optional[str] = None, **kwargs):
+            fields = parse(fields)
+            token = _requested.set(fields)
+            try:
+                return finish(await endpoint(*args, **kwargs), fields)
+            finally:
+                _requested.reset(token)
+
+        wrapper = async_wrapper
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, fields: Optional[str] = None, **kwargs):
+            fields = parse(fields)
+            token = _requested.set(fields)
+            try:
+                return finish(endpoint(*args, **kwargs), fields)
+            finally:
+                _requested.reset(token)
+
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), parameter]
+    )
+    return wrapper
@@ -0,0 +1,111 @@
+"""
+list filters as sql, per table: query parameter -> (sql expression, match).
+they read the same values the list routes filter on and match them the way
+those routes do, so a table export (app/routers/export.py) takes the same
+filters as the list view. filters on values a list route joins or resolves
+first (skill names, destination names ...) are not here
+"""
+from typing import Dict, List, Optional, Tuple
+
+# match kinds, the query value split at commas unless single:
+#   in           value is one of the terms
+#   in_ci        same, ignoring case
+#   eq_ci        value is the (single) term, ignoring case
+#   contains_ci  value contains the (single) term, ignoring case
+#   elements_ci  one of the comma separated elements of value is one of the terms,
+#                ignoring case
+FILTERS: Dict[str, Dict[str, Tuple[str, str]]] = {
+    "ship": {
+        "purpose_search": ("json_extract(category, '$.purpose')", "in"),
+        "size_search": ("json_extract(category, '$.size')", "in"),
+        "propulsion_search": ("json_extract(category, '$.propulsion')", "in"),
+    },
+    "equipment": {
+        "classification": ("classification", "in"),
+    },
+    "tradegoods": {
+        "classification_search": ("classification", "in"),
+    },
+    "treasuremap": {
+        "category_search": ("category", "eq_ci"),
+        "academic_field_search": ("academic_field", "eq_ci"),
+        "library_search": ("library", "elements_ci"),
+    },
+    "field": {
+        "fieldtype": ("fieldtype", "in"),
+    },
+    "job": {
+        "category_search": ("category", "contains_ci"),
+    },
+    "certificate": {
+        "classification_search": ("classification", "contains_ci"),
+    },
+    "memorialalbum": {
+        "category_search": ("category", "in_ci"),
+    },
+    "furniture": {
+        "category_search": ("category", "in_ci"),
+    },
+    "consumable": {
+        "category": ("category", "in"),
+    },
+    "discovery": {
+        "category": ("category", "eq_ci"),
+    },
+    "npcsale": {
+        "npc_search": ("npc", "contains_ci"),
+    },
+}
+
+# columns name_search looks in, when the table has them
+NAME_COLUMNS = ("name", "extraname", "additionalname")
+
+
+def params_of(table: str) -> List[str]:
+    return list(FILTERS.get(table, {}))
+
+
+def terms(value: str, match: str) -> List[str]:
+    if match in ("eq_ci", "contains_ci"):
+        ret = [value]
+    else:
+        ret = [t.strip() for t in value.split(",") if t.strip()]
+    return [t.lower() for t in ret] if match.endswith("_ci") else ret
+
+
+def where(table: str, values: Dict[str, Optional[str]], columns=()) -> Tuple[List[str], dict]:
+    """
+    sql conditions and their bind parameters for the filter values given
+    (parameter -> query value, None or empty for unset). name_search is
+    matched against the NAME_COLUMNS among columns
+    """
+    clauses = []
+    params = {}
+    name_search = values.get("name_search")
+    if name_search:
+        names = [c for c in NAME_COLUMNS if c in columns]
+        if names:
+            clauses.append("(" + " OR ".join(f'"{c}" LIKE :name_search' for c in names) + ")")
+            params["name_search"] = f"%{name_search}%"
+    for param, (expr, match) in FILTERS.get(table, {}).items():
+        value = values.get(param)
+        if not value:
+            continue
+        wanted = terms(value, match)
+        if not wanted:
+            continue
+        names = [f"{param}_{i}" for i in range(len(wanted))]
+        params.update(zip(names, wanted))
+        if match == "in":
+            clauses.append(f"{expr} IN ({', '.join(':' + n for n in names)})")
+        elif match == "in_ci":
+            clauses.append(f"lower({expr}) IN ({', '.join(':' + n for n in names)})")
+        elif match == "eq_ci":
+            clauses.append(f"lower({expr}) = :{names[0]}")
+        elif match == "elements_ci":
+            # ',a,b,' with the spaces around the commas dropped
+            padded = f"(',' || replace(replace(lower({expr}), ', ', ','), ' ,', ',') || ',')"
+            clauses.append("(" + " OR ".join(f"instr({padded}, ',' || :{n} || ',') > 0" for n in names) + ")")
+        else:
+            clauses.append(f"instr(lower({expr}), :{names[0]}) > 0")
+    return clauses, params
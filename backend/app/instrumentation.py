@@ -0,0 +1,233 @@
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from . import config, efficiency, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """
+    sql statement count, rows fetched and time spent in sqlite for one request
+    """
+
+    __slots__ = (
+        "statements",
+        "rows",
+        "sql_time",
+        "started",
+        "list_filtered",
+        "list_returned",
+    )
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        # seconds spent in cursor.execute + fetch
+        self.sql_time = 0.0
+        self.started = time.perf_counter()
+        # set by list endpoints: rows left after filtering and rows in the returned page
+        self.list_filtered = None
+        self.list_returned = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def merge(self, other: "RequestStats"):
+        self.statements += other.statements
+        self.rows += other.rows
+        self.sql_time += other.sql_time
+
+    def as_dict(self):
+        return {
+            "statements": self.statements,
+            "rows": self.rows,
+            "sql_ms": round(self.sql_time * 1000, 3),
+        }
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "nojoy_request_stats", default=None
+)
+# track_statements() blocks opened outside a request, e.g. in a test driving TestClient.
+# the app runs in another thread there, so finished requests are merged in explicitly
+_collectors = []
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def record_list_result(filtered: int, returned: int):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.list_filtered = filtered
+        stats.list_returned = returned
+
+
+@contextmanager
+def track_statements():
+    """
+    collect sql stats for everything executed inside the block.
+
+        with track_statements() as stats:
+            client.get("/api/obj/123")
+        assert stats.statements <= 20
+    """
+    stats = RequestStats()
+    outside_request = _current_stats.get() is None
+    token = _current_stats.set(stats)
+    if outside_request:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if outside_request:
+            _collectors.remove(stats)
+
+
+@contextmanager
+def statement_budget(max_statements: int):
+    # fail when the block runs more statements than allowed
+    with track_statements() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        raise AssertionError(
+            f"statement budget exceeded: {stats.statements} > {max_statements}"
+        )
+
+
+class CountingCursor(sqlite3.Cursor):
+    """
+    sqlite3 cursor that adds fetched row count and fetch time to the current request stats
+    """
+
+    # set by the after_cursor_execute hook, so sqlalchemy's own first-connect
+    # pragmas are not counted
+    tracked = False
+
+    def _record(self, rows, started):
+        stats = _current_stats.get()
+        if stats is not None and self.tracked:
+            stats.rows += rows
+            stats.sql_time += time.perf_counter() - started
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._record(0 if row is None else 1, started)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = super().fetchmany(*args, **kwargs)
+        self._record(len(rows), started)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._record(len(rows), started)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    # pass as connect_args={"factory": CountingConnection} to create_engine
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    if isinstance(cursor, CountingCursor):
+        cursor.tracked = True
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_time += time.perf_counter() - started
+
+
+def install(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing_value(stats: RequestStats) -> str:
+    return (
+        f'sql;dur={stats.sql_time * 1000:.3f};desc="{stats.statements} statements", '
+        f'sqlrows;desc="{stats.rows} rows", '
+        f"total;dur={stats.elapsed * 1000:.3f}"
+    )
+
+
+class SQLStatsMiddleware:
+    """
+    ASGI middleware that opens a RequestStats for each http request and reports it
+    as a Server-Timing header, to the metrics registry and, when enabled, as a log record
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status_code = None
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if config.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append(
+                        (b"server-timing", server_timing_value(stats).encode("latin-1"))
+                    )
+                    message["headers"] = headers
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.http_requests_in_flight.dec()
+            _current_stats.reset(token)
+            for collector in list(_collectors):
+                collector.merge(stats)
+            if config.METRICS_ENABLED:
+                metrics.observe_request(
+                    scope, status_code, response_size, stats.elapsed, stats
+                )
+            if stats.list_returned is not None and config.EFFICIENCY_TRACKING_ENABLED:
+                efficiency.report.record(scope, stats)
+            if config.SQL_STATS_LOG_ENABLED:
+                logger.info(
+                    "sql stats %s %s",
+                    scope.get("method"),
+                    scope.get("path"),
+                    extra={
+                        "path": scope.get("path"),
+                        "status": status_code,
+                        "duration_ms": round(stats.elapsed * 1000, 3),
+                        **stats.as_dict(),
+                    },
+                )
@@ -0,0 +1,135 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# attributes every LogRecord has; anything else came in through extra={...}
+_RESERVED_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+) | {"message", "asctime"}
+
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    one json object per line: time, level, logger, message and any extra fields
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    human readable line with extra fields appended as key=value
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = [
+            f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in _RESERVED_ATTRS and not key.startswith("_")
+        ]
+        if extras:
+            line = f"{line} {' '.join(extras)}"
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves msg % args formatting to the listener thread.
+    the stock prepare() formats on the calling (request) thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_levels(spec: str):
+    """
+    'app.routers.jobs=DEBUG,app.instrumentation=INFO' -> {logger name: level}
+    """
+    levels = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part or "=" not in part:
+            continue
+        name, level = part.split("=", 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, module_levels: str = None, fmt: str = None):
+    """
+    route the 'app' logger tree through a QueueHandler so the request thread only
+    enqueues the record; a QueueListener thread does formatting and stream I/O.
+
+    configured from the environment unless given explicitly:
+        NOJOY_LOG_LEVEL   base level for 'app' (default WARNING)
+        NOJOY_LOG_LEVELS  per-module levels, e.g. 'app.routers.jobs=DEBUG'
+        NOJOY_LOG_FORMAT  'text' (default) or 'json'
+    """
+    global _listener
+
+    level = level or os.environ.get("NOJOY_LOG_LEVEL", "WARNING")
+    module_levels = (
+        module_levels
+        if module_levels is not None
+        else os.environ.get("NOJOY_LOG_LEVELS", "")
+    )
+    fmt = fmt or os.environ.get("NOJOY_LOG_FORMAT", "text")
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(
+        StructuredFormatter() if fmt == "json" else KeyValueFormatter()
+    )
+
+    if _listener is not None:
+        _listener.stop()
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    app_logger = logging.getLogger("app")
+    for handler in list(app_logger.handlers):
+        app_logger.removeHandler(handler)
+    app_logger.addHandler(DeferredQueueHandler(log_queue))
+    app_logger.setLevel(level.upper())
+    app_logger.propagate = False
+
+    for name, module_level in parse_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+
+def shutdown_logging():
+    # flush whatever is still queued
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
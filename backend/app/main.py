@@ -2,7 +2,6 @@ import sys
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.routers import (
     discoveries,
     ships,
@@ -71,11 +70,26 @@ from app.routers import (
     relicpiece,
     memorialalbum,
     debatecombo,
-    completed)
+    completed,
+    diagnostics,
+    export,
+    metrics,
+    admin)
+from app.instrumentation import SQLStatsMiddleware
+from app.profiling import ProfilerMiddleware
+from app.responses import FastJSONResponse
+from app.compression import CompressionMiddleware, PrecompressedStaticFiles
+from app.logging_config import setup_logging, shutdown_logging
+from app import config, database, facets, precomputed, reloader
+import logging
 import os
 import asyncio
 
-app = FastAPI(title="DHO Database API")
+setup_logging()
+if config.SQL_STATS_LOG_ENABLED:
+    logging.getLogger("app.instrumentation").setLevel(logging.INFO)
+
+app = FastAPI(title="DHO Database API", default_response_class=FastJSONResponse)
 
 # Enable CORS
 app.add_middleware(
@@ -84,16 +98,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Original-Status", "X-Next-Cursor"],
 )
+# profiler sits inside the stats middleware so its report can include the request's sql stats
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(SQLStatsMiddleware)
+# outermost, so it compresses the final body
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=config.COMPRESSION_MIN_SIZE)
 
 @app.on_event("startup")
 async def startup_event():
+    if config.ADMIN_ENABLED or config.DB_WATCH_INTERVAL > 0 or config.PRECOMPUTED_INDEX_ENABLED:
+        # what a reload compares the new file against and what the sort snapshots are
+        # named by, taken before the file can be replaced
+        database.current.hash_tables()
+    if config.PRECOMPUTED_INDEX_ENABLED:
+        precomputed.init(database.current)
+    facets.warm(database.current)
     completed.load_completed_data()
     asyncio.create_task(completed.save_completed_data_periodically())
+    if config.DB_WATCH_INTERVAL > 0:
+        asyncio.create_task(reloader.watch_database(config.DB_WATCH_INTERVAL))
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    completed.save_completed_ids()
+    completed.save_completed_data()
+    shutdown_logging()
 
 # Include routers
 app.include_router(discoveries.router)
@@ -164,16 +195,23 @@ app.include_router(relicpiece.router)
 app.include_router(memorialalbum.router)
 app.include_router(debatecombo.router)
 app.include_router(completed.router)
+app.include_router(diagnostics.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
 if getattr(sys, 'frozen', False):
     dist_dir = "dist"
 else:
     dist_dir = '../dist'
 app.mount(
-    "/assets", StaticFiles(directory=os.path.join(dist_dir, "assets")), name="assets"
+    "/assets",
+    PrecompressedStaticFiles(directory=os.path.join(dist_dir, "assets")),
+    name="assets",
 )
 
 
 @app.get("/")
 async def spa_handler():
-    return FileResponse(os.path.join(dist_dir, "index.html"))
+    # names the current hashed assets, so it is revalidated on every load
+    return FileResponse(os.path.join(dist_dir, "index.html"), headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,250 @@
+import bisect
+import math
+import threading
+from typing import Dict, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(9))  # 256B .. 16MB
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+    def snapshot(self):
+        with self._lock:
+            return {key: value for key, value in self._values.items()}
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket (non-cumulative) counts, last slot is +Inf
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def collect(self):
+        with self._lock:
+            items = [(key, (list(e[0]), e[1], e[2])) for key, e in self._values.items()]
+        for key, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, extra=[("le", _format_value(float(bound)))]
+                )
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_count", labels, count
+            yield f"{self.name}_sum", labels, total
+
+    def snapshot(self):
+        with self._lock:
+            items = [(key, (list(e[0]), e[1], e[2])) for key, e in self._values.items()]
+        ret = {}
+        for key, (counts, count, total) in items:
+            ret[key] = {
+                "count": count,
+                "sum": total,
+                "buckets": dict(zip(self.buckets + (math.inf,), counts)),
+            }
+        return ret
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def snapshot(self):
+        """
+        {metric name: {label values tuple: value}} for use in tests
+        """
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def exposition(self) -> str:
+        """
+        prometheus text format (version 0.0.4)
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample_name, labels, value in metric.collect():
+                lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "nojoy_http_requests_total", "HTTP requests", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "nojoy_http_request_duration_seconds",
+    "HTTP request latency",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "nojoy_http_requests_in_flight", "HTTP requests currently being served"
+)
+http_response_size = registry.histogram(
+    "nojoy_http_response_size_bytes",
+    "HTTP response body size",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+db_statements = registry.histogram(
+    "nojoy_db_statements_per_request",
+    "SQL statements executed per request",
+    ("route",),
+    buckets=STATEMENT_BUCKETS,
+)
+db_statements_total = registry.counter(
+    "nojoy_db_statements_total", "SQL statements executed", ("route",)
+)
+db_rows_fetched_total = registry.counter(
+    "nojoy_db_rows_fetched_total", "rows fetched from sqlite", ("route",)
+)
+db_time = registry.histogram(
+    "nojoy_db_time_seconds", "time spent in sqlite per request", ("route",)
+)
+cache_requests_total = registry.counter(
+    "nojoy_cache_requests_total", "cache lookups", ("cache", "result")
+)
+
+
+def route_label(scope) -> str:
+    # path template, so /api/obj/{obj_id} is one series instead of one per id
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    return "unmatched"
+
+
+def observe_request(scope, status_code, response_size, duration, stats):
+    method = scope.get("method", "")
+    route = route_label(scope)
+    http_requests_total.inc(method=method, route=route, status=status_code or 0)
+    http_request_duration.observe(duration, method=method, route=route)
+    http_response_size.observe(response_size, method=method, route=route)
+    db_statements.observe(stats.statements, route=route)
+    db_statements_total.inc(stats.statements, route=route)
+    db_rows_fetched_total.inc(stats.rows, route=route)
+    db_time.observe(stats.sql_time, route=route)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests_total.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def cache_hit_ratio(cache: str) -> float:
+    hits = cache_requests_total.value(cache=cache, result="hit")
+    misses = cache_requests_total.value(cache=cache, result="miss")
+    if hits + misses == 0:
+        return 0.0
+    return hits / (hits + misses)
@@ -0,0 +1,374 @@
+import array
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from typing import Optional
+
+from app import delta
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NJIX"
+FORMAT_VERSION = 3
+_HEADER = struct.Struct("<4sII")  # magic, format version, json header length
+_NUMBER = re.compile(r"\d+")
+
+# table and columns each obtain method lookup in common.py reads item ids from,
+# keyed like the 'from' of fetch_all_obtain_methods
+OBTAIN_SOURCES = {
+    "quest": ("quest", ("reward_items",)),
+    "recipe": ("recipe", ("greatsuccess", "success", "failure")),
+    "npcsale": ("npcsale", ("item_id",)),
+    "shipwreck": ("shipwreck", ("item_id",)),
+    "treasurebox": ("treasurebox", ("item_ids",)),
+    "treasuremap": ("treasuremap", ("reward_item",)),
+    "field_gatherable": ("field", ("gatherable",)),
+    "field_resurvey_reward": ("field", ("resurvey_reward",)),
+    "consumable": ("consumable", ("Item",)),
+    "landnpc_drop": ("landnpc", ("drop_items",)),
+    "marinenpc_drop": ("marinenpc", ("acquired_items",)),
+    "ganador": ("ganador", ("acquired_items",)),
+    "citynpc_gift": ("citynpc", ("gifts",)),
+    "dungeon": ("dungeon", ("acquisition_items",)),
+    "sea": ("sea", ("gatherable",)),
+    "private_farm": ("privatefarm", ("products",)),
+}
+
+
+# tables the index is built from; a database release that changes none of them
+# keeps its index
+TABLES = frozenset({"allData"} | {table for table, _ in OBTAIN_SOURCES.values()})
+
+
+def db_key(db_path: str) -> str:
+    """
+    hash of the content of the tables the index is built from (app/delta.py
+    remembers the table hashes next to the database)
+    """
+    hashes = delta.table_hashes(db_path)
+    digest = hashlib.blake2b(str(FORMAT_VERSION).encode("utf-8"), digest_size=8)
+    for table in sorted(TABLES):
+        digest.update(f"{table}={hashes.get(table)};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def index_path(db_path: str, key: str) -> str:
+    return f"{db_path}.{key}.idx"
+
+
+def _numbers(value):
+    if isinstance(value, int):
+        return (value,)
+    if isinstance(value, float):
+        # an id in a REAL column, e.g. 12345.0
+        return (int(value),) if value.is_integer() else ()
+    if isinstance(value, str):
+        return (int(n) for n in _NUMBER.findall(value))
+    return ()
+
+
+def _existing_columns(conn, table: str):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def build(db_path: str, out_path: str, key: str):
+    """
+    write the index file for db_path: allData as a sorted id array with a
+    category table, and for every item id the obtain method sources whose
+    rows mention it. the file is written next to out_path and renamed
+    into place, so readers never see half a file
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT id, category FROM allData ORDER BY id").fetchall()
+
+        # an item is listed under a source when one of the source's rows mentions its
+        # id anywhere in the columns the lookup reads. that is a superset of what the
+        # lookup's sql matches, so a missing entry means the lookup finds nothing
+        kinds = list(OBTAIN_SOURCES)
+        postings = {}
+        for kind_index, kind in enumerate(kinds):
+            table, columns = OBTAIN_SOURCES[kind]
+            existing = _existing_columns(conn, table)
+            columns = [c for c in columns if c in existing]
+            if not columns:
+                continue
+            select = ", ".join(f'"{c}"' for c in columns)
+            for row in conn.execute(f'SELECT {select} FROM "{table}"'):
+                for value in row:
+                    for item_id in _numbers(value):
+                        postings.setdefault(item_id, set()).add(kind_index)
+    finally:
+        conn.close()
+
+    categories = sorted({row[1] for row in rows if row[1] is not None})
+    category_index = {c: i for i, c in enumerate(categories)}
+    ids = array.array("q", (row[0] for row in rows))
+    category_of = array.array("H", (category_index.get(row[1], 0xFFFF) for row in rows))
+
+    item_ids = array.array("q", sorted(postings))
+    source_offsets = array.array("I", [0])
+    source_kinds = array.array("H")
+    for item_id in item_ids:
+        source_kinds.extend(sorted(postings[item_id]))
+        source_offsets.append(len(source_kinds))
+
+    sections = [
+        ("ids", ids),
+        ("category_of", category_of),
+        ("item_ids", item_ids),
+        ("source_offsets", source_offsets),
+        ("source_kinds", source_kinds),
+    ]
+    blobs = [(name, data if isinstance(data, bytes) else data.tobytes()) for name, data in sections]
+
+    # section offsets are relative to the end of the header, each 8 byte aligned
+    layout = {}
+    position = 0
+    for name, blob in blobs:
+        layout[name] = [position, len(blob)]
+        position += len(blob) + (-len(blob) % 8)
+    header = json.dumps(
+        {
+            "key": key,
+            "byteorder": sys.byteorder,
+            "categories": categories,
+            "kinds": kinds,
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    header += b" " * (-(_HEADER.size + len(header)) % 8)
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for _, blob in blobs:
+            f.write(blob)
+            f.write(b"\0" * (-len(blob) % 8))
+    os.replace(tmp_path, out_path)
+    logger.info(
+        "built %s: %s objects, %s items with sources in %.2fs",
+        out_path, len(ids), len(item_ids), time.perf_counter() - started,
+    )
+
+
+class PrecomputedIndex:
+    """
+    read-only view of an index file. the file is memory mapped, so every
+    worker process serving the same database shares its pages and opening it
+    costs the same however large it is
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} index file")
+        base = _HEADER.size + header_length
+        header = json.loads(self._mm[_HEADER.size:base])
+        if header["byteorder"] != sys.byteorder:
+            self._mm.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']} endian machine")
+        self.key = header["key"]
+        self.categories = header["categories"]
+        self.kinds = header["kinds"]
+
+        self._view = memoryview(self._mm)
+        self._sections = {}
+        formats = {
+            "ids": "q",
+            "category_of": "H",
+            "item_ids": "q",
+            "source_offsets": "I",
+            "source_kinds": "H",
+        }
+        for name, (offset, length) in header["sections"].items():
+            self._sections[name] = self._view[base + offset:base + offset + length].cast(formats[name])
+        self.ids = self._sections["ids"]
+        self._category_of = self._sections["category_of"]
+        self._item_ids = self._sections["item_ids"]
+        self._source_offsets = self._sections["source_offsets"]
+        self._source_kinds = self._sections["source_kinds"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _find(sorted_ids, value) -> int:
+        i = bisect.bisect_left(sorted_ids, value)
+        if i < len(sorted_ids) and sorted_ids[i] == value:
+            return i
+        return -1
+
+    def category(self, obj_id: int) -> Optional[str]:
+        # category of an allData id, None when the id is not in allData
+        i = self._find(self.ids, obj_id)
+        if i < 0:
+            return None
+        category_index = self._category_of[i]
+        return self.categories[category_index] if category_index != 0xFFFF else None
+
+    def contains(self, obj_id: int) -> bool:
+        return self._find(self.ids, obj_id) >= 0
+
+    def sources(self, item_id: int) -> frozenset:
+        """
+        obtain method kinds (OBTAIN_SOURCES keys) whose tables mention item_id
+        """
+        i = self._find(self._item_ids, item_id)
+        if i < 0:
+            return frozenset()
+        start, end = self._source_offsets[i], self._source_offsets[i + 1]
+        return frozenset(self.kinds[k] for k in self._source_kinds[start:end])
+
+    def close(self):
+        for section in self._sections.values():
+            section.release()
+        self._sections = {}
+        self._view.release()
+        self._mm.close()
+
+
+def open_or_build(db_path: str, timeout: float = 300) -> PrecomputedIndex:
+    """
+    map the index of db_path, building it first if there is none for the
+    current file. with several workers starting at once one of them builds
+    (guarded by an exclusive lock file) and the others wait for the file
+    """
+    key = db_key(db_path)
+    path = index_path(db_path, key)
+    lock_path = f"{path}.lock"
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                # left behind by a worker that died while building
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{lock_path} held for more than {timeout}s")
+            time.sleep(0.1)
+            continue
+        try:
+            os.close(fd)
+            if not os.path.exists(path):
+                build(db_path, path, key)
+                remove_stale(db_path, keep=path)
+        finally:
+            os.remove(lock_path)
+    return PrecomputedIndex(path)
+
+
+def remove_stale(db_path: str, keep: str):
+    # index files of earlier versions of the database
+    directory = os.path.dirname(os.path.abspath(db_path))
+    prefix = os.path.basename(db_path) + "."
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(prefix) and name.endswith(".idx") and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                # still mapped by a process on windows, removed on a later build
+                pass
+
+
+def index_for(db):
+    """
+    index of the database generation a session reads from, None while it is
+    not mapped (being built, disabled or unavailable)
+    """
+    from app import database
+
+    return database.generation_of(db).index
+
+
+def _open_in_background(generation):
+    try:
+        index = open_or_build(generation.path)
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.warning("precomputed index unavailable, using sql lookups: %s", e)
+        return
+    if generation.retired:
+        # swapped out while the index was built
+        index.close()
+        return
+    generation.index = index
+    logger.info("precomputed index ready: %s", index.path)
+
+
+def _reuse(previous, path: str, key: str):
+    # a database at another path whose index tables match the previous one's
+    if previous is None or previous.index is None or previous.index.key != key:
+        return
+    try:
+        os.link(previous.index.path, path)
+    except OSError:
+        shutil.copyfile(previous.index.path, path)
+
+
+def init(generation, background: bool = True, previous=None):
+    """
+    map the index of a database generation. a snapshot built for the same
+    content of TABLES (at this path or, when given, the previous generation's)
+    is mapped right away; otherwise it is built on a thread while requests are
+    served through the sql lookups, and used once ready
+    """
+    path = None
+    try:
+        key = db_key(generation.path)
+        path = index_path(generation.path, key)
+        if not os.path.exists(path):
+            _reuse(previous, path, key)
+        if os.path.exists(path):
+            generation.index = PrecomputedIndex(path)
+            return
+    except (OSError, ValueError) as e:
+        logger.warning("precomputed index %s unusable, rebuilding: %s", path, e)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    if not background:
+        _open_in_background(generation)
+        return
+    threading.Thread(
+        target=_open_in_background, args=(generation,), name="precomputed-index", daemon=True
+    ).start()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="build the precomputed index of a database")
+    parser.add_argument("db")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    index = open_or_build(args.db)
+    print(f"{index.path}: {len(index)} objects")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
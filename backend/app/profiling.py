@@ -0,0 +1,314 @@
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import marshal
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from fastapi.routing import APIRoute
+
+from . import config, instrumentation
+from .instrumentation import current_stats
+
+FORMATS = ("json", "pstats", "speedscope")
+
+# cProfile keys of the C functions time is attributed to; each value is summed by
+# cumulative time, which includes callees (e.g. sort key functions)
+_CATEGORY_FUNCTIONS = {
+    "sql": {
+        "<method 'execute' of 'sqlite3.Cursor' objects>",
+        "<method 'fetchone' of 'sqlite3.Cursor' objects>",
+        "<method 'fetchmany' of 'sqlite3.Cursor' objects>",
+        "<method 'fetchall' of 'sqlite3.Cursor' objects>",
+    },
+    "sort": {
+        "<method 'sort' of 'list' objects>",
+        "<built-in method builtins.sorted>",
+    },
+}
+
+
+# python functions counted as sql: the fetch methods every connection's
+# CountingCursor overrides, matched by the file of their code object and their name
+_SQL_FILE = instrumentation.CountingCursor.fetchall.__code__.co_filename
+_SQL_METHODS = {"fetchone", "fetchmany", "fetchall"}
+
+
+def _is_counting_fetch(key) -> bool:
+    filename, _, funcname = key
+    return filename == _SQL_FILE and funcname.rsplit(".", 1)[-1] in _SQL_METHODS
+
+
+def _category_of(key) -> Optional[str]:
+    filename, _, funcname = key
+    if _is_counting_fetch(key):
+        return "sql"
+    for category, names in _CATEGORY_FUNCTIONS.items():
+        if funcname in names:
+            return category
+    if funcname == "loads" and filename.replace("\\", "/").endswith("json/__init__.py"):
+        return "json_loads"
+    return None
+
+
+class EventTracer:
+    """
+    sys.setprofile based tracer recording open/close events for a speedscope
+    'evented' profile. much slower than cProfile but keeps the call timeline
+    """
+
+    def __init__(self):
+        self.frames = []
+        self._frame_index = {}
+        self.events = []
+        self._stack = []
+        self.started = None
+        self.ended = None
+
+    def _frame_id(self, name, file, line):
+        key = (name, file, line)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({"name": name, "file": file, "line": line})
+        return index
+
+    def _now(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def _trace(self, frame, event, arg):
+        if event == "call":
+            code = frame.f_code
+            index = self._frame_id(code.co_name, code.co_filename, code.co_firstlineno)
+        elif event == "c_call":
+            index = self._frame_id(
+                getattr(arg, "__qualname__", None) or repr(arg), "<builtin>", 0
+            )
+        elif self._stack:
+            # return / c_return / c_exception of a frame we saw open
+            self.events.append({"type": "C", "frame": self._stack.pop(), "at": self._now()})
+            return
+        else:
+            return
+        self._stack.append(index)
+        self.events.append({"type": "O", "frame": index, "at": self._now()})
+
+    def enable(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+        sys.setprofile(self._trace)
+
+    def disable(self):
+        sys.setprofile(None)
+        now = self._now()
+        while self._stack:
+            self.events.append({"type": "C", "frame": self._stack.pop(), "at": now})
+        self.ended = now
+
+    def speedscope(self, name: str):
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": self.frames},
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": self.ended or 0,
+                    "events": self.events,
+                }
+            ],
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "nojoy",
+        }
+
+
+class ProfileSession:
+    """
+    profiler for one request. the endpoint wrapper enables it around the endpoint
+    call, in whichever thread the endpoint runs
+    """
+
+    def __init__(self, fmt: str):
+        self.format = fmt
+        self.profiler = EventTracer() if fmt == "speedscope" else cProfile.Profile()
+
+    @contextmanager
+    def running(self):
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profiler, stream=io.StringIO())
+
+    def categories(self, stats: pstats.Stats):
+        ret = {"sql": 0.0, "json_loads": 0.0, "sort": 0.0}
+        for key, (cc, nc, tt, ct, callers) in stats.stats.items():
+            category = _category_of(key)
+            if category is None:
+                continue
+            if key[0] == "~":
+                # a builtin fetch called from a CountingCursor fetch is in that one's time already
+                ct -= sum(edge[3] for caller, edge in callers.items() if _is_counting_fetch(caller))
+            ret[category] += ct
+        ret["total"] = stats.total_tt
+        ret["other"] = max(
+            ret["total"] - ret["sql"] - ret["json_loads"] - ret["sort"], 0.0
+        )
+        return {key: round(value * 1000, 3) for key, value in ret.items()}
+
+    def report(self, path: str, top: int = 40):
+        stats = self.stats()
+        rows = []
+        for (filename, line, funcname), (cc, nc, tt, ct, callers) in stats.stats.items():
+            rows.append(
+                {
+                    "function": funcname,
+                    "file": filename,
+                    "line": line,
+                    "calls": nc,
+                    "primitive_calls": cc,
+                    "tottime_ms": round(tt * 1000, 3),
+                    "cumtime_ms": round(ct * 1000, 3),
+                }
+            )
+        rows.sort(key=lambda x: x["cumtime_ms"], reverse=True)
+        request_stats = current_stats()
+        return {
+            "path": path,
+            "categories_ms": self.categories(stats),
+            "sql_stats": request_stats.as_dict() if request_stats else None,
+            "functions": rows[:top],
+        }
+
+    def pstats_bytes(self) -> bytes:
+        # same content as pstats.Stats.dump_stats, loadable with pstats.Stats(path)
+        return marshal.dumps(self.stats().stats)
+
+
+_active_session: ContextVar[Optional[ProfileSession]] = ContextVar(
+    "nojoy_profile_session", default=None
+)
+
+
+def profiled(endpoint):
+    """
+    wrap an endpoint so it runs under the request's ProfileSession, if any.
+    sync endpoints run in the threadpool, so the profiler has to be enabled there
+    """
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            session = _active_session.get()
+            if session is None:
+                return await endpoint(*args, **kwargs)
+            with session.running():
+                return await endpoint(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        session = _active_session.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        with session.running():
+            return endpoint(*args, **kwargs)
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    # runs the endpoint under the request's ProfileSession; the app's routers use
+    # app.routing.ApiRoute, which adds the response features on top
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+def _requested_format(scope) -> Optional[str]:
+    headers = dict(scope.get("headers") or [])
+    query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    flag = headers.get(b"x-profile", b"").decode("latin-1") or query.get("profile")
+    if flag not in ("1", "true", "json", "pstats", "speedscope"):
+        return None
+    fmt = (
+        headers.get(b"x-profile-format", b"").decode("latin-1")
+        or query.get("profile_format")
+        or (flag if flag in FORMATS else "json")
+    )
+    return fmt if fmt in FORMATS else "json"
+
+
+class ProfilerMiddleware:
+    """
+    profile a single request when it carries 'X-Profile: 1' (or ?profile=1) and
+    NOJOY_PROFILING is on. the response body is replaced by the report:
+    json (default), a pstats dump or a speedscope file, picked with
+    'X-Profile-Format' / ?profile_format=
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        fmt = _requested_format(scope)
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(fmt)
+        token = _active_session.set(session)
+        original_status = None
+
+        async def capture_send(message):
+            nonlocal original_status
+            # the original response is dropped, only its status is kept
+            if message["type"] == "http.response.start":
+                original_status = message["status"]
+
+        try:
+            await self.app(scope, receive, capture_send)
+        finally:
+            _active_session.reset(token)
+
+        path = scope.get("path", "")
+        if fmt == "pstats":
+            body = session.pstats_bytes()
+            content_type = b"application/octet-stream"
+            filename = "profile.pstats"
+        elif fmt == "speedscope":
+            body = json.dumps(session.profiler.speedscope(path)).encode("utf-8")
+            content_type = b"application/json"
+            filename = "profile.speedscope.json"
+        else:
+            body = json.dumps(session.report(path), ensure_ascii=False).encode("utf-8")
+            content_type = b"application/json"
+            filename = None
+
+        headers = [
+            (b"content-type", content_type),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"x-profile-original-status", str(original_status).encode("latin-1")),
+        ]
+        if filename:
+            headers.append(
+                (b"content-disposition", f'attachment; filename="{filename}"'.encode("latin-1"))
+            )
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import threading
+
+from sqlalchemy import text
+
+from app import config, database, delta, facets, precomputed
+
+logger = logging.getLogger(__name__)
+
+_reload_lock = threading.Lock()
+
+
+def reload_database(path: str = None) -> database.Generation:
+    """
+    open the database file (the served one by default) as a new generation,
+    check it and map its index, then swap it in. everything is done before the
+    swap, so requests never wait on it; on a bad file the served generation stays.
+    what the served generation derived from tables the new file did not change
+    is carried over instead of rebuilt
+    """
+    with _reload_lock:
+        old = database.current
+        path = os.path.abspath(path or old.path)
+        if not os.path.isfile(path):
+            raise ValueError(f"{path} does not exist")
+        new = database.Generation(old.number + 1, path)
+        try:
+            with new.engine.connect() as conn:
+                conn.execute(text("SELECT COUNT(*) FROM allData")).scalar()
+            new_hashes = new.hash_tables()
+            if old.table_hashes is not None:
+                changed = delta.changed_tables(old.table_hashes, new_hashes)
+            else:
+                # what the served file held is unknown (not hashed when it opened): keep nothing
+                changed = set(new_hashes).union(
+                    *(cache.tables or () for cache in old.caches.values())
+                )
+            if config.PRECOMPUTED_INDEX_ENABLED:
+                precomputed.init(new, background=False, previous=old)
+        except Exception as e:
+            new.retire()
+            raise ValueError(f"{path} is not a usable database: {e}") from e
+        new.changed_tables = sorted(changed)
+        for name, cache in old.caches.items():
+            if not cache.depends_on(changed):
+                new.caches[name] = cache
+        logger.info(
+            "reloading %s: %s tables changed, kept caches %s",
+            path, len(changed), sorted(new.caches) or "none",
+        )
+        # the facet bitmaps of changed tables, built before requests see the file
+        facets.warm(new)
+        database.swap(new)
+        return new
+
+
+def _file_state(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+async def watch_database(interval: float):
+    """
+    reload the served database file once it changed and stayed unchanged for a
+    whole interval, so a copy still being written is not picked up
+    """
+    path = database.current.path
+    loaded = _file_state(path)
+    seen = loaded
+    while True:
+        await asyncio.sleep(interval)
+        if database.current.path != path:
+            # swapped to another file through /api/admin/reload
+            path = database.current.path
+            loaded = seen = _file_state(path)
+            continue
+        state = _file_state(path)
+        if state is None or state == loaded:
+            seen = state
+            continue
+        if state != seen:
+            seen = state
+            continue
+        try:
+            await asyncio.to_thread(reload_database, path)
+        except ValueError as e:
+            logger.warning("database reload failed: %s", e)
+        loaded = state
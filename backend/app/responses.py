@@ -0,0 +1,100 @@
+import asyncio
+import functools
+import json
+import re
+import secrets
+from typing import Any, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # plain json module, same output
+    orjson = None
+
+# placeholder a Fragment is serialized as before its bytes are spliced in
+_TOKEN = secrets.token_hex(8)
+_PLACEHOLDER = re.compile(rb'"\\u0000' + _TOKEN.encode("ascii") + rb':(\d+)\\u0000"')
+
+
+class Fragment:
+    """
+    already serialized json inside a response value, written out as is
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def fragment(data: bytes):
+    # orjson writes its own fragments without the splice pass
+    if orjson is not None and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(data)
+    return Fragment(data)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    compact utf-8 json of a response value, through orjson when it is installed.
+    values neither library handles go through fastapi's jsonable_encoder
+    """
+    if isinstance(content, Fragment):
+        return content.data
+    fragments = []
+
+    def default(obj):
+        if isinstance(obj, Fragment):
+            fragments.append(obj.data)
+            return f"\0{_TOKEN}:{len(fragments) - 1}\0"
+        return jsonable_encoder(obj)
+
+    if orjson is not None:
+        data = orjson.dumps(content, default=default, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(
+            content, default=default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+    if fragments:
+        data = _PLACEHOLDER.sub(lambda m: fragments[int(m.group(1))], data)
+    return data
+
+
+class FastJSONResponse(JSONResponse):
+    # default response class of the app
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PayloadResponse(Response):
+    # body serialized beforehand, e.g. a cached detail payload
+    media_type = "application/json"
+
+
+def is_plain_dict(response_model) -> bool:
+    return response_model in (dict, Dict[str, Any])
+
+
+def unvalidated(endpoint):
+    """
+    wrap an endpoint whose response model is a plain dict so it answers with
+    the serialized value itself: fastapi then skips validating the dict against
+    the model and the jsonable_encoder copy of it
+    """
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            ret = await endpoint(*args, **kwargs)
+            return ret if isinstance(ret, Response) else FastJSONResponse(ret)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        ret = endpoint(*args, **kwargs)
+        return ret if isinstance(ret, Response) else FastJSONResponse(ret)
+
+    return wrapper
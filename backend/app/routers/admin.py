@@ -0,0 +1,28 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from .. import config, database, reloader
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def _check_enabled():
+    if not config.ADMIN_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/generation")
+def read_generation():
+    _check_enabled()
+    return database.current.info()
+
+
+@router.post("/reload")
+def reload_database(
+    path: Optional[str] = Query(None, description="Database file to serve, default the served one"),
+):
+    _check_enabled()
+    try:
+        reloader.reload_database(path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return database.current.info()
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class AideResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/aides", tags=["aides"])
+router = APIRouter(prefix="/api/aides", tags=["aides"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=AideResponse)
@@ -43,8 +46,7 @@ def read_aides(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -74,7 +76,7 @@ def read_aides(
 
 @router.get("/{aide_id}", response_model=dict)
 def read_aide(aide_id: int, db: Session = Depends(get_db)):
-    return read_aide_core(aide_id, db)
+    return PayloadResponse(detail_payload(read_aide_core, aide_id, db))
 
 
 def read_aide_core(aide_id: int, db: Session):
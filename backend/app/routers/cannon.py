@@ -4,13 +4,15 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 class CannonResponse(BaseModel):
     items: List[dict]
     total: int
 
-router = APIRouter(prefix="/api/cannons", tags=["cannons"])
+router = APIRouter(prefix="/api/cannons", tags=["cannons"], route_class=ApiRoute)
 
 @router.get("/", response_model=CannonResponse)
 def read_cannons(
@@ -41,14 +43,13 @@ def read_cannons(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 @router.get("/{cannon_id}", response_model=dict)
 def read_cannon(cannon_id: int, db: Session = Depends(get_db)):
-    return read_cannon_core(cannon_id, db)
+    return PayloadResponse(detail_payload(read_cannon_core, cannon_id, db))
 
 def read_cannon_core(cannon_id: int, db: Session):
     query = text("SELECT * FROM cannon WHERE id = :id")
@@ -4,7 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 
 class CertificateResponse(BaseModel):
@@ -12,7 +14,7 @@ class CertificateResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/certificates", tags=["certificates"])
+router = APIRouter(prefix="/api/certificates", tags=["certificates"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=CertificateResponse)
@@ -57,8 +59,7 @@ def read_certificates(
 
         results.sort(key=sort_key, reverse=reverse)
 
-    total = len(results)
-    certs = results[skip : skip + limit]
+    total, certs = paginate(results, skip, limit)
 
     ret_list = [
         {
@@ -75,7 +76,7 @@ def read_certificates(
 
 @router.get("/{cert_id}", response_model=dict)
 def read_certificate(cert_id: int, db: Session = Depends(get_db)):
-    return read_certificate_core(cert_id, db)
+    return PayloadResponse(detail_payload(read_certificate_core, cert_id, db))
 
 
 def read_certificate_core(cert_id: int, db: Session = Depends(get_db)):
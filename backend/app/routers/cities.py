@@ -1,10 +1,14 @@
 from typing import List
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from .. import models
+from .. import cursors, models
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload
+from ..instrumentation import record_list_result
 
-router = APIRouter(prefix="/api/cities", tags=["cities"])
+router = APIRouter(prefix="/api/cities", tags=["cities"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=List[dict])
@@ -19,8 +23,14 @@ def read_cities(
     if search:
         query = query.filter(models.City.name.ilike(f"%{search}%"))
 
+    if cursors.after() is not None:
+        # keyset page right after the ?cursor= row instead of skipping skip rows
+        query = query.filter(models.City.id > cursors.after()[1])
+        skip = 0
+
     # total = query.count()
-    cities = query.offset(skip).limit(limit).all()
+    cities = cursors.trim(query.order_by(models.City.id).offset(skip).limit(limit + 1).all(), limit)
+    record_list_result(len(cities), len(cities))
 
     return [
         {
@@ -36,7 +46,7 @@ def read_cities(
 
 @router.get("/{city_id}", response_model=dict)
 def read_city(city_id: int, db: Session = Depends(get_db)):
-    return read_city_core(city_id, db)
+    return PayloadResponse(detail_payload(read_city_core, city_id, db))
 
 
 def read_city_core(city_id: int, db: Session = Depends(get_db)):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class CityNpcResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/citynpcs", tags=["citynpcs"])
+router = APIRouter(prefix="/api/citynpcs", tags=["citynpcs"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=CityNpcResponse)
@@ -46,8 +49,7 @@ def read_citynpcs(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -70,7 +72,7 @@ def read_citynpcs(
 
 @router.get("/{citynpc_id}", response_model=dict)
 def read_citynpc(citynpc_id: int, db: Session = Depends(get_db)):
-    return read_citynpc_core(citynpc_id, db)
+    return PayloadResponse(detail_payload(read_citynpc_core, citynpc_id, db))
 
 
 def read_citynpc_core(citynpc_id: int, db: Session):
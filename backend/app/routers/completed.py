@@ -1,18 +1,28 @@
+import logging
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from ..routing import ApiRoute
+from .. import config
+from ..completed_store import SQLiteCompletedStore
 from pydantic import BaseModel
 from typing import Dict, List
 import json
 import asyncio
 import os
 
-router = APIRouter(prefix='/api', tags=['completed'])
+router = APIRouter(prefix='/api', tags=['completed'], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 COMPLETED_FILE = "completed.json"
 # Store as a dictionary {id: name}
 completed_data: Dict[int, str] = {}
 completed_data_dirty: bool = False
+# set when config.COMPLETED_DB_PATH is given, replaces completed_data and the json file
+completed_store: SQLiteCompletedStore = None
 
 def check_completed_of_id(_id: int) -> bool:
+    if completed_store is not None:
+        return completed_store.contains(_id)
     return _id in completed_data
 
 
@@ -22,7 +32,13 @@ class CompletedStatusUpdate(BaseModel):
     is_completed: bool
 
 def load_completed_data():
-    global completed_data
+    global completed_data, completed_store
+    if config.COMPLETED_DB_PATH:
+        if completed_store is None:
+            completed_store = SQLiteCompletedStore(
+                config.COMPLETED_DB_PATH, import_file=COMPLETED_FILE
+            )
+        return
     if os.path.exists(COMPLETED_FILE):
         with open(COMPLETED_FILE, "r", encoding='utf-8') as f:
             try:
@@ -36,6 +52,9 @@ def load_completed_data():
 
 def save_completed_data():
     global completed_data_dirty
+    if completed_store is not None:
+        # every write is already committed to the shared store
+        return
     with open(COMPLETED_FILE, "w", encoding='utf-8') as f:
         items_list = [{"id": id, "name": name} for id, name in completed_data.items()]
         items_list.sort(key=lambda x: x['id'])
@@ -49,6 +68,8 @@ def save_completed_data():
 
 async def save_completed_data_periodically():
     global completed_data_dirty
+    if completed_store is not None:
+        return
     while True:
         await asyncio.sleep(3)
         if completed_data_dirty:
@@ -56,28 +77,39 @@ async def save_completed_data_periodically():
 
 @router.post("/completed")
 async def update_completed_status(update: CompletedStatusUpdate):
-    print(update)
+    logger.debug("completed update: %s", update)
     global completed_data_dirty
+    if completed_store is not None:
+        # the store waits on sqlite write locks, off the event loop
+        if update.is_completed:
+            await run_in_threadpool(completed_store.set, update.id, update.name)
+        else:
+            await run_in_threadpool(completed_store.remove, update.id)
+        return {"message": "Completed status updated", "item_id": update.id, "completed": update.is_completed}
     if update.is_completed:
         if completed_data.get(update.id) != update.name:
             completed_data[update.id] = update.name
             completed_data_dirty = True
-            print(f'Added/updated id {update.id} with name {update.name}')
+            logger.debug("Added/updated id %s with name %s", update.id, update.name)
         else:
-            print(f'id {update.id} already present with the same name.')
+            logger.debug("id %s already present with the same name.", update.id)
     else:
         if update.id in completed_data:
             del completed_data[update.id]
             completed_data_dirty = True
-            print(f'removed {update.id} from completed')
+            logger.debug("removed %s from completed", update.id)
         else:
-            print(f'{update.id} not in completed')
+            logger.debug("%s not in completed", update.id)
             
     return {"message": "Completed status updated", "item_id": update.id, "completed": update.is_completed}
 
 @router.get("/completed")
 async def get_completed_data():
-    items_list = [{"id": id, "name": name} for id, name in completed_data.items()]
+    if completed_store is not None:
+        data = await run_in_threadpool(completed_store.snapshot)
+    else:
+        data = completed_data
+    items_list = [{"id": id, "name": name} for id, name in data.items()]
     items_list.sort(key=lambda x: x['id'])
     return items_list
 
@@ -4,8 +4,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from pydantic import BaseModel
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
 from ..common import (
+    detail_payload,
     fetch_all_obtain_methods,
+    paginate,
 )
 import json
 
@@ -48,7 +52,7 @@ class ConsumableResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/consumables", tags=["consumables"])
+router = APIRouter(prefix="/api/consumables", tags=["consumables"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ConsumableResponse)
@@ -89,8 +93,7 @@ def read_consumables(
 
         results.sort(key=sort_key, reverse=reverse)
 
-    total = len(results)
-    consumables = results[skip : skip + limit]
+    total, consumables = paginate(results, skip, limit)
 
     ret_list = []
     for c in consumables:
@@ -112,7 +115,7 @@ def read_consumables(
 
 @router.get("/{consumable_id}", response_model=dict)
 def read_consumable(consumable_id: int, db: Session = Depends(get_db)):
-    return read_consumable_core(consumable_id, db)
+    return PayloadResponse(detail_payload(read_consumable_core, consumable_id, db))
 
 
 def read_consumable_core(consumable_id: int, db: Session = Depends(get_db)):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class CourtRankResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/courtranks", tags=["courtranks"])
+router = APIRouter(prefix="/api/courtranks", tags=["courtranks"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=CourtRankResponse)
@@ -42,8 +45,7 @@ def read_courtranks(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -55,7 +57,7 @@ def read_courtranks(
 
 @router.get("/{courtrank_id}", response_model=dict)
 def read_courtrank(courtrank_id: int, db: Session = Depends(get_db)):
-    return read_courtrank_core(courtrank_id, db)
+    return PayloadResponse(detail_payload(read_courtrank_core, courtrank_id, db))
 
 
 def read_courtrank_core(courtrank_id: int, db: Session):
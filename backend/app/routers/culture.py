@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class CultureResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/cultures", tags=["cultures"])
+router = APIRouter(prefix="/api/cultures", tags=["cultures"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=CultureResponse)
@@ -59,8 +62,7 @@ def read_cultures(
                 reverse=reverse,
             )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = [dict(row._mapping) for row in paginated_results]
 
@@ -69,7 +71,7 @@ def read_cultures(
 
 @router.get("/{culture_id}", response_model=dict)
 def read_culture(culture_id: int, db: Session = Depends(get_db)):
-    return read_culture_core(culture_id, db)
+    return PayloadResponse(detail_payload(read_culture_core, culture_id, db))
 
 
 def read_culture_core(culture_id: int, db: Session = Depends(get_db)):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class DebateComboResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/debatecombos", tags=["debatecombos"])
+router = APIRouter(prefix="/api/debatecombos", tags=["debatecombos"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=DebateComboResponse)
@@ -52,8 +55,7 @@ def read_debatecombos(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -75,7 +77,7 @@ def read_debatecombos(
 
 @router.get("/{debatecombo_id}", response_model=dict)
 def read_debatecombo(debatecombo_id: int, db: Session = Depends(get_db)):
-    return read_debatecombo_core(debatecombo_id, db)
+    return PayloadResponse(detail_payload(read_debatecombo_core, debatecombo_id, db))
 
 
 def read_debatecombo_core(debatecombo_id: int, db: Session):
@@ -0,0 +1,22 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+from .. import efficiency
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/efficiency")
+def read_efficiency_report(
+    limit: Optional[int] = Query(None, description="Limit the number of entries"),
+    format: str = Query("json", description="json or text"),
+):
+    if format == "text":
+        return PlainTextResponse(efficiency.report.format_text(limit))
+    return {"items": efficiency.report.ranking(limit)}
+
+
+@router.delete("/efficiency")
+def reset_efficiency_report():
+    efficiency.report.reset()
+    return {"message": "efficiency report reset"}
@@ -3,10 +3,13 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
 from app.database import get_db
-from app import models
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
+from app import models, sortindex
 import json
 
-router = APIRouter(prefix="/api/discoveries", tags=["discoveries"])
+router = APIRouter(prefix="/api/discoveries", tags=["discoveries"], route_class=ApiRoute)
 
 
 @router.get("/")
@@ -33,30 +36,10 @@ async def get_discoveries(
     if category:
         results = [row for row in results if category.lower() == row.category.lower()]
 
-    # Sorting logic
-    if results:
-        # Determine if the sort order is descending
-        reverse = sort_order.lower() == "desc"
-
-        # Define a sorting key function
-        def sort_key(row):
-            # Get the value of the sort_by attribute from the row
-            value = getattr(row, sort_by, None)
-            # Handle None values to prevent errors during sorting
-            if value is None:
-                # Treat None as a very small number for numeric types or an empty string for others
-                # This ensures they are sorted at the beginning (for asc) or end (for desc)
-                return (
-                    (0, "")
-                    if isinstance(getattr(results[0], sort_by, None), (int, float))
-                    else ""
-                )
-            return value
-
-        results.sort(key=sort_key, reverse=reverse)
-
-    total = len(results)
-    items = results[skip : skip + limit]
+    # presorted per column (app/sortindex.py), NULL last
+    results = sortindex.order(results, db, "discovery", sort_by, sort_order.lower() == "desc")
+
+    total, items = paginate(results, skip, limit)
 
     # convert to dict
     fetch_field_list = ["id", "name", "category", "difficulty", "discovery_method"]
@@ -73,7 +56,7 @@ async def get_discoveries(
 
 @router.get("/{discovery_id}")
 async def get_discovery(discovery_id: int, db: Session = Depends(get_db)):
-    return get_discovery_core(discovery_id, db)
+    return PayloadResponse(detail_payload(get_discovery_core, discovery_id, db))
 
 
 def get_discovery_core(discovery_id: int, db: Session = Depends(get_db)):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, json_valid_columns, paginate, passthrough_json
 import json
 
 
@@ -12,7 +15,7 @@ class DungeonResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/dungeons", tags=["dungeons"])
+router = APIRouter(prefix="/api/dungeons", tags=["dungeons"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=DungeonResponse)
@@ -75,8 +78,7 @@ def read_dungeons(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -90,11 +92,15 @@ def read_dungeons(
 
 @router.get("/{dungeon_id}", response_model=dict)
 def read_dungeon(dungeon_id: int, db: Session = Depends(get_db)):
-    return read_dungeon_core(dungeon_id, db)
+    return PayloadResponse(detail_payload(read_dungeon_core, dungeon_id, db))
+
+
+# json text columns of the detail, passed through to the response undecoded
+DUNGEON_JSON_FIELDS = ["entrance", "requirements", "discoveries", "acquisition_items"]
 
 
 def read_dungeon_core(dungeon_id: int, db: Session):
-    query = text("SELECT * FROM dungeon WHERE id = :id")
+    query = text(f"SELECT *, {json_valid_columns(DUNGEON_JSON_FIELDS)} FROM dungeon WHERE id = :id")
     result = db.execute(query, {"id": dungeon_id}).fetchone()
 
     if result is None:
@@ -106,12 +112,6 @@ def read_dungeon_core(dungeon_id: int, db: Session):
     if ret.get("extraname"):
         ret["name"] = f'{ret["name"]} {ret["extraname"]}'
 
-    # Parse JSON fields
-    for field in ["entrance", "requirements", "discoveries", "acquisition_items"]:
-        if ret.get(field) and isinstance(ret[field], str):
-            try:
-                ret[field] = json.loads(ret[field])
-            except json.JSONDecodeError:
-                ret[field] = None
+    passthrough_json(ret, DUNGEON_JSON_FIELDS)
 
     return ret
\ No newline at end of file
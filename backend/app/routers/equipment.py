@@ -1,23 +1,29 @@
-from typing import List
+import logging
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
-from .. import models
+from .. import facets, models
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 import json
 
 
 class EquipmentResponse(BaseModel):
     items: List[dict]
     total: int
+    # matches per filter value, with ?facet_counts=true (app/facets.py)
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
 
-router = APIRouter(prefix="/api/equipment", tags=["equipment"])
+router = APIRouter(prefix="/api/equipment", tags=["equipment"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
-@router.get("/", response_model=EquipmentResponse)
+@router.get("/", response_model=EquipmentResponse, response_model_exclude_unset=True)
 def read_equipments(
     skip: int = Query(0, description="Skip first N records"),
     limit: int = Query(10, description="Limit the number of records returned"),
@@ -26,6 +32,7 @@ def read_equipments(
     sort_order: str = Query("desc", description="Sort order (asc or desc)"),
     classification: str = Query(None, description="Classification filter"),
     skills_search: str = Query(None, description="Skills search term"),
+    facet_counts: bool = Query(False, description="Add the matches per filter value under the other filters"),
     db: Session = Depends(get_db),
 ):
 
@@ -50,19 +57,9 @@ GROUP BY e.id;
     if name_search:
         results = [row for row in results if name_search.lower() in row.name.lower()]
 
-    if classification:
-        classifications = [c.strip() for c in classification.split(",") if c.strip()]
-        # print("Filtering by classifications:", classifications)
-        if classifications:
-            results = [
-                row
-                for row in results
-                if row.classification != None and row.classification in classifications
-            ]
-
     if skills_search:
         skill_terms = [int(term.strip()) for term in skills_search.split(",")]
-        print("Filtering skills with terms:", skill_terms)
+        logger.debug("Filtering skills with terms: %s", skill_terms)
         results = [
             row
             for row in results
@@ -73,6 +70,11 @@ GROUP BY e.id;
             )
         ]
 
+    # classification through the facet bitmaps (app/facets.py)
+    filter_values = {"classification": classification}
+    counts = facets.counts(db, "equipment", filter_values, results) if facet_counts else None
+    results = facets.keep(results, db, "equipment", facets.match(db, "equipment", filter_values))
+
     # Sorting logic
     if results:
         reverse = sort_order.lower() == "desc"
@@ -108,8 +110,7 @@ GROUP BY e.id;
 
     results.sort(key=sort_key, reverse=reverse)
 
-    total = len(results)
-    equipments = results[skip : skip + limit]
+    total, equipments = paginate(results, skip, limit)
 
     return_fields = [
         "id",
@@ -145,12 +146,15 @@ GROUP BY e.id;
         )
         ret_list.append(ret)
 
-    return {"items": ret_list, "total": total}
+    ret = {"items": ret_list, "total": total}
+    if counts is not None:
+        ret["facets"] = counts
+    return ret
 
 
 @router.get("/{equipment_id}", response_model=dict)
 def read_equipment(equipment_id: int, db: Session = Depends(get_db)):
-    return read_equipment_core(equipment_id, db)
+    return PayloadResponse(detail_payload(read_equipment_core, equipment_id, db))
 
 
 def read_equipment_core(equipment_id: int, db: Session = Depends(get_db)):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class EquippedEffectResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/equippedeffects", tags=["equippedeffects"])
+router = APIRouter(prefix="/api/equippedeffects", tags=["equippedeffects"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=EquippedEffectResponse)
@@ -46,8 +49,7 @@ def read_equippedeffects(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -59,7 +61,7 @@ def read_equippedeffects(
 
 @router.get("/{equippedeffect_id}", response_model=dict)
 def read_equippedeffect(equippedeffect_id: int, db: Session = Depends(get_db)):
-    return read_equippedeffect_core(equippedeffect_id, db)
+    return PayloadResponse(detail_payload(read_equippedeffect_core, equippedeffect_id, db))
 
 
 def read_equippedeffect_core(equippedeffect_id: int, db: Session):
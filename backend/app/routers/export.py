@@ -0,0 +1,178 @@
+"""
+whole table exports for spreadsheets, streamed a batch of rows at a time
+instead of a list route page of dicts with a huge limit:
+
+    GET /api/export/ships?format=csv&purpose_search=...&sort_by=name
+    GET /api/export/tradegoods?format=ndjson&flatten=true
+
+the table is a table name or its list route name. name_search, sort_by,
+sort_order and the table's filters of app/filters.py work as on the list
+route, ?fields= picks columns. values are the stored ones, json columns as
+their text; flatten=true decodes them and spreads objects over
+column.key columns
+"""
+import csv
+import io
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from starlette.background import BackgroundTask
+from sqlalchemy.orm import Session
+
+from .. import database, fieldsets, filters, responses
+from ..database import get_db
+from ..routing import ApiRoute
+
+router = APIRouter(prefix="/api/export", tags=["export"], route_class=ApiRoute)
+
+# rows fetched from the cursor and written out at a time
+BATCH_SIZE = 500
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def resolve_table(db: Session, name: str) -> str:
+    tables = {
+        row[0]
+        for row in db.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        )
+    }
+    # list routes are named after their table, mostly in plural
+    for candidate in (name, name[:-1], name[:-2], name[:-3] + "y"):
+        if candidate in tables:
+            return candidate
+    raise HTTPException(status_code=404, detail=f"Unknown table: {name}")
+
+
+def _decode(value):
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+    return value
+
+
+def flatten_row(row: dict) -> dict:
+    """
+    json columns decoded and objects spread over column.key entries; arrays
+    stay values of their column
+    """
+    out = {}
+
+    def put(key, value):
+        if isinstance(value, dict) and value:
+            for k, v in value.items():
+                put(f"{key}.{k}", v)
+        else:
+            out[key] = value
+
+    for key, value in row.items():
+        put(key, _decode(value))
+    return out
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+@router.get("/{table}")
+def export_table(
+    table: str,
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    name_search: Optional[str] = Query(None, description="Search term for name"),
+    sort_by: str = Query("id", description="Column to sort by"),
+    sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    flatten: bool = Query(False, description="Decode json columns and spread objects over columns"),
+    db: Session = Depends(get_db),
+):
+    table = resolve_table(db, table)
+    table_columns = [row[1] for row in db.execute(text(f'PRAGMA table_info("{table}")'))]
+    fields = fieldsets.requested()
+    columns = [c for c in table_columns if fields is None or c in fields]
+    if not columns:
+        raise HTTPException(status_code=400, detail="No such fields")
+
+    values = dict(request.query_params)
+    values["name_search"] = name_search
+    where_clauses, params = filters.where(table, values, table_columns)
+    select_list = ", ".join(f'"{c}"' for c in columns)
+    query = f'SELECT {select_list} FROM "{table}"'
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    order = "DESC" if sort_order.lower() == "desc" else "ASC"
+    sort_column = f'"{sort_by}"' if sort_by in table_columns else "rowid"
+    query += f" ORDER BY {sort_column} {order}"
+
+    # the body is streamed after the endpoint returned, when get_db may have
+    # closed its session and released the generation already (fastapi < 0.118).
+    # the generation the table and filters were checked against is pinned here,
+    # before a reload can swap it, and the stream reads through its own sessions
+    generation = database.generation_of(db)
+    generation.acquire()
+    pinned = [generation]
+
+    def release():
+        # once: at the end of the stream, or after the response when it never started
+        try:
+            pinned.pop().release()
+        except IndexError:
+            pass
+
+    def batches():
+        session = generation.SessionLocal()
+        try:
+            # rows come off the cursor BATCH_SIZE at a time, never all of them at once
+            result = session.execute(text(query).execution_options(yield_per=BATCH_SIZE), params)
+            for batch in result.partitions():
+                rows = [dict(zip(columns, row)) for row in batch]
+                yield [flatten_row(row) for row in rows] if flatten else rows
+        finally:
+            session.close()
+
+    def stream(body):
+        try:
+            yield from body
+        finally:
+            release()
+
+    def ndjson():
+        for batch in batches():
+            yield b"".join(responses.dumps(row) + b"\n" for row in batch)
+
+    def csv_rows():
+        header = columns
+        if flatten:
+            # flattened columns differ per row, collected in a first pass
+            keys = {}
+            for batch in batches():
+                for row in batch:
+                    keys.update(dict.fromkeys(row))
+            header = list(keys)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # byte order mark, spreadsheet programs read the file as utf-8 then
+        buffer.write("\ufeff")
+        writer.writerow(header)
+        for batch in batches():
+            for row in batch:
+                writer.writerow([_csv_value(row.get(key)) for key in header])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    return StreamingResponse(
+        stream(ndjson() if format == "ndjson" else csv_rows()),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+        background=BackgroundTask(release),
+    )
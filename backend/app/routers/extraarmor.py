@@ -4,13 +4,15 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 class ExtraArmorResponse(BaseModel):
     items: List[dict]
     total: int
 
-router = APIRouter(prefix="/api/extraarmors", tags=["extraarmors"])
+router = APIRouter(prefix="/api/extraarmors", tags=["extraarmors"], route_class=ApiRoute)
 
 @router.get("/", response_model=ExtraArmorResponse)
 def read_extraarmors(
@@ -45,14 +47,13 @@ def read_extraarmors(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 @router.get("/{extraarmor_id}", response_model=dict)
 def read_extraarmor(extraarmor_id: int, db: Session = Depends(get_db)):
-    return read_extraarmor_core(extraarmor_id, db)
+    return PayloadResponse(detail_payload(read_extraarmor_core, extraarmor_id, db))
 
 def read_extraarmor_core(extraarmor_id: int, db: Session):
     query = text("SELECT * FROM extraarmor WHERE id = :id")
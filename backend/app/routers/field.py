@@ -1,22 +1,27 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
+from .. import facets
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate, raw_json
 from collections import defaultdict
-import json
 
 
 class TableViewResponse(BaseModel):
     items: List[dict]
     total: int
+    # matches per filter value, with ?facet_counts=true (app/facets.py)
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
 
-router = APIRouter(prefix="/api/field", tags=["field"])
+router = APIRouter(prefix="/api/field", tags=["field"], route_class=ApiRoute)
 
 
-@router.get("/", response_model=TableViewResponse)
+@router.get("/", response_model=TableViewResponse, response_model_exclude_unset=True)
 def read_fields(
     skip: int = Query(0, description="Skip first N records"),
     limit: int = Query(10, description="Limit the number of records returned"),
@@ -24,6 +29,7 @@ def read_fields(
     fieldtype: Optional[str] = Query(None, description="Search term for fieldtype"),
     sort_by: str = Query("id", description="Column to sort by"),
     sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    facet_counts: bool = Query(False, description="Add the matches per filter value under the other filters"),
     db: Session = Depends(get_db),
 ):
     """
@@ -38,9 +44,10 @@ def read_fields(
     if name_search:
         results = [row for row in results if name_search.lower() in row.name.lower()]
 
-    if fieldtype:
-        term_list = fieldtype.split(",")
-        results = [row for row in results if row.fieldtype in term_list]
+    # fieldtype through the facet bitmaps (app/facets.py)
+    filter_values = {"fieldtype": fieldtype}
+    counts = facets.counts(db, "field", filter_values, results) if facet_counts else None
+    results = facets.keep(results, db, "field", facets.match(db, "field", filter_values))
 
     # Sorting logic
     if sort_by:
@@ -49,8 +56,7 @@ def read_fields(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     # Process results to handle JSON in 'culture'
     items = []
@@ -58,12 +64,15 @@ def read_fields(
         item_dict = dict(row._mapping)
         items.append(item_dict)
 
-    return {"items": items, "total": total}
+    ret = {"items": items, "total": total}
+    if counts is not None:
+        ret["facets"] = counts
+    return ret
 
 
 @router.get("/{field_id}", response_model=dict)
 def read_field(field_id: int, db: Session = Depends(get_db)):
-    return read_field_core(field_id, db)
+    return PayloadResponse(detail_payload(read_field_core, field_id, db))
 
 
 def read_field_core(field_id: int, db: Session = Depends(get_db)):
@@ -74,6 +83,9 @@ def read_field_core(field_id: int, db: Session = Depends(get_db)):
         """
                 SELECT
     f.*,
+    json_valid(f.survey) AS survey__valid,
+    json_valid(f.resurvey_reward) AS resurvey_reward__valid,
+    json_valid(f.gatherable) AS gatherable__valid,
 
     -- region info
     CASE WHEN r.id IS NOT NULL THEN
@@ -116,22 +128,17 @@ WHERE f.id = :id;
     for c in return_cols:
         ret[c] = getattr(result, c, None)
 
-    ret["region"] = (
-        json.loads(result.region_resolved) if result.region_resolved else None
-    )
-    ret["sea"] = json.loads(result.sea_resolved) if result.sea_resolved else None
-    ret["entrance"] = (
-        json.loads(result.entrance_resolved) if result.entrance_resolved else None
-    )
-    ret["flag_quest"] = (
-        json.loads(result.flag_quest_resolved) if result.flag_quest_resolved else None
-    )
+    # json built by sqlite or checked with json_valid, passed through undecoded
+    ret["region"] = raw_json(result.region_resolved)
+    ret["sea"] = raw_json(result.sea_resolved)
+    ret["entrance"] = raw_json(result.entrance_resolved)
+    ret["flag_quest"] = raw_json(result.flag_quest_resolved)
 
-    ret["survey"] = json.loads(result.survey) if result.survey else None
+    ret["survey"] = raw_json(result.survey) if result.survey__valid else None
     ret["resurvey_reward"] = (
-        json.loads(result.resurvey_reward) if result.resurvey_reward else None
+        raw_json(result.resurvey_reward) if result.resurvey_reward__valid else None
     )
 
-    ret["gatherable"] = json.loads(result.gatherable) if result.gatherable else None
+    ret["gatherable"] = raw_json(result.gatherable) if result.gatherable__valid else None
 
     return ret
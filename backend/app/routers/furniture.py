@@ -4,8 +4,10 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
 import json
-from ..common import fetch_all_obtain_methods
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 
 class FurnitureResponse(BaseModel):
@@ -13,7 +15,7 @@ class FurnitureResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/furnitures", tags=["furnitures"])
+router = APIRouter(prefix="/api/furnitures", tags=["furnitures"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=FurnitureResponse)
@@ -75,8 +77,7 @@ def read_furnitures(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -90,7 +91,7 @@ def read_furnitures(
 
 @router.get("/{furniture_id}", response_model=dict)
 def read_furniture(furniture_id: int, db: Session = Depends(get_db)):
-    return read_furniture_core(furniture_id, db)
+    return PayloadResponse(detail_payload(read_furniture_core, furniture_id, db))
 
 
 def read_furniture_core(furniture_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class GanadorResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/ganadors", tags=["ganadors"])
+router = APIRouter(prefix="/api/ganadors", tags=["ganadors"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=GanadorResponse)
@@ -36,8 +39,7 @@ def read_ganadors(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -58,7 +60,7 @@ def read_ganadors(
 
 @router.get("/{ganador_id}", response_model=dict)
 def read_ganador(ganador_id: int, db: Session = Depends(get_db)):
-    return read_ganador_core(ganador_id, db)
+    return PayloadResponse(detail_payload(read_ganador_core, ganador_id, db))
 
 
 def read_ganador_core(ganador_id: int, db: Session):
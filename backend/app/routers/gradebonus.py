@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class GradeBonusResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/gradebonuses", tags=["gradebonuses"])
+router = APIRouter(prefix="/api/gradebonuses", tags=["gradebonuses"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=GradeBonusResponse)
@@ -44,15 +47,14 @@ def read_gradebonuses(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 
 @router.get("/{gradebonus_id}", response_model=dict)
 def read_gradebonus(gradebonus_id: int, db: Session = Depends(get_db)):
-    return read_gradebonus_core(gradebonus_id, db)
+    return PayloadResponse(detail_payload(read_gradebonus_core, gradebonus_id, db))
 
 
 def read_gradebonus_core(gradebonus_id: int, db: Session):
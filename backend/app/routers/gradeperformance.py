@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class GradePerformanceResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/gradeperformances", tags=["gradeperformances"])
+router = APIRouter(prefix="/api/gradeperformances", tags=["gradeperformances"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=GradePerformanceResponse)
@@ -44,15 +47,14 @@ def read_gradeperformances(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 
 @router.get("/{gradeperformance_id}", response_model=dict)
 def read_gradeperformance(gradeperformance_id: int, db: Session = Depends(get_db)):
-    return read_gradeperformance_core(gradeperformance_id, db)
+    return PayloadResponse(detail_payload(read_gradeperformance_core, gradeperformance_id, db))
 
 
 def read_gradeperformance_core(gradeperformance_id: int, db: Session):
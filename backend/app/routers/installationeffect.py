@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 
 
 class InstallationEffectResponse(BaseModel):
@@ -11,7 +14,7 @@ class InstallationEffectResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/installationeffects", tags=["installationeffects"])
+router = APIRouter(prefix="/api/installationeffects", tags=["installationeffects"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=InstallationEffectResponse)
@@ -44,8 +47,7 @@ def read_installationeffects(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -57,7 +59,7 @@ def read_installationeffects(
 
 @router.get("/{installationeffect_id}", response_model=dict)
 def read_installationeffect(installationeffect_id: int, db: Session = Depends(get_db)):
-    return read_installationeffect_core(installationeffect_id, db)
+    return PayloadResponse(detail_payload(read_installationeffect_core, installationeffect_id, db))
 
 
 def read_installationeffect_core(installationeffect_id: int, db: Session):
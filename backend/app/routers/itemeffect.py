@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class ItemEffectResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/itemeffects", tags=["itemeffects"])
+router = APIRouter(prefix="/api/itemeffects", tags=["itemeffects"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ItemEffectResponse)
@@ -56,8 +59,7 @@ def read_itemeffects(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -71,7 +73,7 @@ def read_itemeffects(
 
 @router.get("/{itemeffect_id}", response_model=dict)
 def read_itemeffect(itemeffect_id: int, db: Session = Depends(get_db)):
-    return read_itemeffect_core(itemeffect_id, db)
+    return PayloadResponse(detail_payload(read_itemeffect_core, itemeffect_id, db))
 
 
 def read_itemeffect_core(itemeffect_id: int, db: Session):
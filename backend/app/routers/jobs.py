@@ -1,23 +1,30 @@
-from typing import List
+import logging
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 
-from .. import models
+from .. import facets, models
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
 class JobResponse(BaseModel):
     items: List[dict]
     total: int
+    # matches per filter value, with ?facet_counts=true (app/facets.py)
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
 
-router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
-@router.get("/", response_model=JobResponse)
+@router.get("/", response_model=JobResponse, response_model_exclude_unset=True)
 def read_jobs(
     skip: int = Query(0, description="Skip first N records"),
     limit: int = Query(10, description="Limit the number of records returned"),
@@ -28,6 +35,7 @@ def read_jobs(
     preferred_skill_search: str = Query(
         None, description="Preferred skill search term"
     ),
+    facet_counts: bool = Query(False, description="Add the matches per filter value under the other filters"),
     db: Session = Depends(get_db),
 ):
 
@@ -79,16 +87,10 @@ LEFT JOIN allData ad ON ad.id = j.reference_letter
             for job in result
             if job.name and name_search.lower() in job.name.lower()
         ]
-    if category_search:
-        result = [
-            job
-            for job in result
-            if job.category and category_search.lower() in job.category.lower()
-        ]
     if preferred_skill_search:
         # split by comma and strip whitespace
         search_terms = [int(term.strip()) for term in preferred_skill_search.split(",")]
-        print("search_terms:", search_terms)
+        logger.debug("search_terms: %s", search_terms)
 
         # filter jobs where its preferred_skills contains all of search terms
         def job_matches(job):
@@ -96,7 +98,7 @@ LEFT JOIN allData ad ON ad.id = j.reference_letter
                 return False
             try:
                 skills = json.loads(job.preferred_skills)
-                print("skills:", skills)
+                logger.debug("skills: %s", skills)
             except json.JSONDecodeError:
                 return False
             for t in search_terms:
@@ -112,6 +114,11 @@ LEFT JOIN allData ad ON ad.id = j.reference_letter
 
         result = [job for job in result if job_matches(job)]
 
+    # category through the facet bitmaps (app/facets.py)
+    filter_values = {"category_search": category_search}
+    counts = facets.counts(db, "job", filter_values, result) if facet_counts else None
+    result = facets.keep(result, db, "job", facets.match(db, "job", filter_values))
+
     # Sorting logic
     reverse = sort_order.lower() == "desc"
     if sort_by in ["name", "category"]:
@@ -140,8 +147,7 @@ LEFT JOIN allData ad ON ad.id = j.reference_letter
         )
 
     # result is a list
-    total = len(result)
-    jobs = result[skip : skip + limit]
+    total, jobs = paginate(result, skip, limit)
 
     # fields to extract
     target_field_list = [
@@ -174,13 +180,16 @@ LEFT JOIN allData ad ON ad.id = j.reference_letter
 
         ret.append(ret_obj)
 
-    return {"items": ret, "total": total}
+    response = {"items": ret, "total": total}
+    if counts is not None:
+        response["facets"] = counts
+    return response
 
 
 @router.get("/{job_id}", response_model=dict)
 def read_job(job_id: int, db: Session = Depends(get_db)):
 
-    return read_job_core(job_id, db)
+    return PayloadResponse(detail_payload(read_job_core, job_id, db))
 
 
 def read_job_core(job_id: int, db: Session = Depends(get_db)):
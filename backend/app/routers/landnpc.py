@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class LandNpcResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/landnpcs", tags=["landnpcs"])
+router = APIRouter(prefix="/api/landnpcs", tags=["landnpcs"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=LandNpcResponse)
@@ -36,8 +39,7 @@ def read_landnpcs(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -54,7 +56,7 @@ def read_landnpcs(
 
 @router.get("/{landnpc_id}", response_model=dict)
 def read_landnpc(landnpc_id: int, db: Session = Depends(get_db)):
-    return read_landnpc_core(landnpc_id, db)
+    return PayloadResponse(detail_payload(read_landnpc_core, landnpc_id, db))
 
 
 def read_landnpc_core(landnpc_id: int, db: Session):
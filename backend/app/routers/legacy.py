@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class LegacyResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/legacies", tags=["legacies"])
+router = APIRouter(prefix="/api/legacies", tags=["legacies"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=LegacyResponse)
@@ -78,8 +81,7 @@ def read_legacies(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -91,7 +93,7 @@ def read_legacies(
 
 @router.get("/{legacy_id}", response_model=dict)
 def read_legacy(legacy_id: int, db: Session = Depends(get_db)):
-    return read_legacy_core(legacy_id, db)
+    return PayloadResponse(detail_payload(read_legacy_core, legacy_id, db))
 
 
 def read_legacy_core(legacy_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class LegacyClueResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/legacyclues", tags=["legacyclues"])
+router = APIRouter(prefix="/api/legacyclues", tags=["legacyclues"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=LegacyClueResponse)
@@ -57,8 +60,7 @@ def read_legacyclues(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -70,7 +72,7 @@ def read_legacyclues(
 
 @router.get("/{legacyclue_id}", response_model=dict)
 def read_legacyclue(legacyclue_id: int, db: Session = Depends(get_db)):
-    return read_legacyclue_core(legacyclue_id, db)
+    return PayloadResponse(detail_payload(read_legacyclue_core, legacyclue_id, db))
 
 
 def read_legacyclue_core(legacyclue_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class LegacyThemeResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/legacythemes", tags=["legacythemes"])
+router = APIRouter(prefix="/api/legacythemes", tags=["legacythemes"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=LegacyThemeResponse)
@@ -59,8 +62,7 @@ def read_legacythemes(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -72,7 +74,7 @@ def read_legacythemes(
 
 @router.get("/{legacytheme_id}", response_model=dict)
 def read_legacytheme(legacytheme_id: int, db: Session = Depends(get_db)):
-    return read_legacytheme_core(legacytheme_id, db)
+    return PayloadResponse(detail_payload(read_legacytheme_core, legacytheme_id, db))
 
 
 def read_legacytheme_core(legacytheme_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class MajorResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/majors", tags=["majors"])
+router = APIRouter(prefix="/api/majors", tags=["majors"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=MajorResponse)
@@ -42,8 +45,7 @@ def read_majors(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -64,7 +66,7 @@ def read_majors(
 
 @router.get("/{major_id}", response_model=dict)
 def read_major(major_id: int, db: Session = Depends(get_db)):
-    return read_major_core(major_id, db)
+    return PayloadResponse(detail_payload(read_major_core, major_id, db))
 
 
 def read_major_core(major_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class MarineNpcResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/marinenpcs", tags=["marinenpcs"])
+router = APIRouter(prefix="/api/marinenpcs", tags=["marinenpcs"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=MarineNpcResponse)
@@ -36,8 +39,7 @@ def read_marinenpcs(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -71,7 +73,7 @@ def read_marinenpcs(
 
 @router.get("/{marinenpc_id}", response_model=dict)
 def read_marinenpc(marinenpc_id: int, db: Session = Depends(get_db)):
-    return read_marinenpc_core(marinenpc_id, db)
+    return PayloadResponse(detail_payload(read_marinenpc_core, marinenpc_id, db))
 
 
 def read_marinenpc_core(marinenpc_id: int, db: Session):
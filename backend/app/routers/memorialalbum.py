@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class MemorialAlbumResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/memorialalbums", tags=["memorialalbums"])
+router = APIRouter(prefix="/api/memorialalbums", tags=["memorialalbums"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=MemorialAlbumResponse)
@@ -53,8 +56,7 @@ def read_memorialalbums(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -81,7 +83,7 @@ def read_memorialalbums(
 
 @router.get("/{memorialalbum_id}", response_model=dict)
 def read_memorialalbum(memorialalbum_id: int, db: Session = Depends(get_db)):
-    return read_memorialalbum_core(memorialalbum_id, db)
+    return PayloadResponse(detail_payload(read_memorialalbum_core, memorialalbum_id, db))
 
 
 def read_memorialalbum_core(memorialalbum_id: int, db: Session):
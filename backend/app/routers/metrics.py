@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from .. import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(
+        metrics.registry.exposition(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class NationResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/nations", tags=["nations"])
+router = APIRouter(prefix="/api/nations", tags=["nations"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=NationResponse)
@@ -36,8 +39,7 @@ def read_nations(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = [dict(row._mapping) for row in paginated_results]
 
@@ -46,7 +48,7 @@ def read_nations(
 
 @router.get("/{nation_id}", response_model=dict)
 def read_nation(nation_id: int, db: Session = Depends(get_db)):
-    return read_nation_core(nation_id, db)
+    return PayloadResponse(detail_payload(read_nation_core, nation_id, db))
 
 
 def read_nation_core(nation_id: int, db: Session):
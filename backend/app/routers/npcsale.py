@@ -5,6 +5,9 @@ from pydantic import BaseModel
 from sqlalchemy import text
 from .. import models
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -13,7 +16,7 @@ class NpcSaleResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/npcsale", tags=["npcsale"])
+router = APIRouter(prefix="/api/npcsale", tags=["npcsale"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=NpcSaleResponse)
@@ -95,8 +98,7 @@ GROUP BY n.id, n.npc, n.location_id, ad_loc.name;
 
         results.sort(key=sort_key, reverse=reverse)
 
-    total = len(results)
-    items = results[skip : skip + limit]
+    total, items = paginate(results, skip, limit)
 
     # convert items to dict list
     target_field_list = ["id", "npc"]
@@ -114,7 +116,7 @@ GROUP BY n.id, n.npc, n.location_id, ad_loc.name;
 
 @router.get("/{npc_id}", response_model=dict)
 def read_npcsale_detail(npc_id: int, db: Session = Depends(get_db)):
-    return read_npcsale_core(npc_id, db)
+    return PayloadResponse(detail_payload(read_npcsale_core, npc_id, db))
 
 
 def read_npcsale_core(npc_id: int, db: Session = Depends(get_db)):
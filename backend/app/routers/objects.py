@@ -1,7 +1,12 @@
+import logging
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from .. import precomputed, responses
+from ..responses import FastJSONResponse
+from ..common import detail_payload
 from .equipment import read_equipment_core
 from .discoveries import get_discovery_core
 from .certificate import read_certificate_core
@@ -71,7 +76,8 @@ from .debatecombo import read_debatecombo_core
 from .completed import  check_completed_of_id
 
 
-router = APIRouter(prefix="/api/obj", tags=["objects"])
+router = APIRouter(prefix="/api/obj", tags=["objects"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 """ unique category values in allData table
 discovery
@@ -208,20 +214,29 @@ detail_data_fetch_function_dict = {
 @router.get("/{obj_id}", response_model=dict)
 def read_object(obj_id: int, db: Session = Depends(get_db)):
 
-    # fetch id and type from allData
-    result = db.execute(
-        text("select id, category from allData where id = :obj_id"), {"obj_id": obj_id}
-    ).fetchone()
-    if not result:
-        print(f"no query result")
-        return {"type": None, "data": None, "msg": "not in allData"}
-    print(f"category: {result.category}")
-    fetch_fn = detail_data_fetch_function_dict.get(result.category, None)
+    # fetch id and type from allData, from the precomputed index when it is mapped
+    index = precomputed.index_for(db)
+    if index is not None:
+        found = index.contains(obj_id)
+        category = index.category(obj_id)
+    else:
+        result = db.execute(
+            text("select id, category from allData where id = :obj_id"), {"obj_id": obj_id}
+        ).fetchone()
+        found = result is not None
+        category = result.category if result else None
+    if not found:
+        logger.debug("obj %s not in allData", obj_id)
+        return FastJSONResponse({"type": None, "data": None, "msg": "not in allData"})
+    logger.debug("obj %s category: %s", obj_id, category)
+    fetch_fn = detail_data_fetch_function_dict.get(category, None)
     if not fetch_fn:
-        print(f"no matching fetch fn")
-        return {"type": None, "data": None, "msg": "no detail found"}
+        logger.debug("no detail fetch fn for category %s", category)
+        return FastJSONResponse({"type": None, "data": None, "msg": "no detail found"})
     else:
-        deatil_data = fetch_fn(obj_id, db)
+        # the detail is the cached payload its own route serves, spliced in as is.
+        # ?fields= applies to it, so the envelope is answered as a final response
+        deatil_data = responses.fragment(detail_payload(fetch_fn, obj_id, db))
 
         completed = check_completed_of_id(obj_id)
-        return {"type": result.category, "data": deatil_data, "completed": completed}
+        return FastJSONResponse({"type": category, "data": deatil_data, "completed": completed})
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class OrnamentResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/ornaments", tags=["ornaments"])
+router = APIRouter(prefix="/api/ornaments", tags=["ornaments"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=OrnamentResponse)
@@ -69,8 +72,7 @@ def read_ornaments(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -82,7 +84,7 @@ def read_ornaments(
 
 @router.get("/{ornament_id}", response_model=dict)
 def read_ornament(ornament_id: int, db: Session = Depends(get_db)):
-    return read_ornament_core(ornament_id, db)
+    return PayloadResponse(detail_payload(read_ornament_core, ornament_id, db))
 
 
 def read_ornament_core(ornament_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class PetResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/pets", tags=["pets"])
+router = APIRouter(prefix="/api/pets", tags=["pets"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=PetResponse)
@@ -46,8 +49,7 @@ def read_pets(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -66,7 +68,7 @@ def read_pets(
 
 @router.get("/{pet_id}", response_model=dict)
 def read_pet(pet_id: int, db: Session = Depends(get_db)):
-    return read_pet_core(pet_id, db)
+    return PayloadResponse(detail_payload(read_pet_core, pet_id, db))
 
 
 def read_pet_core(pet_id: int, db: Session):
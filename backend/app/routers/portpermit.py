@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class PortPermitResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/portpermits", tags=["portpermits"])
+router = APIRouter(prefix="/api/portpermits", tags=["portpermits"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=PortPermitResponse)
@@ -36,8 +39,7 @@ def read_portpermits(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = [dict(row._mapping) for row in paginated_results]
 
@@ -46,7 +48,7 @@ def read_portpermits(
 
 @router.get("/{portpermit_id}", response_model=dict)
 def read_portpermit(portpermit_id: int, db: Session = Depends(get_db)):
-    return read_portpermit_core(portpermit_id, db)
+    return PayloadResponse(detail_payload(read_portpermit_core, portpermit_id, db))
 
 
 def read_portpermit_core(portpermit_id: int, db: Session):
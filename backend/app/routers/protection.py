@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 
 
 class ProtectionResponse(BaseModel):
@@ -11,7 +14,7 @@ class ProtectionResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/protections", tags=["protections"])
+router = APIRouter(prefix="/api/protections", tags=["protections"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ProtectionResponse)
@@ -44,8 +47,7 @@ def read_protections(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -57,7 +59,7 @@ def read_protections(
 
 @router.get("/{protection_id}", response_model=dict)
 def read_protection(protection_id: int, db: Session = Depends(get_db)):
-    return read_protection_core(protection_id, db)
+    return PayloadResponse(detail_payload(read_protection_core, protection_id, db))
 
 
 def read_protection_core(protection_id: int, db: Session):
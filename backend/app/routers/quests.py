@@ -1,10 +1,14 @@
+import logging
 from typing import List
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
-from .. import models
+from .. import models, sortindex
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate, raw_json
 import json
 
 
@@ -13,7 +17,8 @@ class QuestResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/quests", tags=["quests"])
+router = APIRouter(prefix="/api/quests", tags=["quests"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=QuestResponse)
@@ -106,7 +111,7 @@ LEFT JOIN allData ad2
     if skills_search:
         # split skills search by commas and trim spaces. contains skill ids. all search skill ids must be present in quest skills
         skill_terms = [term.strip() for term in skills_search.split(",")]
-        print("Filtering skills with terms:", skill_terms)
+        logger.debug("Filtering skills with terms: %s", skill_terms)
         results = [
             row
             for row in results
@@ -118,27 +123,17 @@ LEFT JOIN allData ad2
             )
         ]
 
-    # Sorting logic
-    if results:
-        # Determine if the sort order is descending
-        reverse = sort_order.lower() == "desc"
+    def sort_key(row):
+        # values the query computes (grouped_skills, destination_json ...) have no presorted order
+        value = getattr(row, sort_by, None)
+        if value is None:
+            return 0 if sort_by in ["id", "difficulty"] else ""
+        return value
 
-        # Define a sorting key function
-        def sort_key(row):
-            value = getattr(row, sort_by, None)
-            # Handle None values to prevent errors during sorting
-            if value is None:
-                # Treat None as a very small number for numeric types or an empty string for others
-                # This ensures they are sorted at the beginning (for asc) or end (for desc)
-                if sort_by in ["id", "difficulty"]:
-                    return 0
-                return ""
-            return value
+    # presorted per column (app/sortindex.py), NULL last
+    results = sortindex.order(results, db, "quest", sort_by, sort_order.lower() == "desc", key=sort_key)
 
-        results.sort(key=sort_key, reverse=reverse)
-
-    total = len(results)
-    quests = results[skip : skip + limit]
+    total, quests = paginate(results, skip, limit)
 
     return_fields = [
         "id",
@@ -179,7 +174,7 @@ LEFT JOIN allData ad2
 
 @router.get("/{quest_id}", response_model=dict)
 def read_quest(quest_id: int, db: Session = Depends(get_db)):
-    return read_quest_core(quest_id, db)
+    return PayloadResponse(detail_payload(read_quest_core, quest_id, db))
 
 
 def read_quest_core(quest_id: int, db: Session = Depends(get_db)):
@@ -288,7 +283,7 @@ WHERE l.id = :quest_id;
         {"quest_id": quest_id},
     ).fetchone()
 
-    print(result)
+    logger.debug("quest %s row: %s", quest_id, result)
 
     return_fields = [
         "id",
@@ -338,26 +333,13 @@ WHERE l.id = :quest_id;
         for field in return_fields
         if field != "skills"
     }
-    ret["skills"] = json.loads(result.grouped_skills) if result.grouped_skills else []
-    ret["destination"] = (
-        json.loads(result.destination_json) if result.destination_json else None
-    )
-    ret["reward_items"] = (
-        json.loads(result.grouped_rewards) if result.grouped_rewards else []
-    )
-    ret["required_items"] = (
-        json.loads(result.grouped_required_items)
-        if result.grouped_required_items
-        else []
-    )
-    ret["discovery"] = (
-        json.loads(result.discovery_json) if result.discovery_json else None
-    )
-    ret["previous_continuous_quest"] = (
-        json.loads(result.previous_continuous_quest_json)
-        if result.previous_continuous_quest_json
-        else None
-    )
+    # json built by sqlite, passed through to the response undecoded
+    ret["skills"] = raw_json(result.grouped_skills) or []
+    ret["destination"] = raw_json(result.destination_json)
+    ret["reward_items"] = raw_json(result.grouped_rewards) or []
+    ret["required_items"] = raw_json(result.grouped_required_items) or []
+    ret["discovery"] = raw_json(result.discovery_json)
+    ret["previous_continuous_quest"] = raw_json(result.previous_continuous_quest_json)
 
     # handle preceding_discovery_quest. fetch data
     if ret["preceding_discovery_quest"]:
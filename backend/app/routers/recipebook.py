@@ -4,9 +4,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from pydantic import BaseModel
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
-router = APIRouter(prefix="/api/recipebooks", tags=["recipebooks"])
+router = APIRouter(prefix="/api/recipebooks", tags=["recipebooks"], route_class=ApiRoute)
 
 
 class RecipeBookResponse(BaseModel):
@@ -52,8 +54,7 @@ def read_recipebooks(
     if results and sort_by in results[0]:
         results.sort(key=lambda r: r.get(sort_by) or "", reverse=reverse)
 
-    total = len(results)
-    items = results[skip : skip + limit]
+    total, items = paginate(results, skip, limit)
 
     # convert items to list of dict
     fetch_field_list = [
@@ -81,7 +82,7 @@ def read_recipebooks(
 # -------------------------------
 @router.get("/{recipebook_id}", response_model=dict)
 def read_recipebook(recipebook_id: int, db: Session = Depends(get_db)):
-    return read_recipebook_core(recipebook_id, db)
+    return PayloadResponse(detail_payload(read_recipebook_core, recipebook_id, db))
 
 
 def read_recipebook_core(recipebook_id: int, db: Session = Depends(get_db)):
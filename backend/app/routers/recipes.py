@@ -1,12 +1,17 @@
+import logging
 from typing import List
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from .. import models
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
-router = APIRouter(prefix="/api/recipes", tags=["recipes"])
+router = APIRouter(prefix="/api/recipes", tags=["recipes"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=dict)
@@ -80,11 +85,10 @@ FROM recipe;
     # Sorting
     reverse = sort_order.lower() == "desc"
     if sort_by:
-        print(f"sort_by: {sort_by}, sort_order: {sort_order}")
+        logger.debug("sort_by: %s, sort_order: %s", sort_by, sort_order)
         results.sort(key=lambda r: getattr(r, sort_by) or "", reverse=reverse)
 
-    total = len(results)
-    items = results[skip : skip + limit]
+    total, items = paginate(results, skip, limit)
 
     return_fields = [
         "id",
@@ -129,7 +133,9 @@ FROM recipe;
                     else None
                 )
             except json.decoder.JSONDecodeError as e:
-                print(f"failed to parse {field}, value: {getattr(recipe, field)}")
+                logger.warning(
+                    "failed to parse %s, value: %s", field, getattr(recipe, field)
+                )
                 raise e
 
         ret_list.append(ret)
@@ -139,7 +145,7 @@ FROM recipe;
 
 @router.get("/{recipe_id}", response_model=dict)
 def read_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    return read_recipe_core(recipe_id, db)
+    return PayloadResponse(detail_payload(read_recipe_core, recipe_id, db))
 
 
 def read_recipe_core(recipe_id: int, db: Session = Depends(get_db)):
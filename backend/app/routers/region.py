@@ -3,10 +3,13 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
 from app.database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 from app import models
 import json
 
-router = APIRouter(prefix="/api/region", tags=["region"])
+router = APIRouter(prefix="/api/region", tags=["region"], route_class=ApiRoute)
 
 
 @router.get("/")
@@ -48,8 +51,7 @@ async def get_regions(
 
         results.sort(key=sort_key, reverse=reverse)
 
-    total = len(results)
-    items = results[skip : skip + limit]
+    total, items = paginate(results, skip, limit)
 
     # convert to dict
     fetch_field_list = ["id", "name"]
@@ -66,7 +68,7 @@ async def get_regions(
 
 @router.get("/{region_id}")
 async def get_region(region_id: int, db: Session = Depends(get_db)):
-    return get_region_core(region_id, db)
+    return PayloadResponse(detail_payload(get_region_core, region_id, db))
 
 
 def get_region_core(region_id: int, db: Session = Depends(get_db)):
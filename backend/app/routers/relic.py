@@ -1,9 +1,13 @@
+import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +16,8 @@ class RelicResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/relics", tags=["relics"])
+router = APIRouter(prefix="/api/relics", tags=["relics"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=RelicResponse)
@@ -45,8 +50,7 @@ def read_relics(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -67,7 +71,7 @@ def read_relics(
 
 @router.get("/{relic_id}", response_model=dict)
 def read_relic(relic_id: int, db: Session = Depends(get_db)):
-    return read_relic_core(relic_id, db)
+    return PayloadResponse(detail_payload(read_relic_core, relic_id, db))
 
 
 def read_relic_core(relic_id: int, db: Session):
@@ -93,7 +97,7 @@ def read_relic_core(relic_id: int, db: Session):
     # for each relic piece, add quest info if available
     for rp in ret['relic_pieces']:
         relic_piece_id = rp.get('relic_piece', {}).get('id')
-        print(f'relic piece id: {relic_piece_id}')
+        logger.debug("relic piece id: %s", relic_piece_id)
         if relic_piece_id:
             rp_query = text("SELECT quest FROM relicpiece WHERE id = :id")
             rp_result = db.execute(rp_query, {"id": relic_piece_id}).fetchone()
@@ -1,9 +1,13 @@
+import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +16,8 @@ class RelicPieceResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/relicpieces", tags=["relicpieces"])
+router = APIRouter(prefix="/api/relicpieces", tags=["relicpieces"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=RelicPieceResponse)
@@ -44,8 +49,7 @@ def read_relicpieces(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -67,7 +71,7 @@ def read_relicpieces(
 
 @router.get("/{relicpiece_id}", response_model=dict)
 def read_relicpiece(relicpiece_id: int, db: Session = Depends(get_db)):
-    return read_relicpiece_core(relicpiece_id, db)
+    return PayloadResponse(detail_payload(read_relicpiece_core, relicpiece_id, db))
 
 
 def read_relicpiece_core(relicpiece_id: int, db: Session):
@@ -90,7 +94,7 @@ def read_relicpiece_core(relicpiece_id: int, db: Session):
         except json.JSONDecodeError:
             ret["quest"] = None
 
-    print(f'relic piece id: {relicpiece_id}')
+    logger.debug("relic piece id: %s", relicpiece_id)
     # Find associated relic
     relic_query = text(''' 
 SELECT
@@ -104,13 +108,13 @@ JOIN json_each(r.relic_pieces) AS p
 ''')
     relic_result = db.execute(relic_query, {"relicpiece_id": relicpiece_id}).fetchone()
     if relic_result:
-        print('Associated relic found')
+        logger.debug("Associated relic found")
         relic_dict = dict(relic_result._mapping)
         if relic_dict.get("extraname"):
             relic_dict["name"] = f'{relic_dict["name"]} {relic_dict["extraname"]}'
         ret["associated_relic"] = relic_dict
     else:
-        print('No associated relic found')
+        logger.debug("No associated relic found")
         ret["associated_relic"] = None
 
     return ret
\ No newline at end of file
@@ -4,6 +4,10 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from .. import columnar, cursors
+from ..common import decode_json
+from ..instrumentation import record_list_result
 import json
 
 
@@ -28,7 +32,7 @@ class ResearchResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/researches", tags=["researches"])
+router = APIRouter(prefix="/api/researches", tags=["researches"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ResearchResponse)
@@ -55,22 +59,36 @@ def read_researches(
     count_query = f"SELECT COUNT(*) FROM ({query}) as sub"
     total = db.execute(text(count_query), params).scalar()
 
-    if sort_by in [
+    sortable = sort_by in [
         "id",
         "name",
         "description",
         "category",
         "building_level",
         "required_pages",
-    ]:
-        order = "DESC" if sort_order.lower() == "desc" else "ASC"
-        query += f" ORDER BY {sort_by} {order}"
+    ]
+    descending = sortable and sort_order.lower() == "desc"
+    # keyset page right after the ?cursor= row instead of skipping skip rows
+    query = cursors.where_after(query, bool(where_clauses), params, sort_by if sortable else "id", descending)
+    if cursors.after() is not None:
+        skip = 0
+    if sortable:
+        order = "DESC" if descending else "ASC"
+        query += f" ORDER BY {sort_by} {order}" + (", id" if sort_by != "id" else "")
+    else:
+        query += " ORDER BY id"
 
     query += " LIMIT :limit OFFSET :skip"
-    params["limit"] = limit
+    params["limit"] = limit + 1
     params["skip"] = skip
 
-    results = db.execute(text(query), params).fetchall()
+    cursor = db.execute(text(query), params)
+    if columnar.requested():
+        json_fields = {field: decode_json for field in ["major", "job", "research_actions", "rewards"]}
+        page = columnar.from_rows(list(cursor.keys()), cursors.trim(cursor.fetchall(), limit), total, json_fields)
+        record_list_result(total, len(page["rows"]))
+        return page
+    results = cursors.trim(cursor.fetchall(), limit)
     items = []
     for row in results:
         item_dict = dict(row._mapping)
@@ -82,6 +100,7 @@ def read_researches(
                     item_dict[field] = None
         items.append(item_dict)
 
+    record_list_result(total, len(items))
     return {"items": items, "total": total}
 
 
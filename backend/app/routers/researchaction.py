@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class ResearchActionResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/researchactions", tags=["researchactions"])
+router = APIRouter(prefix="/api/researchactions", tags=["researchactions"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ResearchActionResponse)
@@ -42,8 +45,7 @@ def read_researchactions(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -55,7 +57,7 @@ def read_researchactions(
 
 @router.get("/{researchaction_id}", response_model=dict)
 def read_researchaction(researchaction_id: int, db: Session = Depends(get_db)):
-    return read_researchaction_core(researchaction_id, db)
+    return PayloadResponse(detail_payload(read_researchaction_core, researchaction_id, db))
 
 
 def read_researchaction_core(researchaction_id: int, db: Session):
@@ -5,13 +5,15 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 class SailorEquipmentResponse(BaseModel):
     items: List[dict]
     total: int
 
-router = APIRouter(prefix="/api/sailorequipments", tags=["sailorequipments"])
+router = APIRouter(prefix="/api/sailorequipments", tags=["sailorequipments"], route_class=ApiRoute)
 
 @router.get("/", response_model=SailorEquipmentResponse)
 def read_sailorequipments(
@@ -54,14 +56,13 @@ def read_sailorequipments(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 @router.get("/{sailorequipment_id}", response_model=dict)
 def read_sailorequipment(sailorequipment_id: int, db: Session = Depends(get_db)):
-    return read_sailorequipment_core(sailorequipment_id, db)
+    return PayloadResponse(detail_payload(read_sailorequipment_core, sailorequipment_id, db))
 
 def read_sailorequipment_core(sailorequipment_id: int, db: Session):
     query = text("SELECT * FROM sailorequipment WHERE id = :id")
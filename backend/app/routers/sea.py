@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, json_valid_columns, paginate, raw_json
 import json
 
 
@@ -12,7 +15,7 @@ class SeaResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/seas", tags=["seas"])
+router = APIRouter(prefix="/api/seas", tags=["seas"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=SeaResponse)
@@ -59,8 +62,7 @@ def read_seas(
                 reverse=reverse,
             )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -82,12 +84,15 @@ def read_seas(
 
 @router.get("/{sea_id}", response_model=dict)
 def read_sea(sea_id: int, db: Session = Depends(get_db)):
-    return read_sea_core(sea_id, db)
+    return PayloadResponse(detail_payload(read_sea_core, sea_id, db))
 
 
 def read_sea_core(sea_id: int, db: Session = Depends(get_db)):
     result = db.execute(
-        text("SELECT * FROM sea WHERE id = :id"), {"id": sea_id}
+        text(
+            f"SELECT *, {json_valid_columns(['region', 'gatherable'])} FROM sea WHERE id = :id"
+        ),
+        {"id": sea_id},
     ).fetchone()
 
     if not result:
@@ -95,14 +100,9 @@ def read_sea_core(sea_id: int, db: Session = Depends(get_db)):
 
     sea = dict(result._mapping)
 
-    try:
-        sea["region"] = json.loads(sea["region"]) if sea["region"] else None
-    except (json.JSONDecodeError, TypeError):
-        sea["region"] = None
-    try:
-        sea["gatherable"] = json.loads(sea["gatherable"]) if sea["gatherable"] else None
-    except (json.JSONDecodeError, TypeError):
-        sea["gatherable"] = None
+    for field in ["region", "gatherable"]:
+        valid = sea.pop(f"{field}__valid")
+        sea[field] = raw_json(sea[field]) if isinstance(sea[field], str) and valid else None
 
     # Parse boundary
     if sea["boundary"]:
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class ShipBaseMaterialResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/shipbasematerials", tags=["shipbasematerials"])
+router = APIRouter(prefix="/api/shipbasematerials", tags=["shipbasematerials"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ShipBaseMaterialResponse)
@@ -55,8 +58,7 @@ def read_shipbasematerials(
                 reverse=(sort_order.lower() == "desc"),
             )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
@@ -71,7 +73,7 @@ def extract_numeric_value(value):
 
 @router.get("/{shipbasematerial_id}", response_model=dict)
 def read_shipbasematerial(shipbasematerial_id: int, db: Session = Depends(get_db)):
-    return read_shipbasematerial_core(shipbasematerial_id, db)
+    return PayloadResponse(detail_payload(read_shipbasematerial_core, shipbasematerial_id, db))
 
 
 def read_shipbasematerial_core(shipbasematerial_id: int, db: Session):
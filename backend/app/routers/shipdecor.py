@@ -4,8 +4,10 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
 import json
-from ..common import fetch_all_obtain_methods
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 
 class ShipDecorResponse(BaseModel):
@@ -13,7 +15,7 @@ class ShipDecorResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/shipdecors", tags=["shipdecors"])
+router = APIRouter(prefix="/api/shipdecors", tags=["shipdecors"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ShipDecorResponse)
@@ -68,8 +70,7 @@ def read_shipdecors(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -83,7 +84,7 @@ def read_shipdecors(
 
 @router.get("/{shipdecor_id}", response_model=dict)
 def read_shipdecor(shipdecor_id: int, db: Session = Depends(get_db)):
-    return read_shipdecor_core(shipdecor_id, db)
+    return PayloadResponse(detail_payload(read_shipdecor_core, shipdecor_id, db))
 
 
 def read_shipdecor_core(shipdecor_id: int, db: Session):
@@ -4,9 +4,11 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
 import json
 import re
-from ..common import fetch_all_obtain_methods
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 
 class ShipMaterialResponse(BaseModel):
@@ -14,7 +16,7 @@ class ShipMaterialResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/shipmaterials", tags=["shipmaterials"])
+router = APIRouter(prefix="/api/shipmaterials", tags=["shipmaterials"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ShipMaterialResponse)
@@ -67,8 +69,7 @@ def read_shipmaterials(
                 reverse=(sort_order.lower() == "desc"),
             )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -82,7 +83,7 @@ def read_shipmaterials(
 
 @router.get("/{shipmaterial_id}", response_model=dict)
 def read_shipmaterial(shipmaterial_id: int, db: Session = Depends(get_db)):
-    return read_shipmaterial_core(shipmaterial_id, db)
+    return PayloadResponse(detail_payload(read_shipmaterial_core, shipmaterial_id, db))
 
 
 def read_shipmaterial_core(shipmaterial_id: int, db: Session):
@@ -3,12 +3,89 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import asc, desc, text
 from app.database import get_db
-from app import models
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from app import columnar, facets, models, sortindex
+from ..common import (
+    decode_json,
+    detail_payload,
+    fetch_all_obtain_methods,
+    json_valid_columns,
+    list_projection,
+    paginate,
+    passthrough_json,
+)
 import json
 
 
-router = APIRouter(prefix="/api/ships", tags=["ships"])
+router = APIRouter(prefix="/api/ships", tags=["ships"], route_class=ApiRoute)
+
+
+# list view columns, name -> sql expression
+SHIP_LIST_COLUMNS = {
+    "id": "id",
+    "name": "name",
+    "extraname": "extraname",
+    "required_levels": "required_levels",
+    "required_levels_adventure": "json_extract(required_levels, '$.adventure')",
+    "required_levels_trade": "json_extract(required_levels, '$.trade')",
+    "required_levels_battle": "json_extract(required_levels, '$.battle')",
+    "base_material": "base_material",
+    "upgrade_count": "upgrade_count",
+    "capacity": "capacity",
+    "capacity_cabin": "json_extract(capacity, '$.cabin')",
+    "capacity_required_crew": "json_extract(capacity, '$.required_crew')",
+    "capacity_gunport": "json_extract(capacity, '$.gunport')",
+    "capacity_cargo": "json_extract(capacity, '$.cargo')",
+    "category": "category",
+    "category_purpose": "json_extract(category, '$.purpose')",
+    "category_size": "json_extract(category, '$.size')",
+    "category_propulsion": "json_extract(category, '$.propulsion')",
+    "base_performance": "base_performance",
+    "base_performance_durability": "json_extract(base_performance, '$.durability')",
+    "base_performance_vertical_sail": "json_extract(base_performance, '$.vertical_sail')",
+    "base_performance_horizontal_sail": "json_extract(base_performance, '$.horizontal_sail')",
+    "base_performance_rowing_power": "json_extract(base_performance, '$.rowing_power')",
+    "base_performance_maneuverability": "json_extract(base_performance, '$.maneuverability')",
+    "base_performance_wave_resistance": "json_extract(base_performance, '$.wave_resistance')",
+    "base_performance_armor": "json_extract(base_performance, '$.armor')",
+    "improvement_limit": "improvement_limit",
+    # max limit
+    "max_durability": (
+        "json_extract(base_performance, '$.durability') + json_extract(improvement_limit, '$.durability')"
+    ),
+    "max_vertical_sail": (
+        "json_extract(base_performance, '$.vertical_sail') + json_extract(improvement_limit, '$.vertical_sail')"
+    ),
+    "max_horizontal_sail": (
+        "json_extract(base_performance, '$.horizontal_sail') + json_extract(improvement_limit, '$.horizontal_sail')"
+    ),
+    "max_rowing_power": (
+        "json_extract(base_performance, '$.rowing_power') + json_extract(improvement_limit, '$.rowing_power')"
+    ),
+    "max_maneuverability": (
+        "json_extract(base_performance, '$.maneuverability') + json_extract(improvement_limit, '$.maneuverability')"
+    ),
+    "max_wave_resistance": (
+        "json_extract(base_performance, '$.wave_resistance') + json_extract(improvement_limit, '$.wave_resistance')"
+    ),
+    "max_armor": (
+        "json_extract(base_performance, '$.armor') + json_extract(improvement_limit, '$.armor')"
+    ),
+    "max_cabin": "json_extract(capacity, '$.cabin') + json_extract(improvement_limit, '$.cabin')",
+    "max_gunport": (
+        "json_extract(capacity, '$.gunport') + json_extract(improvement_limit, '$.gunport')"
+    ),
+    "max_cargo": "json_extract(capacity, '$.cargo') + json_extract(improvement_limit, '$.cargo')",
+    # custom metric
+    "max_sum_sail": (
+        "json_extract(base_performance, '$.vertical_sail') + json_extract(improvement_limit, '$.vertical_sail') + json_extract(base_performance, '$.horizontal_sail') + json_extract(improvement_limit, '$.horizontal_sail')"
+    ),
+    "max_sum_sail_row_power": (
+        "json_extract(base_performance, '$.vertical_sail') + json_extract(improvement_limit, '$.vertical_sail') + json_extract(base_performance, '$.horizontal_sail') + json_extract(improvement_limit, '$.horizontal_sail') + json_extract(base_performance, '$.rowing_power') + json_extract(improvement_limit, '$.rowing_power')"
+    ),
+    "ship_skills": "ship_skills",
+}
 
 
 @router.get("/", response_model=Dict[str, Any])
@@ -30,57 +107,18 @@ def read_ships(
     ),
     sort_by: str = Query("id", description="Column to sort by"),
     sort_order: str = Query("desc", description="Sort order (asc or desc)"),
+    facet_counts: bool = Query(False, description="Add the matches per filter value under the other filters"),
     db: Session = Depends(get_db),
 ):
 
     query_parts = []
     params = {}
 
-    select_clause = """
-                SELECT
-                    id,
-                    name,
-                    extraname,
-                    required_levels,
-                    json_extract(required_levels, '$.adventure') AS required_levels_adventure,
-                    json_extract(required_levels, '$.trade') AS required_levels_trade,
-                    json_extract(required_levels, '$.battle') AS required_levels_battle,
-                    base_material,
-                    upgrade_count,
-                    capacity,
-                    json_extract(capacity, '$.cabin') AS capacity_cabin,
-                    json_extract(capacity, '$.required_crew') AS capacity_required_crew,
-                    json_extract(capacity, '$.gunport') AS capacity_gunport,
-                    json_extract(capacity, '$.cargo') AS capacity_cargo,
-                    category,
-                    json_extract(category, '$.purpose') AS category_purpose,
-                    json_extract(category, '$.size') AS category_size,
-                    json_extract(category, '$.propulsion') AS category_propulsion,
-                    base_performance,
-                    json_extract(base_performance, '$.durability') AS base_performance_durability,
-                    json_extract(base_performance, '$.vertical_sail') AS base_performance_vertical_sail,
-                    json_extract(base_performance, '$.horizontal_sail') AS base_performance_horizontal_sail,
-                    json_extract(base_performance, '$.rowing_power') AS base_performance_rowing_power,
-                    json_extract(base_performance, '$.maneuverability') AS base_performance_maneuverability,
-                    json_extract(base_performance, '$.wave_resistance') AS base_performance_wave_resistance,
-                    json_extract(base_performance, '$.armor') AS base_performance_armor,
-                    improvement_limit,
-                    -- max limit
-                    json_extract(base_performance, '$.durability') + json_extract(improvement_limit, '$.durability') AS max_durability,
-                    json_extract(base_performance, '$.vertical_sail') + json_extract(improvement_limit, '$.vertical_sail') AS max_vertical_sail,
-                    json_extract(base_performance, '$.horizontal_sail') + json_extract(improvement_limit, '$.horizontal_sail') AS max_horizontal_sail,
-                    json_extract(base_performance, '$.rowing_power') + json_extract(improvement_limit, '$.rowing_power') AS max_rowing_power,
-                    json_extract(base_performance, '$.maneuverability') + json_extract(improvement_limit, '$.maneuverability') AS max_maneuverability,
-                    json_extract(base_performance, '$.wave_resistance') + json_extract(improvement_limit, '$.wave_resistance') AS max_wave_resistance,
-                    json_extract(base_performance, '$.armor') + json_extract(improvement_limit, '$.armor') AS max_armor,
-                    json_extract(capacity, '$.cabin') + json_extract(improvement_limit, '$.cabin') AS max_cabin,
-                    json_extract(capacity, '$.gunport') + json_extract(improvement_limit, '$.gunport') AS max_gunport,
-                    json_extract(capacity, '$.cargo') + json_extract(improvement_limit, '$.cargo') AS max_cargo,
-                    -- custom metric
-                    json_extract(base_performance, '$.vertical_sail') + json_extract(improvement_limit, '$.vertical_sail') + json_extract(base_performance, '$.horizontal_sail') + json_extract(improvement_limit, '$.horizontal_sail') as max_sum_sail ,
-                    json_extract(base_performance, '$.vertical_sail') + json_extract(improvement_limit, '$.vertical_sail') + json_extract(base_performance, '$.horizontal_sail') + json_extract(improvement_limit, '$.horizontal_sail') + json_extract(base_performance, '$.rowing_power') + json_extract(improvement_limit, '$.rowing_power') as max_sum_sail_row_power,
-                    ship_skills
-                FROM ship    """
+    # only the requested fields (?fields=) and what filtering and sorting need
+    select_clause = (
+        f"SELECT {list_projection(SHIP_LIST_COLUMNS, sort_by, 'ship_skills' if ship_skill_search else None)} "
+        "FROM ship"
+    )
 
     query_parts.append(select_clause)
     where_clauses = []
@@ -88,41 +126,14 @@ def read_ships(
         where_clauses.append("(name LIKE :name_search OR extraname LIKE :name_search)")
         params["name_search"] = f"%{name_search}%"
 
-    if purpose_search:
-        purposes = purpose_search.split(",")
-        purpose_conditions = [
-            f"json_extract(category, '$.purpose') = :purpose_{i}"
-            for i in range(len(purposes))
-        ]
-        where_clauses.append(f"({' OR '.join(purpose_conditions)})")
-        for i, purpose in enumerate(purposes):
-            params[f"purpose_{i}"] = purpose
-
-    if size_search:
-        sizes = size_search.split(",")
-        size_conditions = [
-            f"json_extract(category, '$.size') = :size_{i}" for i in range(len(sizes))
-        ]
-        where_clauses.append(f"({' OR '.join(size_conditions)})")
-        for i, size in enumerate(sizes):
-            params[f"size_{i}"] = size
-
-    if propulsion_search:
-        propulsions = propulsion_search.split(",")
-        propulsion_conditions = [
-            f"json_extract(category, '$.propulsion') = :propulsion_{i}"
-            for i in range(len(propulsions))
-        ]
-        where_clauses.append(f"({' OR '.join(propulsion_conditions)})")
-        for i, propulsion in enumerate(propulsions):
-            params[f"propulsion_{i}"] = propulsion
-
     if where_clauses:
         query_parts.append("WHERE " + " AND ".join(where_clauses))
 
     query = " ".join(query_parts)
 
-    results = db.execute(text(query), params).fetchall()
+    cursor = db.execute(text(query), params)
+    columns = list(cursor.keys())
+    results = cursor.fetchall()
 
     if ship_skill_search:
         skill_terms = [s.strip() for s in ship_skill_search.split(",")]
@@ -140,92 +151,71 @@ def read_ships(
                 filtered_results.append(row)
         results = filtered_results
 
-    # Convert Row objects to dict for easier filtering and manipulation
-    results = [dict(row._mapping) for row in results]
-
+    # purpose / size / propulsion through the facet bitmaps (app/facets.py)
+    filter_values = {
+        "purpose_search": purpose_search,
+        "size_search": size_search,
+        "propulsion_search": propulsion_search,
+    }
+    mask = facets.match(db, "ship", filter_values)
+    counts = facets.counts(db, "ship", filter_values, results) if facet_counts else None
     if sort_by:
-
-        def get_sort_key(row):
-            value = row.get(sort_by, None)
-            if value is None:
-                if sort_by in [
-                    "id",
-                    "required_levels_adventure",
-                    "required_levels_trade",
-                    "required_levels_battle",
-                    "capacity_cabin",
-                    "capacity_required_crew",
-                    "capacity_gunport",
-                    "capacity_cargo",
-                    "category_purpose",
-                    "category_size",
-                    "category_propulsion",
-                    "base_performance_durability",
-                    "base_performance_vertical_sail",
-                    "base_performance_horizontal_sail",
-                    "base_performance_rowing_power",
-                    "base_performance_maneuverability",
-                    "base_performance_wave_resistance",
-                    "base_performance_armor",
-                    "improvement_limit_durability",
-                    "improvement_limit_vertical_sail",
-                    "improvement_limit_horizontal_sail",
-                    "improvement_limit_rowing_power",
-                    "improvement_limit_maneuverability",
-                    "improvement_limit_wave_resistance",
-                    "improvement_limit_armor",
-                    "improvement_limit_cabin",
-                    "improvement_limit_gunport",
-                    "improvement_limit_cargo",
-                    "max_durability",
-                    "max_vertical_sail",
-                    "max_horizontal_sail",
-                    "max_rowing_power",
-                    "max_maneuverability",
-                    "max_wave_resistance",
-                    "max_armor",
-                    "max_cabin",
-                    "max_gunport",
-                    "max_cargo",
-                    "max_sum_sail",
-                    "max_sum_sail_row_power",
-                ]:
-                    return -1  # Treat None as less than any number
-                else:
-                    return ""  # Treat None as less than any string
-            else:
-                return value
-
-        results.sort(
-            key=get_sort_key,
-            reverse=(sort_order.lower() == "desc"),
+        # presorted per column (app/sortindex.py), NULL last
+        results = sortindex.order(
+            results, db, "ship", sort_by, sort_order.lower() == "desc", SHIP_LIST_COLUMNS.get(sort_by), mask
         )
+    else:
+        results = facets.keep(results, db, "ship", mask)
+
+    total, paginated_results = paginate(results, skip, limit)
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    # Parse JSON fields for list view
+    convert = {"base_material": decode_json, "upgrade_count": decode_json}
+    if columnar.requested():
+        ret = columnar.from_rows(columns, paginated_results, total, convert)
+        if counts is not None:
+            ret["facets"] = counts
+        return ret
 
     items = []
     for row in paginated_results:
-        item_dict = dict(row)
-        # Parse JSON fields for list view
-        for field in ["base_material", "upgrade_count"]:
-            if item_dict.get(field) and isinstance(item_dict[field], str):
-                try:
-                    item_dict[field] = json.loads(item_dict[field])
-                except json.JSONDecodeError:
-                    item_dict[field] = None
+        item_dict = dict(row._mapping)
+        for field, decode in convert.items():
+            if field in item_dict:
+                item_dict[field] = decode(item_dict[field])
         items.append(item_dict)
 
-    return {"items": items, "total": total}
+    ret = {"items": items, "total": total}
+    if counts is not None:
+        ret["facets"] = counts
+    return ret
 
 
 @router.get("/{ship_id}", response_model=dict)
 def read_ship(ship_id: int, db: Session = Depends(get_db)):
-    return read_ship_core(ship_id, db)
+    return PayloadResponse(detail_payload(read_ship_core, ship_id, db))
+
+
+# json text columns of the detail, passed through to the response undecoded
+SHIP_JSON_FIELDS = [
+    "required_levels",
+    "base_material",
+    "upgrade_count",
+    "build_info",
+    "base_performance",
+    "capacity",
+    "improvement_limit",
+    "ship_parts",
+    "ship_skills",
+    "ship_deco",
+    "special_build_cities",
+    "standard_build_cities",
+    "category",
+]
 
 
 def read_ship_core(ship_id: int, db: Session):
-    query = text("SELECT * FROM ship WHERE id = :id")
+    query = text(f"SELECT *, {json_valid_columns(SHIP_JSON_FIELDS)} FROM ship WHERE id = :id")
     result = db.execute(query, {"id": ship_id}).fetchone()
 
     if result is None:
@@ -237,27 +227,7 @@ def read_ship_core(ship_id: int, db: Session):
     if ret.get("extraname"):
         ret["name"] = f"{ret['name']} {ret['extraname']}"
 
-    # Parse JSON fields
-    for field in [
-        "required_levels",
-        "base_material",
-        "upgrade_count",
-        "build_info",
-        "base_performance",
-        "capacity",
-        "improvement_limit",
-        "ship_parts",
-        "ship_skills",
-        "ship_deco",
-        "special_build_cities",
-        "standard_build_cities",
-        "category",
-    ]:
-        if ret.get(field) and isinstance(ret[field], str):
-            try:
-                ret[field] = json.loads(ret[field])
-            except json.JSONDecodeError:
-                ret[field] = None
+    passthrough_json(ret, SHIP_JSON_FIELDS)
 
     obtain_method_list = fetch_all_obtain_methods(ship_id, db)
     if obtain_method_list:
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class ShipSkillResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/shipskills", tags=["shipskills"])
+router = APIRouter(prefix="/api/shipskills", tags=["shipskills"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=ShipSkillResponse)
@@ -43,8 +46,7 @@ def read_shipskills(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -65,7 +67,7 @@ def read_shipskills(
 
 @router.get("/{shipskill_id}", response_model=dict)
 def read_shipskill(shipskill_id: int, db: Session = Depends(get_db)):
-    return read_shipskill_core(shipskill_id, db)
+    return PayloadResponse(detail_payload(read_shipskill_core, shipskill_id, db))
 
 
 def read_shipskill_core(shipskill_id: int, db: Session):
@@ -1,12 +1,16 @@
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc
-from .. import models
+from sqlalchemy import asc, desc, text
+from .. import cursors, models
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload
+from ..instrumentation import record_list_result
 import json
 
-router = APIRouter(prefix="/api/shipwrecks", tags=["shipwrecks"])
+router = APIRouter(prefix="/api/shipwrecks", tags=["shipwrecks"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=Dict[str, Any])
@@ -25,13 +29,23 @@ def read_shipwrecks(
 
     total = query.count()
 
-    if hasattr(models.Shipwreck, sort_by):
+    sortable = hasattr(models.Shipwreck, sort_by)
+    if cursors.after() is not None:
+        # keyset page right after the ?cursor= row instead of skipping skip rows
+        column = sort_by if sortable and sort_by in models.Shipwreck.__table__.columns else "id"
+        keyset, keyset_params = cursors.keyset_where(column, sortable and sort_order.lower() != "asc")
+        query = query.filter(text(keyset).bindparams(**keyset_params))
+        skip = 0
+
+    if sortable:
         if sort_order.lower() == "asc":
             query = query.order_by(asc(sort_by))
         else:
             query = query.order_by(desc(sort_by))
+    query = query.order_by(models.Shipwreck.id)
 
-    shipwrecks = query.offset(skip).limit(limit).all()
+    shipwrecks = cursors.trim(query.offset(skip).limit(limit + 1).all(), limit)
+    record_list_result(total, len(shipwrecks))
 
     return_fields = [
         "id",
@@ -82,7 +96,7 @@ def read_shipwrecks(
 
 @router.get("/{shipwreck_id}", response_model=dict)
 def read_shipwreck(shipwreck_id: int, db: Session = Depends(get_db)):
-    return read_shipwreck_core(shipwreck_id, db)
+    return PayloadResponse(detail_payload(read_shipwreck_core, shipwreck_id, db))
 
 
 def read_shipwreck_core(shipwreck_id: int, db: Session = Depends(get_db)):
@@ -4,6 +4,10 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from .. import columnar, cursors
+from ..common import decode_json
+from ..instrumentation import record_list_result
 import json
 
 
@@ -30,7 +34,7 @@ class SkillResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/skills", tags=["skills"])
+router = APIRouter(prefix="/api/skills", tags=["skills"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=SkillResponse)
@@ -59,16 +63,30 @@ def read_skills(
     total = db.execute(text(count_query), params).scalar()
 
     # Add sorting
-    if sort_by in ["id", "name"]:
-        order = "DESC" if sort_order.lower() == "desc" else "ASC"
-        query += f" ORDER BY {sort_by} {order}"
+    sortable = sort_by in ["id", "name"]
+    descending = sortable and sort_order.lower() == "desc"
+    # keyset page right after the ?cursor= row instead of skipping skip rows
+    query = cursors.where_after(query, bool(where_clauses), params, sort_by if sortable else "id", descending)
+    if cursors.after() is not None:
+        skip = 0
+    if sortable:
+        order = "DESC" if descending else "ASC"
+        query += f" ORDER BY {sort_by} {order}" + (", id" if sort_by != "id" else "")
+    else:
+        query += " ORDER BY id"
 
     # Add pagination
     query += " LIMIT :limit OFFSET :skip"
-    params["limit"] = limit
+    params["limit"] = limit + 1
     params["skip"] = skip
 
-    results = db.execute(text(query), params).fetchall()
+    cursor = db.execute(text(query), params)
+    if columnar.requested():
+        json_fields = {field: decode_json for field in ["acquire_requirement", "refinement_effect"]}
+        page = columnar.from_rows(list(cursor.keys()), cursors.trim(cursor.fetchall(), limit), total, json_fields)
+        record_list_result(total, len(page["rows"]))
+        return page
+    results = cursors.trim(cursor.fetchall(), limit)
 
     # Convert Row objects to dict for easier filtering and manipulation
     items = []
@@ -82,6 +100,7 @@ def read_skills(
                     item_dict[field] = None
         items.append(item_dict)
 
+    record_list_result(total, len(items))
     return {"items": items, "total": total}
 
 
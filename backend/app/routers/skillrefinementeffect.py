@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from .. import columnar, cursors
+from ..instrumentation import record_list_result
 
 
 class SkillRefinementEffect(BaseModel):
@@ -22,7 +25,9 @@ class SkillRefinementEffectResponse(BaseModel):
 
 
 router = APIRouter(
-    prefix="/api/skillrefinementeffects", tags=["skillrefinementeffects"]
+    prefix="/api/skillrefinementeffects",
+    tags=["skillrefinementeffects"],
+    route_class=ApiRoute,
 )
 
 
@@ -50,17 +55,31 @@ def read_skillrefinementeffects(
     count_query = f"SELECT COUNT(*) FROM ({query}) as sub"
     total = db.execute(text(count_query), params).scalar()
 
-    if sort_by in ["id", "name", "description", "action_power"]:
-        order = "DESC" if sort_order.lower() == "desc" else "ASC"
-        query += f" ORDER BY {sort_by} {order}"
+    sortable = sort_by in ["id", "name", "description", "action_power"]
+    descending = sortable and sort_order.lower() == "desc"
+    # keyset page right after the ?cursor= row instead of skipping skip rows
+    query = cursors.where_after(query, bool(where_clauses), params, sort_by if sortable else "id", descending)
+    if cursors.after() is not None:
+        skip = 0
+    if sortable:
+        order = "DESC" if descending else "ASC"
+        query += f" ORDER BY {sort_by} {order}" + (", id" if sort_by != "id" else "")
+    else:
+        query += " ORDER BY id"
 
     query += " LIMIT :limit OFFSET :skip"
-    params["limit"] = limit
+    params["limit"] = limit + 1
     params["skip"] = skip
 
-    results = db.execute(text(query), params).fetchall()
+    cursor = db.execute(text(query), params)
+    if columnar.requested():
+        page = columnar.from_rows(list(cursor.keys()), cursors.trim(cursor.fetchall(), limit), total)
+        record_list_result(total, len(page["rows"]))
+        return page
+    results = cursors.trim(cursor.fetchall(), limit)
     items = [dict(row._mapping) for row in results]
 
+    record_list_result(total, len(items))
     return {"items": items, "total": total}
 
 
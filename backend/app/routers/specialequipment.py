@@ -4,13 +4,15 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 class SpecialEquipmentResponse(BaseModel):
     items: List[dict]
     total: int
 
-router = APIRouter(prefix="/api/specialequipments", tags=["specialequipments"])
+router = APIRouter(prefix="/api/specialequipments", tags=["specialequipments"], route_class=ApiRoute)
 
 @router.get("/", response_model=SpecialEquipmentResponse)
 def read_specialequipments(
@@ -45,14 +47,13 @@ def read_specialequipments(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 @router.get("/{specialequipment_id}", response_model=dict)
 def read_specialequipment(specialequipment_id: int, db: Session = Depends(get_db)):
-    return read_specialequipment_core(specialequipment_id, db)
+    return PayloadResponse(detail_payload(read_specialequipment_core, specialequipment_id, db))
 
 def read_specialequipment_core(specialequipment_id: int, db: Session):
     query = text("SELECT * FROM specialequipment WHERE id = :id")
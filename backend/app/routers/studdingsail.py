@@ -4,13 +4,15 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
-from ..common import fetch_all_obtain_methods
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 class StuddingSailResponse(BaseModel):
     items: List[dict]
     total: int
 
-router = APIRouter(prefix="/api/studdingsails", tags=["studdingsails"])
+router = APIRouter(prefix="/api/studdingsails", tags=["studdingsails"], route_class=ApiRoute)
 
 @router.get("/", response_model=StuddingSailResponse)
 def read_studdingsails(
@@ -50,14 +52,13 @@ def read_studdingsails(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     return {"items": paginated_results, "total": total}
 
 @router.get("/{studdingsail_id}", response_model=dict)
 def read_studdingsail(studdingsail_id: int, db: Session = Depends(get_db)):
-    return read_studdingsail_core(studdingsail_id, db)
+    return PayloadResponse(detail_payload(read_studdingsail_core, studdingsail_id, db))
 
 def read_studdingsail_core(studdingsail_id: int, db: Session):
     query = text("SELECT * FROM studdingsail WHERE id = :id")
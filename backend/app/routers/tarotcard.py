@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class TarotCardResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/tarotcards", tags=["tarotcards"])
+router = APIRouter(prefix="/api/tarotcards", tags=["tarotcards"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=TarotCardResponse)
@@ -50,8 +53,7 @@ def read_tarotcards(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -63,7 +65,7 @@ def read_tarotcards(
 
 @router.get("/{tarotcard_id}", response_model=dict)
 def read_tarotcard(tarotcard_id: int, db: Session = Depends(get_db)):
-    return read_tarotcard_core(tarotcard_id, db)
+    return PayloadResponse(detail_payload(read_tarotcard_core, tarotcard_id, db))
 
 
 def read_tarotcard_core(tarotcard_id: int, db: Session):
@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class TechniqueResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/techniques", tags=["techniques"])
+router = APIRouter(prefix="/api/techniques", tags=["techniques"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=TechniqueResponse)
@@ -45,8 +48,7 @@ def read_techniques(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -71,7 +73,7 @@ def read_techniques(
 
 @router.get("/{technique_id}", response_model=dict)
 def read_technique(technique_id: int, db: Session = Depends(get_db)):
-    return read_technique_core(technique_id, db)
+    return PayloadResponse(detail_payload(read_technique_core, technique_id, db))
 
 
 def read_technique_core(technique_id: int, db: Session):
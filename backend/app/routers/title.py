@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class TitleResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/titles", tags=["titles"])
+router = APIRouter(prefix="/api/titles", tags=["titles"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=TitleResponse)
@@ -42,8 +45,7 @@ def read_titles(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -66,7 +68,7 @@ def read_titles(
 
 @router.get("/{title_id}", response_model=dict)
 def read_title(title_id: int, db: Session = Depends(get_db)):
-    return read_title_core(title_id, db)
+    return PayloadResponse(detail_payload(read_title_core, title_id, db))
 
 
 def read_title_core(title_id: int, db: Session):
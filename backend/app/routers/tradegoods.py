@@ -1,22 +1,29 @@
-from typing import List, Optional
+import logging
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
+from .. import facets
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
 import json
-from ..common import fetch_all_obtain_methods
+from ..common import detail_payload, fetch_all_obtain_methods, paginate
 
 
 class TradegoodResponse(BaseModel):
     items: List[dict]
     total: int
+    # matches per filter value, with ?facet_counts=true (app/facets.py)
+    facets: Optional[Dict[str, Dict[str, int]]] = None
 
 
-router = APIRouter(prefix="/api/tradegoods", tags=["tradegoods"])
+router = APIRouter(prefix="/api/tradegoods", tags=["tradegoods"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
-@router.get("/", response_model=TradegoodResponse)
+@router.get("/", response_model=TradegoodResponse, response_model_exclude_unset=True)
 def read_tradegoods(
     skip: int = Query(0, description="Skip first N records"),
     limit: int = Query(10, description="Limit the number of records returned"),
@@ -26,6 +33,7 @@ def read_tradegoods(
     ),
     sort_by: str = Query("id", description="Column to sort by"),
     sort_order: str = Query("asc", description="Sort order (asc or desc)"),
+    facet_counts: bool = Query(False, description="Add the matches per filter value under the other filters"),
     db: Session = Depends(get_db),
 ):
     """
@@ -40,15 +48,10 @@ def read_tradegoods(
     if name_search:
         results = [row for row in results if name_search.lower() in row.name.lower()]
 
-    if classification_search:
-        term_list = classification_search.split(",")
-        print(term_list)
-        filtered = []
-        for row in results:
-            if row.classification and row.classification in term_list:
-                filtered.append(row)
-
-        results = filtered
+    # classification through the facet bitmaps (app/facets.py)
+    filter_values = {"classification_search": classification_search}
+    counts = facets.counts(db, "tradegoods", filter_values, results) if facet_counts else None
+    results = facets.keep(results, db, "tradegoods", facets.match(db, "tradegoods", filter_values))
 
     # Sorting logic
     if sort_by:
@@ -57,8 +60,7 @@ def read_tradegoods(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     # Process results to handle JSON in 'culture'
     items = []
@@ -72,12 +74,15 @@ def read_tradegoods(
                 pass
         items.append(item_dict)
 
-    return {"items": items, "total": total}
+    ret = {"items": items, "total": total}
+    if counts is not None:
+        ret["facets"] = counts
+    return ret
 
 
 @router.get("/{tradegood_id}", response_model=dict)
 def read_tradegood(tradegood_id: int, db: Session = Depends(get_db)):
-    return read_tradegood_core(tradegood_id, db)
+    return PayloadResponse(detail_payload(read_tradegood_core, tradegood_id, db))
 
 
 def read_tradegood_core(tradegood_id: int, db: Session = Depends(get_db)):
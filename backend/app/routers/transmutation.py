@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +15,7 @@ class TransmutationResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/transmutations", tags=["transmutations"])
+router = APIRouter(prefix="/api/transmutations", tags=["transmutations"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=TransmutationResponse)
@@ -70,8 +73,7 @@ def read_transmutations(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -85,7 +87,7 @@ def read_transmutations(
 
 @router.get("/{transmutation_id}", response_model=dict)
 def read_transmutation(transmutation_id: int, db: Session = Depends(get_db)):
-    return read_transmutation_core(transmutation_id, db)
+    return PayloadResponse(detail_payload(read_transmutation_core, transmutation_id, db))
 
 
 def read_transmutation_core(transmutation_id: int, db: Session):
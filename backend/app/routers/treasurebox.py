@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 from collections import defaultdict
 import json
 
@@ -13,7 +16,7 @@ class TreasureboxResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/treasurebox", tags=["treasurebox"])
+router = APIRouter(prefix="/api/treasurebox", tags=["treasurebox"], route_class=ApiRoute)
 
 
 @router.get("/", response_model=TreasureboxResponse)
@@ -44,8 +47,7 @@ def read_treasureboxes(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     # Process results to handle JSON in 'culture'
     items = []
@@ -58,7 +60,7 @@ def read_treasureboxes(
 
 @router.get("/{treasurebox_id}", response_model=dict)
 def read_treasurebox(treasurebox_id: int, db: Session = Depends(get_db)):
-    return read_treasurebox_core(treasurebox_id, db)
+    return PayloadResponse(detail_payload(read_treasurebox_core, treasurebox_id, db))
 
 
 def read_treasurebox_core(treasurebox_id: int, db: Session = Depends(get_db)):
@@ -1,9 +1,13 @@
+import logging
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from sqlalchemy import text
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate
 import json
 
 
@@ -12,7 +16,8 @@ class TreasureHuntThemeResponse(BaseModel):
     total: int
 
 
-router = APIRouter(prefix="/api/treasurehuntthemes", tags=["treasurehuntthemes"])
+router = APIRouter(prefix="/api/treasurehuntthemes", tags=["treasurehuntthemes"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=TreasureHuntThemeResponse)
@@ -32,7 +37,7 @@ def read_treasurehuntthemes(
     results = [dict(row._mapping) for row in results]
 
     for row in results:
-        print(row.get('requirements'))
+        logger.debug("requirements: %s", row.get("requirements"))
         req_list = json.loads(row.get('requirements')) if row.get('requirements') is not None else None
         if not req_list:
             row['historical_event'] = None
@@ -64,8 +69,7 @@ def read_treasurehuntthemes(
             reverse=(sort_order.lower() == "desc"),
         )
 
-    total = len(results)
-    paginated_results = results[skip : skip + limit]
+    total, paginated_results = paginate(results, skip, limit)
 
     items = []
     for row in paginated_results:
@@ -82,7 +86,7 @@ def read_treasurehuntthemes(
 
 @router.get("/{treasurehunttheme_id}", response_model=dict)
 def read_treasurehunttheme(treasurehunttheme_id: int, db: Session = Depends(get_db)):
-    return read_treasurehunttheme_core(treasurehunttheme_id, db)
+    return PayloadResponse(detail_payload(read_treasurehunttheme_core, treasurehunttheme_id, db))
 
 
 def read_treasurehunttheme_core(treasurehunttheme_id: int, db: Session):
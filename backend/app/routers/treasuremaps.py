@@ -1,12 +1,17 @@
+import logging
 from typing import List, Dict, Any
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import asc, desc, text
-from .. import models
+from .. import facets, models, sortindex
 from ..database import get_db
+from ..routing import ApiRoute
+from ..responses import PayloadResponse
+from ..common import detail_payload, paginate, raw_json
 import json
 
-router = APIRouter(prefix="/api/treasuremaps", tags=["treasuremaps"])
+router = APIRouter(prefix="/api/treasuremaps", tags=["treasuremaps"], route_class=ApiRoute)
+logger = logging.getLogger(__name__)
 
 
 @router.get("/", response_model=Dict[str, Any])
@@ -24,6 +29,7 @@ def read_treasuremaps(
     destination_search: str = Query(None, description="Search term for destination"),
     sort_by: str = Query("id", description="Column to sort by"),
     sort_order: str = Query("desc", description="Sort order (asc or desc)"),
+    facet_counts: bool = Query(False, description="Add the matches per filter value under the other filters"),
     db: Session = Depends(get_db),
 ):
     results = db.execute(
@@ -45,34 +51,16 @@ LEFT JOIN allData a
 
     if name_search:
         results = [row for row in results if name_search.lower() in row.name.lower()]
-    if category_search:
-        print(f"category_search: {category_search}")
-        results = [
-            row for row in results if category_search.lower() == row.category.lower()
-        ]
-    if academic_field_search:
-        print(f"academic_field_search: {academic_field_search}")
-        results = [
-            row
-            for row in results
-            if academic_field_search.lower() == row.academic_field.lower()
-        ]
-    if library_search:
-        print(f"library_search: {library_search}")
-        # split library search by comma
-        library_terms = [term.strip().lower() for term in library_search.split(",")]
-        # if each row library contains at least one of the library terms, then it is okay. the row library is also a comma seperated string to split it before matching
-        results = [
-            row
-            for row in results
-            if any(
-                term in map(lambda x: x.strip(), (row.library or "").split(","))
-                for term in library_terms
-            )
-        ]
+    # category / academic field / library through the facet bitmaps (app/facets.py)
+    filter_values = {
+        "category_search": category_search,
+        "academic_field_search": academic_field_search,
+        "library_search": library_search,
+    }
+    mask = facets.match(db, "treasuremap", filter_values)
 
     if destination_search:
-        print(f"destination_search: {destination_search}")
+        logger.debug("destination_search: %s", destination_search)
         filtered = []
         for row in results:
             if row.destination_resolved:
@@ -81,27 +69,12 @@ LEFT JOIN allData a
                     filtered.append(row)
         results = filtered
 
-    total = len(results)
-
-    # do sorting
-    if results:
-        # Determine if the sort order is descending
-        reverse = sort_order.lower() == "desc"
-
-        # Define a sorting key function
-        def sort_key(row):
-            # Get the value of the sort_by attribute from the row
-            value = getattr(row, sort_by, None)
-            # Handle None values to prevent errors during sorting
-            if value is None:
-                return 0
-            else:
-                return value
-
-        results.sort(key=sort_key, reverse=reverse)
+    counts = facets.counts(db, "treasuremap", filter_values, results) if facet_counts else None
+    # presorted per column (app/sortindex.py), NULL last
+    results = sortindex.order(results, db, "treasuremap", sort_by, sort_order.lower() == "desc", mask=mask)
 
     # do skip and limit
-    treasure_maps = results[skip : skip + limit]
+    total, treasure_maps = paginate(results, skip, limit)
     # print(treasure_maps)
 
     return_fields = [
@@ -130,12 +103,15 @@ LEFT JOIN allData a
         )
         ret_list.append(ret)
 
-    return {"items": ret_list, "total": total}
+    ret = {"items": ret_list, "total": total}
+    if counts is not None:
+        ret["facets"] = counts
+    return ret
 
 
 @router.get("/{treasuremap_id}", response_model=dict)
 def read_treasuremap(treasuremap_id: int, db: Session = Depends(get_db)):
-    return read_treasuremap_core(treasuremap_id, db)
+    return PayloadResponse(detail_payload(read_treasuremap_core, treasuremap_id, db))
 
 
 def read_treasuremap_core(treasuremap_id: int, db: Session = Depends(get_db)):
@@ -205,9 +181,7 @@ GROUP BY t.id;
     ]
 
     ret = {field: getattr(result, field, None) for field in return_fields}
-    ret["destination"] = (
-        json.loads(result.destination_resolved) if result.destination_resolved else None
-    )
+    ret["destination"] = raw_json(result.destination_resolved)
 
     if ret['preceding']:
         preceding_ids = [int(pid) for pid in ret['preceding'].split(",") if pid.strip().isdigit()]
@@ -228,7 +202,5 @@ GROUP BY t.id;
     # ret["preceding"] = (
     #     json.loads(result.preceding_resolved) if result.preceding_resolved else None
     # )
-    ret["discovery"] = (
-        json.loads(result.discovery_resolved) if result.discovery_resolved else None
-    )
+    ret["discovery"] = raw_json(result.discovery_resolved)
     return ret
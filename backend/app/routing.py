@@ -0,0 +1,32 @@
+"""
+the route class of the app's routers: APIRouter(route_class=ApiRoute). it
+stacks the wrappers that make up the response contract of the api around
+each endpoint, then profiles it as app.profiling.ProfiledRoute does:
+
+    list routes (GET .../)  cursor (app/cursors.py), format (app/columnar.py)
+    every GET route         fields (app/fieldsets.py)
+    plain dict models       no response model pass (app/responses.py)
+
+keyset is innermost so next_cursor is in the response objects before format
+and fields shape them; paged is outermost so the cursor state lasts the whole
+call. a route is built twice (router, then include_router); every wrapper
+leaves an endpoint that already takes its parameter alone
+"""
+from . import columnar, cursors, fieldsets, responses
+from .profiling import ProfiledRoute
+
+
+class ApiRoute(ProfiledRoute):
+    def __init__(self, path, endpoint, **kwargs):
+        if "GET" in (kwargs.get("methods") or ()):
+            is_list = path.endswith("/")
+            if is_list:
+                kwargs["response_model"] = cursors.response_model(kwargs.get("response_model"))
+                endpoint = cursors.keyset(endpoint)
+                endpoint = columnar.columnar(endpoint, kwargs.get("response_model"))
+            endpoint = fieldsets.sparse(endpoint, kwargs.get("response_model"))
+            if is_list:
+                endpoint = cursors.paged(endpoint)
+        if responses.is_plain_dict(kwargs.get("response_model")):
+            endpoint = responses.unvalidated(endpoint)
+        super().__init__(path, endpoint, **kwargs)
@@ -0,0 +1,237 @@
+"""
+presorted permutations of the tables list routes sort: per table and sort
+column, the positions of the table's rows in sorted order, computed once per
+database generation (and kept over reloads that leave the table alone).
+
+the order is the same for every column: NULL last in both directions, ties
+by id ascending. sorting a route's filtered rows is then picking the
+permutation and keeping the positions of the rows that matched, instead of
+a sort with a None-handling key function on every request.
+
+the permutations of a table are also written to a snapshot next to the
+database, named by the table's content hash (app/delta.py), so other workers,
+restarts and reloads of the same table content load them instead of sorting
+"""
+import json
+import logging
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import config, database
+from .cursors import row_value
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NJSX"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sII")  # magic, format version, json header length
+
+
+def _cache(db: Session, table: str):
+    return database.generation_of(db).cache(f"sortindex:{table}", tables={table})
+
+
+def row_positions(db: Session, table: str) -> dict:
+    # id -> position of the row in the table, the numbering the permutations (and app/facets.py) use
+    cache = _cache(db, table)
+    ret = cache.get("positions")
+    if ret is None:
+        ids = db.execute(text(f'SELECT id FROM "{table}" ORDER BY id')).scalars().all()
+        ret = cache["positions"] = {row_id: i for i, row_id in enumerate(ids)}
+    return ret
+
+
+def _columns(db: Session, table: str) -> set:
+    cache = _cache(db, table)
+    ret = cache.get("columns")
+    if ret is None:
+        ret = cache["columns"] = {row[1] for row in db.execute(text(f'PRAGMA table_info("{table}")'))}
+    return ret
+
+
+def snapshot_path(generation: database.Generation, table: str) -> Optional[str]:
+    # None when the generation's table hashes were not taken when it opened
+    if not config.PRECOMPUTED_INDEX_ENABLED or generation.table_hashes is None:
+        return None
+    table_hash = generation.table_hashes.get(table)
+    if table_hash is None:
+        return None
+    return f"{generation.path}.{table}.{table_hash}.sort"
+
+
+def read_snapshot(path: str) -> Dict:
+    # (expr, descending) -> permutation; empty for a missing or unreadable file
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {}
+    try:
+        magic, version, header_length = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return {}
+        base = _HEADER.size + header_length
+        header = json.loads(data[_HEADER.size:base])
+        if header["byteorder"] != sys.byteorder or header["itemsize"] != array("l").itemsize:
+            return {}
+        ret = {}
+        for expr, descending, offset, length in header["permutations"]:
+            ret[(expr, descending)] = array("l", data[base + offset:base + offset + length])
+        return ret
+    except (struct.error, ValueError, KeyError, TypeError):
+        logger.warning("ignoring unreadable sort snapshot %s", path)
+        return {}
+
+
+def write_snapshot(path: str, permutations: Dict):
+    """
+    write the permutations to path, through a temporary file renamed into
+    place. snapshots of the same table left by earlier content are removed
+    """
+    entries = []
+    blobs = []
+    offset = 0
+    for (expr, descending), perm in permutations.items():
+        blob = perm.tobytes()
+        entries.append([expr, descending, offset, len(blob)])
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps(
+        {"byteorder": sys.byteorder, "itemsize": array("l").itemsize, "permutations": entries}
+    ).encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+    # <db>.<table>.<hash>.sort of other hashes
+    directory, name = os.path.split(path)
+    prefix = name[:name.rindex(".", 0, -len(".sort")) + 1]
+    for other in os.listdir(directory or "."):
+        rest = other[len(prefix):-len(".sort")]
+        if other != name and other.startswith(prefix) and other.endswith(".sort") and rest and "." not in rest:
+            try:
+                os.remove(os.path.join(directory, other))
+            except OSError:
+                pass
+
+
+def _stored(db: Session, table: str) -> Dict:
+    # the table's snapshot, read once per generation (and kept with the cache over reloads)
+    cache = _cache(db, table)
+    ret = cache.get("snapshot")
+    if ret is None:
+        path = snapshot_path(database.generation_of(db), table)
+        ret = cache["snapshot"] = read_snapshot(path) if path else {}
+    return ret
+
+
+def _store(db: Session, table: str, key, perm: array):
+    path = snapshot_path(database.generation_of(db), table)
+    if path is None:
+        return
+    stored = _stored(db, table)
+    stored[key] = perm
+    # another worker may have added permutations since this one read the file
+    permutations = {**read_snapshot(path), **stored}
+    try:
+        write_snapshot(path, permutations)
+    except OSError as e:
+        logger.debug("could not write %s: %s", path, e)
+
+
+def permutation(db: Session, table: str, expr: str, descending: bool) -> array:
+    """
+    positions of the rows of table ordered by expr (a column name, or an sql
+    expression of the table's columns), NULL last and ties by id
+    """
+    cache = _cache(db, table)
+    key = (expr, descending)
+    ret = cache.get(key)
+    if ret is None:
+        ret = _stored(db, table).get(key)
+        if ret is None:
+            positions = row_positions(db, table)
+            order = "DESC" if descending else "ASC"
+            ids = db.execute(
+                text(f'SELECT id FROM "{table}" ORDER BY ({expr}) IS NULL, ({expr}) {order}, id')
+            ).scalars()
+            ret = array("l", (positions[row_id] for row_id in ids))
+            _store(db, table, key, ret)
+        cache[key] = ret
+    return ret
+
+
+def _sorted(rows: list, sort_by: str, descending: bool, key: Optional[Callable]) -> list:
+    if key is not None:
+        return sorted(rows, key=key, reverse=descending)
+    # NULL last in both directions, as in the permutations; sorted() is stable
+    present = [row for row in rows if row_value(row, sort_by) is not None]
+    missing = [row for row in rows if row_value(row, sort_by) is None]
+    present.sort(key=lambda row: row_value(row, sort_by), reverse=descending)
+    return present + missing
+
+
+def order(
+    rows: list,
+    db: Session,
+    table: str,
+    sort_by: str,
+    descending: bool,
+    expr: Optional[str] = None,
+    mask: Optional[int] = None,
+    key: Optional[Callable] = None,
+) -> list:
+    """
+    rows of table (anything with an id: dicts, sql rows) in the order of
+    sort_by, through the permutation of expr (default the column sort_by).
+    a sort_by that is no column of the table (a value the route computed,
+    like a joined name) has no permutation: the rows are sorted in python by
+    key, default the row's sort_by value with NULL last; rows without such a
+    value stay in their order. rows whose id is not in the table follow the
+    sorted ones.
+    with a mask (a row bitmap of app/facets.py) only the rows whose bit is
+    set are kept, picked in the same pass that places them
+    """
+    positions = row_positions(db, table)
+    # "0"/"1" per position, python's big int shifts cost a copy of the int each
+    flags = None if mask is None else format(mask, "b")[::-1]
+
+    def selected(position) -> bool:
+        return flags is None or (position is not None and position < len(flags) and flags[position] == "1")
+
+    if expr is None:
+        if sort_by not in _columns(db, table):
+            if flags is not None:
+                rows = [row for row in rows if selected(positions.get(row_value(row, "id")))]
+            return _sorted(rows, sort_by, descending, key)
+        expr = f'"{sort_by}"'
+    # the rows that matched, by position: a row or None for every row of the table
+    slots = [None] * len(positions)
+    rest = []
+    kept = []
+    for row in rows:
+        position = positions.get(row_value(row, "id"))
+        if not selected(position):
+            continue
+        kept.append(row)
+        if position is None or slots[position] is not None:
+            rest.append(row)
+        else:
+            slots[position] = row
+    if rest and any(positions.get(row_value(row, "id")) is not None for row in rest):
+        # ids repeat, sort by the rank of each row's id instead
+        rank = {p: i for i, p in enumerate(permutation(db, table, expr, descending))}
+        end = len(rank)
+        return sorted(kept, key=lambda row: rank.get(positions.get(row_value(row, "id")), end))
+    ret = [slots[p] for p in permutation(db, table, expr, descending) if slots[p] is not None]
+    return ret + rest
@@ -0,0 +1,84 @@
+"""
+regression check for the signatures of the efficiency report (GET
+/api/diagnostics/efficiency): paging, sorting, projection, layout, facet and
+profiling parameters do not change which rows match, so a request with all of
+them next to a filter has to be reported under the filter alone.
+
+    cd backend
+    python -m bench.synthetic_db --scale 1 --out ../dho_x1.sqlite3
+    python -m bench.efficiency_check --db ../dho_x1.sqlite3
+
+exits with status 1 when a signature carries anything but the filter
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+# every parameter that is no filter, listed here rather than taken from
+# app.efficiency, so one missing there shows up. the cursor is taken from the
+# first page of the same filtered list
+NON_FILTER = {
+    "skip": "0",
+    "limit": "5",
+    "sort_by": "id",
+    "sort_order": "asc",
+    "profile": "0",
+    "profile_format": "json",
+    "fields": "id,name",
+    "cursor": None,
+    "format": "objects",
+    "facet_counts": "true",
+}
+PATH = "/api/ships/"
+FILTER = "purpose_search"
+EXPECTED = f"{PATH}?{FILTER}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="check the efficiency report signatures")
+    parser.add_argument("--db", required=True, help="sqlite file to serve")
+    args = parser.parse_args(argv)
+
+    # must be set before app.config is imported
+    os.environ["NOJOY_DATABASE"] = args.db
+    os.environ["NOJOY_EFFICIENCY_TRACKING"] = "1"
+    from urllib.parse import urlencode
+
+    from fastapi.testclient import TestClient
+
+    from app import efficiency
+    from app.main import app
+
+    failures = []
+    query = urlencode({**NON_FILTER, "cursor": "x", FILTER: "x"})
+    route = type("Route", (), {"path": PATH})()
+    signature = efficiency.request_signature({"route": route, "path": PATH, "query_string": query.encode()})
+    print(f"request_signature: {signature}")
+    if signature != EXPECTED:
+        failures.append(f"request_signature gave {signature}, expected {EXPECTED}")
+
+    with TestClient(app) as client:
+        conn = sqlite3.connect(args.db)
+        purpose = conn.execute(
+            "SELECT json_extract(category, '$.purpose') FROM ship WHERE json_extract(category, '$.purpose') IS NOT NULL"
+        ).fetchone()[0]
+        conn.close()
+        params = {**NON_FILTER, "cursor": None, FILTER: purpose}
+        first = client.get(PATH, params={**params, "limit": 1})
+        first.raise_for_status()
+        params["cursor"] = first.json().get("next_cursor") or first.headers.get("x-next-cursor")
+        client.delete("/api/diagnostics/efficiency").raise_for_status()
+        client.get(PATH, params=params).raise_for_status()
+        reported = [row["signature"] for row in client.get("/api/diagnostics/efficiency").json()["items"]]
+        print(f"reported: {reported}")
+        if reported != [EXPECTED]:
+            failures.append(f"report lists {reported}, expected {[EXPECTED]}")
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+endpoint benchmark: drives app.main.app in-process over a parameter matrix for
+every list route (each filter, each sort_by column, first / middle / last page)
+plus /api/obj/{id} detail fetches over ids sampled per allData category, and
+records p50/p95/p99 latency, sql statements and allocations per case.
+
+    cd backend
+    python -m bench.synthetic_db --scale 10 --out ../dho_x10.sqlite3
+    python -m bench.endpoints run --db ../dho_x10.sqlite3 --out bench_x10.json
+    python -m bench.endpoints compare bench_baseline.json bench_x10.json
+
+compare exits with status 1 when a case got slower than the threshold, runs
+more statements or fails more often than in the baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+# query params that are not filters
+_PAGING_PARAMS = {"skip", "limit", "sort_by", "sort_order"}
+# routes that are not part of the api being measured
+_EXCLUDED_PREFIXES = ("/api/diagnostics", "/api/completed", "/metrics")
+
+
+def percentile(values, q: float) -> float:
+    # nearest-rank percentile, q in 0..100
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def case_name(path: str, params: dict, label: str = None) -> str:
+    name = f"GET {path}"
+    if params:
+        name += "?" + urlencode(sorted(params.items()))
+    if label:
+        name += f" [{label}]"
+    return name
+
+
+class Case:
+    def __init__(self, path: str, params: dict = None, label: str = None, ids=None):
+        self.path = path
+        self.params = params or {}
+        self.label = label
+        # detail cases cycle through these, substituted for {obj_id}
+        self.ids = ids
+        self.name = case_name(path, self.params, label)
+
+    def url(self, i: int) -> str:
+        if self.ids:
+            return self.path.replace("{obj_id}", str(self.ids[i % len(self.ids)]))
+        return self.path
+
+
+def list_routes(app):
+    """
+    (path, [query param names]) of every GET list route, read from the openapi
+    schema so it does not depend on how the installed fastapi nests routers
+    """
+    ret = []
+    for path, operations in app.openapi()["paths"].items():
+        operation = operations.get("get")
+        if operation is None or "{" in path or not path.startswith("/api/"):
+            continue
+        if path.startswith(_EXCLUDED_PREFIXES):
+            continue
+        params = [
+            p["name"] for p in operation.get("parameters", []) if p.get("in") == "query"
+        ]
+        ret.append((path, params))
+    return ret
+
+
+def _items_of(body):
+    if isinstance(body, list):
+        return body, len(body)
+    if isinstance(body, dict):
+        items = body.get("items") or []
+        return items, body.get("total", len(items))
+    return [], 0
+
+
+def _filter_value(param: str, item: dict):
+    """
+    a value for a filter param that matches at least the given item, taken from
+    the item field the param filters on (name_search -> name, ...)
+    """
+    base = param[: -len("_search")] if param.endswith("_search") else param
+    if base in ("search", "name"):
+        name = item.get("name") or ""
+        return name.split()[0] if name.split() else None
+    keys = {key.lower(): key for key in item}
+    for candidate in (base, base + "s", base.rstrip("s")):
+        key = keys.get(candidate.lower())
+        if key is None or item[key] in (None, "", [], {}):
+            continue
+        value = item[key]
+        if isinstance(value, list):
+            value = value[0]
+        if isinstance(value, dict):
+            if base.endswith("location"):
+                return value.get("id")
+            return value.get("name", value.get("id"))
+        return value
+    return None
+
+
+def build_cases(client, routes, limit: int = 10, log=None):
+    cases = []
+    skipped = []
+    for path, params in routes:
+        response = client.get(path)
+        items, total = _items_of(response.json() if response.status_code == 200 else None)
+        cases.append(Case(path))
+        if "skip" in params and total:
+            middle = max(total // 2 - limit // 2, 0)
+            last = max(total - limit, 0)
+            cases.append(Case(path, {"skip": middle, "limit": limit}, "middle page"))
+            cases.append(Case(path, {"skip": last, "limit": limit}, "last page"))
+        if not items:
+            continue
+        sample = items[0]
+        if "sort_by" in params:
+            for key, value in sample.items():
+                if isinstance(value, (dict, list)):
+                    continue
+                cases.append(Case(path, {"sort_by": key}))
+                if "sort_order" in params:
+                    cases.append(Case(path, {"sort_by": key, "sort_order": "desc"}))
+        for param in params:
+            if param in _PAGING_PARAMS:
+                continue
+            value = _filter_value(param, sample)
+            if value is None:
+                skipped.append(f"{path}?{param}")
+                continue
+            cases.append(Case(path, {param: value}))
+    if log and skipped:
+        log(f"no sample value for {len(skipped)} filters: {', '.join(skipped)}")
+    return cases
+
+
+def detail_cases(db_path: str, per_category: int, seed: int = 0):
+    # ids sampled per allData category, so each object type is its own case
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT id, category FROM allData").fetchall()
+    finally:
+        conn.close()
+    by_category = {}
+    for obj_id, category in rows:
+        by_category.setdefault(category, []).append(obj_id)
+    cases = []
+    for category in sorted(by_category, key=str):
+        ids = by_category[category]
+        sampled = rng.sample(ids, min(per_category, len(ids)))
+        cases.append(Case("/api/obj/{obj_id}", label=f"category={category}", ids=sampled))
+    return cases
+
+
+def measure(client, case: Case, repeat: int, warmup: int = 1):
+    from app.instrumentation import track_statements
+
+    for i in range(warmup):
+        client.get(case.url(i), params=case.params)
+
+    latencies = []
+    statements = []
+    rows = []
+    errors = 0
+    status = None
+    for i in range(repeat):
+        with track_statements() as stats:
+            started = time.perf_counter()
+            response = client.get(case.url(i), params=case.params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        statements.append(stats.statements)
+        rows.append(stats.rows)
+        status = response.status_code
+        if status >= 400:
+            errors += 1
+
+    # separate untimed pass, tracemalloc slows everything down
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        client.get(case.url(0), params=case.params)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "path": case.path,
+        "params": case.params,
+        "label": case.label,
+        "status": status,
+        "requests": repeat,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+        "statements": max(statements),
+        "rows_fetched": max(rows),
+        "alloc_peak_kb": round((peak - baseline) / 1024, 1),
+        "alloc_retained_kb": round((current - baseline) / 1024, 1),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    if args.db:
+        # must be set before app.database is imported
+        os.environ["NOJOY_DATABASE"] = args.db
+    from fastapi.testclient import TestClient
+    from app import database
+    from app.main import app
+
+    db_path = database.engine.url.database
+    log = lambda msg: print(msg, file=sys.stderr)
+    client = TestClient(app, raise_server_exceptions=False)
+
+    cases = []
+    if not args.no_lists:
+        routes = [r for r in list_routes(app) if args.match in r[0]]
+        cases.extend(build_cases(client, routes, log=log))
+    if not args.no_details and args.match in "/api/obj/":
+        cases.extend(detail_cases(db_path, args.sample_ids, args.seed))
+    log(f"{len(cases)} cases x {args.repeat} requests against {db_path}")
+
+    results = {}
+    started = time.perf_counter()
+    for index, case in enumerate(cases, 1):
+        results[case.name] = measure(client, case, args.repeat)
+        result = results[case.name]
+        if args.verbose or result["errors"]:
+            log(
+                f"[{index}/{len(cases)}] {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} ms "
+                f"{result['statements']:4} stmts  status={result['status']}  {case.name}"
+            )
+
+    conn = sqlite3.connect(db_path)
+    try:
+        all_data_rows = conn.execute("SELECT COUNT(*) FROM allData").fetchone()[0]
+    finally:
+        conn.close()
+    report = {
+        "meta": {
+            "db": db_path,
+            "alldata_rows": all_data_rows,
+            "repeat": args.repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "duration_s": round(time.perf_counter() - started, 1),
+        },
+        "cases": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    log(f"wrote {args.out}: {len(results)} cases in {report['meta']['duration_s']}s")
+    print(format_summary(results, args.top))
+
+
+def format_summary(results: dict, top: int = 20) -> str:
+    rows = sorted(results.items(), key=lambda x: x[1]["p95_ms"], reverse=True)[:top]
+    lines = [f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'stmts':>6} {'alloc kb':>9}  case"]
+    for name, r in rows:
+        lines.append(
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['statements']:>6} {r['alloc_peak_kb']:>9.1f}  {name}"
+        )
+    return "\n".join(lines)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_delta_ms: float = 1.0):
+    """
+    regressions of current against baseline, one dict per regressed case.
+    latency regresses when p95 grows by more than threshold (relative) and
+    min_delta_ms (absolute); statements and errors regress on any increase
+    """
+    regressions = []
+    base_cases = baseline["cases"]
+    for name, cur in current["cases"].items():
+        base = base_cases.get(name)
+        if base is None:
+            continue
+        reasons = []
+        delta = cur["p95_ms"] - base["p95_ms"]
+        if delta > min_delta_ms and cur["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            reasons.append(f"p95 {base['p95_ms']:.2f} -> {cur['p95_ms']:.2f} ms")
+        if cur["statements"] > base["statements"]:
+            reasons.append(f"statements {base['statements']} -> {cur['statements']}")
+        if cur["errors"] > base["errors"]:
+            reasons.append(f"errors {base['errors']} -> {cur['errors']}")
+        if reasons:
+            regressions.append({"case": name, "reasons": reasons})
+    return regressions
+
+
+def run_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+    missing = sorted(set(baseline["cases"]) - set(current["cases"]))
+    added = sorted(set(current["cases"]) - set(baseline["cases"]))
+
+    shared = set(baseline["cases"]) & set(current["cases"])
+    print(f"{len(shared)} shared cases, {len(added)} new, {len(missing)} missing")
+    for case in missing:
+        print(f"  missing: {case}")
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']}: {'; '.join(regression['reasons'])}")
+    if regressions:
+        print(f"{len(regressions)} regressions")
+        sys.exit(1)
+    print("no regressions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="endpoint benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="benchmark every route and write a json report")
+    run_parser.add_argument("--db", help="sqlite file to serve, default is the app's own")
+    run_parser.add_argument("--out", default="bench_endpoints.json")
+    run_parser.add_argument("--repeat", type=int, default=20, help="timed requests per case")
+    run_parser.add_argument("--sample-ids", type=int, default=20, help="detail ids per allData category")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--match", default="", help="only routes containing this string")
+    run_parser.add_argument("--no-lists", action="store_true")
+    run_parser.add_argument("--no-details", action="store_true")
+    run_parser.add_argument("--top", type=int, default=20, help="slowest cases to print")
+    run_parser.add_argument("-v", "--verbose", action="store_true")
+
+    compare_parser = sub.add_parser("compare", help="flag regressions against a baseline report")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="relative p95 slowdown allowed")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 changes below this")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+    else:
+        run_compare(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+microbenchmark for the reverse lookups in app/common.py (which quests, recipes,
+npcs, fields ... produce an item). every fetcher is timed directly against the
+database, without the app around it, over three groups of item ids:
+
+    popular     ids the fetcher returns the most rows for, the worst case
+    sampled     random ids mentioned by the tables the fetcher reads
+    absent      an id that is not in the database, the cost of finding nothing
+
+the EXPLAIN QUERY PLAN of every statement a fetcher runs is stored in the
+report, so index work can be measured per source.
+
+    cd backend
+    python -m bench.fetchers run --db ../dho_x10.sqlite3 --out fetchers_x10.json
+    python -m bench.fetchers run --match private_farm --plans
+    python -m bench.endpoints compare fetchers_baseline.json fetchers_x10.json
+
+the report has the same 'cases' layout as bench.endpoints, so its compare
+command works on both
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+from bench.endpoints import _git_revision, format_summary, percentile
+
+# fetch_all_obtain_methods only chains the others
+_EXCLUDED_FETCHERS = {"fetch_all_obtain_methods"}
+_NUMBER = re.compile(r"\d+")
+
+
+def list_fetchers(common):
+    """
+    (name, function) of every fetch_* lookup in common.py, in source order
+    """
+    ret = []
+    for name, func in vars(common).items():
+        if not name.startswith("fetch_") or name in _EXCLUDED_FETCHERS:
+            continue
+        if getattr(func, "__module__", None) != common.__name__:
+            continue
+        ret.append((func.__code__.co_firstlineno, name, func))
+    return [(name, func) for _, name, func in sorted(ret)]
+
+
+def reference_counts(db_path: str):
+    """
+    per (table, column), the number of rows that mention each allData id. ids
+    are matched as numbers anywhere in text columns, so ids inside json count
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        ids = {row[0] for row in conn.execute("SELECT id FROM allData")}
+        tables = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )
+            if row[0] != "allData"
+        ]
+        counts = {}
+        for table in tables:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+            select = ", ".join(f'"{c}"' for c in columns)
+            counters = [counts.setdefault((table, c), Counter()) for c in columns]
+            for row in conn.execute(f'SELECT {select} FROM "{table}"'):
+                for counter, value in zip(counters, row):
+                    if isinstance(value, str):
+                        counter.update({int(n) for n in _NUMBER.findall(value)} & ids)
+                    elif isinstance(value, int) and value in ids:
+                        counter[value] += 1
+        absent = max(ids, default=0) + 1
+    finally:
+        conn.close()
+    return counts, absent
+
+
+def id_groups(session, func, counts: dict, columns, absent: int, popular: int, sample: int, seed: int = 0):
+    """
+    ids to time a fetcher with, taken from the columns it reads. a column may
+    hold places or npcs rather than items, so the most mentioned ids of every
+    column are only candidates; popular are the candidates the fetcher returns
+    the most rows for, the worst case for a lookup
+    """
+    candidates = set()
+    mentioned = set()
+    for column in columns:
+        counter = counts.get(column)
+        if not counter:
+            continue
+        candidates.update(obj_id for obj_id, _ in counter.most_common(popular))
+        mentioned.update(counter)
+
+    hits = {}
+    for obj_id in candidates:
+        result = func(obj_id, session)
+        hits[obj_id] = len(result) if result else 0
+    ranked = sorted((i for i in candidates if hits[i]), key=lambda i: (-hits[i], i))
+
+    rng = random.Random(seed)
+    rest = sorted(mentioned - set(ranked[:popular]))
+    return {
+        "popular": ranked[:popular],
+        "sampled": rng.sample(rest, min(sample, len(rest))),
+        "absent": [absent],
+    }
+
+
+def format_plan(rows) -> list:
+    # rows of (id, parent, notused, detail) as an indented tree
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def capture_statements(engine, session, func, item_id):
+    # (statement, parameters) of everything one fetcher call executes
+    executed = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        func(item_id, session)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return executed
+
+
+def explain(db_path: str, executed):
+    """
+    EXPLAIN QUERY PLAN of each statement, and the (table, column) pairs they
+    read, allData left out
+    """
+    columns = set()
+
+    def _authorizer(action, arg1, arg2, db_name, source):
+        if action == sqlite3.SQLITE_READ and arg1 != "allData" and arg2:
+            columns.add((arg1, arg2))
+        return sqlite3.SQLITE_OK
+
+    conn = sqlite3.connect(db_path)
+    conn.set_authorizer(_authorizer)
+    plans = []
+    try:
+        for statement, parameters in executed:
+            plan = conn.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            plans.append(
+                {
+                    "sql": statement.strip(),
+                    "json_each": statement.count("json_each("),
+                    "plan": format_plan(plan),
+                }
+            )
+    finally:
+        conn.close()
+    return plans, sorted(columns)
+
+
+def measure(session, func, ids, repeat: int, warmup: int = 1):
+    from app.instrumentation import track_statements
+
+    for i in range(warmup):
+        func(ids[i % len(ids)], session)
+
+    latencies = []
+    statements = []
+    rows = []
+    hits = {}
+    errors = 0
+    for i in range(repeat * len(ids)):
+        item_id = ids[i % len(ids)]
+        with track_statements() as stats:
+            started = time.perf_counter()
+            try:
+                result = func(item_id, session)
+            except Exception:
+                session.rollback()
+                errors += 1
+                result = None
+            latencies.append((time.perf_counter() - started) * 1000)
+        statements.append(stats.statements)
+        rows.append(stats.rows)
+        hits[item_id] = len(result) if result else 0
+
+    worst = max(hits, key=hits.get)
+    return {
+        "ids": list(ids),
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+        "statements": max(statements),
+        "rows_fetched": max(rows),
+        # most results returned for one id of the group, and which id
+        "max_hits": hits[worst],
+        "max_hits_id": worst,
+        # format_summary column, allocations are not measured here
+        "alloc_peak_kb": 0.0,
+    }
+
+
+def format_plans(plans: dict) -> str:
+    lines = []
+    for name, statements in plans.items():
+        for i, statement in enumerate(statements, 1):
+            lines.append(f"{name} statement {i}, {statement['json_each']} json_each")
+            lines.extend("    " + line for line in statement["plan"])
+    return "\n".join(lines)
+
+
+def run(args):
+    if args.db:
+        # must be set before app.database is imported
+        os.environ["NOJOY_DATABASE"] = args.db
+    from app import common, database
+
+    db_path = database.engine.url.database
+    log = lambda msg: print(msg, file=sys.stderr)
+
+    started = time.perf_counter()
+    counts, absent = reference_counts(db_path)
+    fetchers = [(n, f) for n, f in list_fetchers(common) if args.match in n]
+
+    session = database.SessionLocal()
+    results = {}
+    plans = {}
+    sources = {}
+    try:
+        for name, func in fetchers:
+            executed = capture_statements(database.engine, session, func, absent)
+            plans[name], columns = explain(db_path, executed)
+            sources[name] = sorted({table for table, column in columns if (table, column) in counts})
+            groups = id_groups(
+                session, func, counts, columns, absent, args.popular, args.sample_ids, args.seed
+            )
+            log(f"{name}: reads {', '.join(sources[name])}, popular ids {groups['popular']}")
+            for group, ids in groups.items():
+                if not ids:
+                    continue
+                result = measure(session, func, ids, args.repeat)
+                result["fetcher"] = name
+                result["group"] = group
+                result["json_each"] = sum(s["json_each"] for s in plans[name])
+                results[f"{name} [{group}]"] = result
+                if args.verbose or result["errors"]:
+                    log(
+                        f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} ms "
+                        f"{result['max_hits']:5} hits  {result['errors']} errors  {name} [{group}]"
+                    )
+    finally:
+        session.close()
+
+    report = {
+        "meta": {
+            "db": db_path,
+            "repeat": args.repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "duration_s": round(time.perf_counter() - started, 1),
+        },
+        "cases": results,
+        "plans": plans,
+        # tables each fetcher reads, allData left out
+        "sources": sources,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    log(f"wrote {args.out}: {len(results)} cases in {report['meta']['duration_s']}s")
+    print(format_summary(results, args.top))
+    if args.plans:
+        print(format_plans(plans))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="common.py reverse lookup microbenchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="time every fetcher and write a json report")
+    run_parser.add_argument("--db", help="sqlite file to read, default is the app's own")
+    run_parser.add_argument("--out", default="bench_fetchers.json")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed calls per id")
+    run_parser.add_argument("--popular", type=int, default=5, help="worst case ids to time")
+    run_parser.add_argument("--sample-ids", type=int, default=20, help="random ids to time")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--match", default="", help="only fetchers containing this string")
+    run_parser.add_argument("--top", type=int, default=48, help="slowest cases to print")
+    run_parser.add_argument("--plans", action="store_true", help="print the query plans")
+    run_parser.add_argument("-v", "--verbose", action="store_true")
+
+    args = parser.parse_args(argv)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
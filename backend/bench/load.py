@@ -0,0 +1,296 @@
+"""
+load generator: virtual users replay browsing sessions against a running
+server over http and report throughput, tail latency and error rates.
+
+a session is what a user of the frontend does: open a list page, change the
+sort, open one of the listed objects, then follow one of its obtain methods
+(the quest, npc, recipe ... that gives the item) to that object's page, with
+think time between the steps. list pages are picked from the routes whose
+detail page has obtain methods.
+
+    cd backend
+    # against a server started here, once per worker count
+    python -m bench.load --db ../dho_x10.sqlite3 --workers 1,2,4 --users 1,4,16,64
+    # against a server that is already running
+    python -m bench.load --url http://127.0.0.1:8000 --users 8 --duration 60
+
+every sync endpoint runs in the worker's threadpool, so throughput stops
+growing with users once the pool (or the cpu) is saturated; the report marks
+that point per worker count
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import pkgutil
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench.endpoints import percentile
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ("list", "sort", "detail", "drilldown")
+# throughput gain below this between user levels while p95 keeps growing
+_SATURATION_GAIN = 0.1
+
+
+def item_routes():
+    """
+    list routes of the routers whose detail page carries obtain methods
+    """
+    import app.routers
+
+    ret = []
+    for module_info in pkgutil.iter_modules(app.routers.__path__):
+        module = importlib.import_module(f"app.routers.{module_info.name}")
+        router = getattr(module, "router", None)
+        if router is not None and "fetch_all_obtain_methods" in vars(module):
+            ret.append(f"{router.prefix}/")
+    return sorted(ret)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {step: [] for step in STEPS}
+        self.errors = {step: 0 for step in STEPS}
+        self.sessions = 0
+
+    def record(self, step: str, elapsed: float, ok: bool):
+        self.latencies[step].append(elapsed * 1000)
+        if not ok:
+            self.errors[step] += 1
+
+    def summary(self, duration: float) -> dict:
+        every = [v for step in STEPS for v in self.latencies[step]]
+        requests = len(every)
+        errors = sum(self.errors.values())
+        ret = {
+            "sessions": self.sessions,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "throughput_rps": round(requests / duration, 2),
+            "p50_ms": round(percentile(every, 50), 2),
+            "p95_ms": round(percentile(every, 95), 2),
+            "p99_ms": round(percentile(every, 99), 2),
+            "steps": {},
+        }
+        for step in STEPS:
+            values = self.latencies[step]
+            ret["steps"][step] = {
+                "requests": len(values),
+                "errors": self.errors[step],
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+            }
+        return ret
+
+
+async def _get(client, stats: Stats, step: str, url: str, params=None):
+    started = time.perf_counter()
+    try:
+        response = await client.get(url, params=params)
+    except httpx.HTTPError:
+        stats.record(step, time.perf_counter() - started, False)
+        return None
+    stats.record(step, time.perf_counter() - started, response.status_code < 400)
+    if response.status_code >= 400:
+        return None
+    return response.json()
+
+
+def _obtain_targets(detail: dict):
+    # ids of the objects listed by the obtain methods of a detail page
+    data = (detail or {}).get("data") or {}
+    ret = []
+    for method in data.get("obtain_method") or []:
+        for key, value in method.items():
+            if key.endswith("_list") and isinstance(value, list):
+                ret.extend(entry["id"] for entry in value if isinstance(entry, dict) and entry.get("id"))
+    return ret
+
+
+async def session(client, stats: Stats, routes, rng: random.Random, think: float, deadline: float):
+    """
+    one browsing session; think time is exponential with the given mean
+    """
+
+    async def pause():
+        if think > 0:
+            await asyncio.sleep(min(rng.expovariate(1 / think), think * 5))
+        return time.perf_counter() < deadline
+
+    route = rng.choice(routes)
+    page = await _get(client, stats, "list", route)
+    items = (page or {}).get("items") or []
+    if not items or not await pause():
+        return
+    sortable = [k for k, v in items[0].items() if not isinstance(v, (dict, list))]
+    page = await _get(
+        client,
+        stats,
+        "sort",
+        route,
+        {"sort_by": rng.choice(sortable), "sort_order": rng.choice(("asc", "desc"))},
+    )
+    items = (page or {}).get("items") or items
+    if not await pause():
+        return
+    detail = await _get(client, stats, "detail", f"/api/obj/{rng.choice(items)['id']}")
+    targets = _obtain_targets(detail)
+    if not targets or not await pause():
+        return
+    await _get(client, stats, "drilldown", f"/api/obj/{rng.choice(targets)}")
+
+
+async def virtual_user(client, stats: Stats, routes, seed: int, think: float, deadline: float):
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        await session(client, stats, routes, rng, think, deadline)
+        stats.sessions += 1
+
+
+async def run_level(url: str, routes, users: int, duration: float, think: float, seed: int):
+    stats = Stats()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(virtual_user(client, stats, routes, seed + i, think, deadline) for i in range(users))
+        )
+        elapsed = time.perf_counter() - started
+    return stats.summary(elapsed)
+
+
+def saturation_point(levels: list):
+    """
+    users at which more users stopped buying throughput and only added latency
+    """
+    for previous, current in zip(levels, levels[1:]):
+        gain = current["throughput_rps"] / max(previous["throughput_rps"], 1e-9) - 1
+        if gain < _SATURATION_GAIN and current["p95_ms"] > previous["p95_ms"]:
+            return previous["users"]
+    return None
+
+
+def start_server(db: str, workers: int, host: str, port: int):
+    env = dict(os.environ)
+    if db:
+        env["NOJOY_DATABASE"] = os.path.abspath(db)
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", host, "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=_BACKEND_DIR,
+        env=env,
+    )
+
+
+def wait_ready(url: str, process=None, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/openapi.json", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {url} not ready after {timeout}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def sweep(url: str, routes, args, log):
+    levels = []
+    for users in args.users:
+        result = asyncio.run(run_level(url, routes, users, args.duration, args.think, args.seed))
+        result["users"] = users
+        levels.append(result)
+        log(
+            f"  {users:>4} users {result['throughput_rps']:>8.1f} req/s  "
+            f"p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  "
+            f"p99 {result['p99_ms']:>8.1f} ms  errors {result['error_rate']:.2%}"
+        )
+    return {"levels": levels, "saturated_at_users": saturation_point(levels)}
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="browsing session load generator")
+    parser.add_argument("--url", help="server to load; without it one is started per --workers")
+    parser.add_argument("--db", help="sqlite file for the started server")
+    parser.add_argument("--workers", type=_int_list, default=[1], help="uvicorn worker counts, e.g. 1,2,4")
+    parser.add_argument("--users", type=_int_list, default=[1, 4, 16, 64], help="virtual user levels")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per user level")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time in seconds, 0 for none")
+    parser.add_argument("--routes", help="comma separated list routes, default the item routes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_load.json")
+    args = parser.parse_args(argv)
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    routes = args.routes.split(",") if args.routes else item_routes()
+    report = {
+        "meta": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_s": args.think,
+            "routes": routes,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "runs": {},
+    }
+
+    if args.url:
+        log(f"loading {args.url}")
+        wait_ready(args.url)
+        report["runs"]["external"] = sweep(args.url, routes, args, log)
+    else:
+        url = f"http://{args.host}:{args.port}"
+        for workers in args.workers:
+            log(f"{workers} workers")
+            process = start_server(args.db, workers, args.host, args.port)
+            try:
+                wait_ready(url, process)
+                report["runs"][f"workers={workers}"] = sweep(url, routes, args, log)
+            finally:
+                stop_server(process)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    log(f"wrote {args.out}")
+    for name, run in report["runs"].items():
+        best = max(run["levels"], key=lambda x: x["throughput_rps"])
+        saturated = run["saturated_at_users"]
+        print(
+            f"{name}: peak {best['throughput_rps']:.1f} req/s at {best['users']} users, "
+            + (f"saturated at {saturated} users" if saturated else "not saturated")
+        )
+
+
+if __name__ == "__main__":
+    main()
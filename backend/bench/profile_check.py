@@ -0,0 +1,63 @@
+"""
+regression check for the per-request profiler (X-Profile: 1): the sql share of
+its categories_ms has to match the sql time the request reports in its
+Server-Timing header, which the CountingCursor fetches and the execute hooks add up.
+
+    cd backend
+    python -m bench.synthetic_db --scale 1 --out ../dho_x1.sqlite3
+    python -m bench.profile_check --db ../dho_x1.sqlite3
+
+exits with status 1 when a route's profiled sql time is off by more than
+--tolerance of the Server-Timing figure
+"""
+import argparse
+import os
+import re
+import sys
+
+PATHS = ("/api/ships/", "/api/equipment/", "/api/quests/")
+
+
+def server_timing_sql(header: str) -> float:
+    match = re.search(r"sql;dur=([0-9.]+)", header or "")
+    if match is None:
+        raise AssertionError(f"no sql figure in Server-Timing: {header!r}")
+    return float(match.group(1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="compare profiled sql time with Server-Timing")
+    parser.add_argument("--db", required=True, help="sqlite file to serve")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative difference")
+    parser.add_argument("--floor-ms", type=float, default=2.0, help="allowed absolute difference")
+    parser.add_argument("paths", nargs="*", default=PATHS)
+    args = parser.parse_args(argv)
+
+    # must be set before app.config is imported
+    os.environ["NOJOY_DATABASE"] = args.db
+    os.environ["NOJOY_PROFILING"] = "1"
+    os.environ["NOJOY_SERVER_TIMING"] = "1"
+    os.environ["NOJOY_PAYLOAD_CACHE_SIZE"] = "0"
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    failures = []
+    with TestClient(app) as client:
+        for path in args.paths:
+            ret = client.get(path, params={"limit": 100000}, headers={"X-Profile": "1"})
+            ret.raise_for_status()
+            profiled = ret.json()["categories_ms"]["sql"]
+            timed = server_timing_sql(ret.headers.get("server-timing"))
+            off = abs(profiled - timed)
+            print(f"{path}: profiled sql {profiled:.3f} ms, Server-Timing sql {timed:.3f} ms")
+            if off > max(args.floor_ms, args.tolerance * timed):
+                failures.append(f"{path}: profiled sql {profiled:.3f} ms vs {timed:.3f} ms")
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
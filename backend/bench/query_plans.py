@@ -0,0 +1,486 @@
+"""
+query plan auditor for the raw sql in app/routers/*.py and app/common.py.
+
+every text(...) statement is found in the source, then the app is driven
+in-process (list routes with each filter, /api/obj/{id} for ids of every
+allData category) and each statement that runs is captured with its real
+parameters and the router function that issued it. EXPLAIN QUERY PLAN of
+each statement is checked for
+
+    scan            a full table scan
+    temp_btree      a sort / distinct / group by through a temporary b-tree
+    json_each       json_each walked for every row of a table (reverse lookups)
+    automatic_index an index sqlite builds on every execution
+
+and every finding comes with the index or materialization that would remove it.
+statements that are never reached are explained with unbound (NULL) parameters.
+
+    cd backend
+    python -m bench.query_plans --db ../dho_x10.sqlite3 --write-baseline query_plans_baseline.json
+    python -m bench.query_plans --db ../dho_x10.sqlite3 --baseline query_plans_baseline.json
+
+exits with status 1 when a full scan on a detail path (a statement run while
+serving /api/obj/{id}) is not in the baseline, so it can gate a ci job
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from bench.endpoints import build_cases, detail_cases, list_routes
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_APP_DIR = os.path.join(_BACKEND_DIR, "app")
+_ROUTERS_DIR = os.path.join(_APP_DIR, "routers")
+_COMMON = os.path.join(_APP_DIR, "common.py")
+# the auditor's own routers, not part of the api
+_EXCLUDED_FILES = {"diagnostics.py", "metrics.py"}
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+_SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+_TEMP_BTREE = re.compile(r"USE TEMP B-TREE FOR (.+)")
+_AUTOMATIC_INDEX = re.compile(r"AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \(([^)]*)\)")
+_FROM = re.compile(r"\b(?:FROM|JOIN)\s+\"?(\w+)\"?(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_ORDER_BY = re.compile(r"\bORDER BY\s+(?:(\w+)\.)?\"?(\w+)\"?", re.IGNORECASE)
+_JSON_PREDICATE = re.compile(
+    r"json_extract\(\s*(?:(\w+)\.)?\"?(\w+)\"?\s*,\s*'([^']+)'\s*\)\s*(?:=|IN\b)", re.IGNORECASE
+)
+_PREDICATE = re.compile(r"(?:(\w+)\.)?\"?(\w+)\"?\s*(?:=|IN\b)\s*\(?\s*[?:]", re.IGNORECASE)
+_JSON_EACH = re.compile(r"json_each\(\s*(?:(\w+)\.)?\"?(\w+)\"?", re.IGNORECASE)
+_SQL_KEYWORDS = {"and", "or", "not", "where", "on", "when", "then", "else", "key", "value"}
+
+
+def _site_name(path: str) -> str:
+    return os.path.relpath(path, _BACKEND_DIR).replace(os.sep, "/")
+
+
+def source_files():
+    files = [
+        os.path.join(_ROUTERS_DIR, name)
+        for name in sorted(os.listdir(_ROUTERS_DIR))
+        if name.endswith(".py") and name not in _EXCLUDED_FILES
+    ]
+    return files + [_COMMON]
+
+
+def extract_statements(path: str):
+    """
+    every text(...) call in a file as {site, line, sql}. sql is None when the
+    statement is built at runtime; a variable holding a single string literal
+    in the same function is resolved
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+
+    ret = []
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        literals = {}
+        for node in ast.walk(func):
+            if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                target = node.targets[0]
+                if isinstance(target, ast.Name):
+                    value = node.value
+                    literal = value.value if isinstance(value, ast.Constant) else None
+                    # assigned more than once or not a literal: built at runtime
+                    if target.id in literals or not isinstance(literal, str):
+                        literals[target.id] = None
+                    else:
+                        literals[target.id] = literal
+        for node in ast.walk(func):
+            if not (isinstance(node, ast.Call) and node.args):
+                continue
+            callee = node.func
+            name = callee.id if isinstance(callee, ast.Name) else getattr(callee, "attr", None)
+            if name != "text":
+                continue
+            arg = node.args[0]
+            sql = None
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                sql = arg.value
+            elif isinstance(arg, ast.Name):
+                sql = literals.get(arg.id)
+            ret.append(
+                {"site": f"{_site_name(path)}:{func.name}", "line": node.lineno, "sql": sql}
+            )
+    # nested functions are walked twice
+    unique = OrderedDict(((s["site"], s["line"]), s) for s in ret)
+    return list(unique.values())
+
+
+def normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+class StatementCapture:
+    """
+    records every statement the app executes with the router / common.py
+    function it came from and whether a list or a detail request issued it
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.kind = "list"
+        self.statements = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _site(self):
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_ROUTERS_DIR) or filename == _COMMON:
+                return f"{_site_name(filename)}:{frame.f_code.co_name}"
+            frame = frame.f_back
+        return None
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        site = self._site()
+        if site is None:
+            return
+        key = (site, normalize(statement))
+        with self._lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                entry = self.statements[key] = {
+                    "site": site,
+                    "sql": statement,
+                    "parameters": parameters,
+                    "kinds": set(),
+                }
+            entry["kinds"].add(self.kind)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+def format_plan(rows):
+    # (depth, detail) per plan row, from rows of (id, parent, notused, detail)
+    depth = {0: -1}
+    ret = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        ret.append((depth[node], detail))
+    return ret
+
+
+def _aliases(sql: str) -> dict:
+    # alias or table name -> table name, for every FROM / JOIN
+    ret = {}
+    for table, alias in _FROM.findall(sql):
+        ret[table] = table
+        if alias and alias.lower() not in _SQL_KEYWORDS and alias.upper() not in (
+            "WHERE", "LEFT", "JOIN", "INNER", "CROSS", "ON", "GROUP", "ORDER", "LIMIT", "UNION"
+        ):
+            ret[alias] = table
+    return ret
+
+
+def _belongs(alias, column, name, table, columns) -> bool:
+    if alias:
+        return alias in (name, table)
+    return column in columns.get(table, ())
+
+
+def suggest_scan(sql: str, name: str, table: str, columns: dict) -> str:
+    """
+    index that would turn a full scan of table into a search
+    """
+    for alias, column, path in _JSON_PREDICATE.findall(sql):
+        if _belongs(alias, column, name, table, columns):
+            suffix = re.sub(r"\W+", "_", path).strip("_")
+            return (
+                f"CREATE INDEX ix_{table}_{column}_{suffix} "
+                f"ON {table}(json_extract({column}, '{path}'))"
+            )
+    for alias, column in _PREDICATE.findall(sql):
+        if column.lower() in _SQL_KEYWORDS or column == "id":
+            continue
+        if _belongs(alias, column, name, table, columns):
+            return f"CREATE INDEX ix_{table}_{column} ON {table}({column})"
+    for alias, column in _JSON_EACH.findall(sql):
+        if _belongs(alias, column, name, table, columns):
+            return f"materialize {table}.{column} into a lookup table indexed on value"
+    if re.search(r"\bLIKE\b", sql, re.IGNORECASE):
+        return "LIKE '%...%' cannot use a b-tree index, an fts5 table over the searched columns can"
+    return "no predicate on this table, the whole table is read; page in sql or cache the result"
+
+
+def analyze(sql: str, plan, columns: dict):
+    """
+    findings for one statement from its EXPLAIN QUERY PLAN rows
+    """
+    aliases = _aliases(sql)
+    subqueries = set()
+    for _, detail in plan:
+        match = _SUBQUERY.match(detail)
+        if match:
+            subqueries.add(match.group(1))
+
+    findings = []
+    # json_each over a column is walked once per row of its table
+    sources = [
+        (aliases.get(alias, ""), column)
+        for alias, column in _JSON_EACH.findall(sql)
+        if any(column in cols for cols in columns.values())
+    ]
+    walked = 0
+    for _, detail in plan:
+        scan = _SCAN.match(detail)
+        if scan and "VIRTUAL TABLE" in detail:
+            if sources:
+                # plans list json_each scans in the order they appear in the sql
+                owner, column = sources[min(walked, len(sources) - 1)]
+                walked += 1
+                owner = owner or next(
+                    (t for t in aliases.values() if column in columns.get(t, ())), "table"
+                )
+                findings.append(
+                    {
+                        "kind": "json_each",
+                        "table": owner,
+                        "detail": detail,
+                        "suggestion": (
+                            f"materialize {owner}.{column} into a lookup table "
+                            f"({owner}_{column}(value, {owner}_id) indexed on value) "
+                            f"and join it instead of walking json_each per row"
+                        ),
+                    }
+                )
+            continue
+        if scan:
+            name = scan.group(1)
+            if name in subqueries:
+                continue
+            table = aliases.get(name, name)
+            if table not in columns:
+                continue
+            findings.append(
+                {
+                    "kind": "scan",
+                    "table": table,
+                    "detail": detail,
+                    "suggestion": suggest_scan(sql, name, table, columns),
+                }
+            )
+            continue
+        btree = _TEMP_BTREE.search(detail)
+        if btree:
+            purpose = btree.group(1)
+            suggestion = "materialize the sorted / grouped result once instead of per request"
+            order = _ORDER_BY.search(sql)
+            if purpose.startswith("ORDER BY") and order:
+                alias, column = order.groups()
+                table = aliases.get(alias, alias) if alias else next(
+                    (t for t in aliases.values() if column in columns.get(t, ())), None
+                )
+                if table:
+                    suggestion = f"CREATE INDEX ix_{table}_{column} ON {table}({column})"
+            findings.append(
+                {"kind": "temp_btree", "table": None, "detail": detail, "suggestion": suggestion}
+            )
+        automatic = _AUTOMATIC_INDEX.search(detail)
+        if automatic:
+            name = detail.split()[1]
+            table = aliases.get(name, name)
+            column = automatic.group(1).split("=")[0].strip()
+            suggestion = f"CREATE INDEX ix_{table}_{column} ON {table}({column})"
+            if table not in columns:
+                suggestion = f"{name} is a subquery, materialize it as a table indexed on {column}"
+            findings.append(
+                {
+                    "kind": "automatic_index",
+                    "table": table,
+                    "detail": detail,
+                    "suggestion": suggestion,
+                }
+            )
+    return findings
+
+
+def table_columns(conn) -> dict:
+    ret = {}
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ):
+        ret[name] = {row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')}
+    return ret
+
+
+def finding_key(statement: dict, finding: dict) -> str:
+    return f"{statement['path']} {finding['kind']} {finding['table']} @ {statement['site']}"
+
+
+def drive_app(client, app, db_path: str, capture: StatementCapture, per_category: int, log):
+    # list routes with each filter, sorting and paging run the same statements
+    cases = build_cases(client, list_routes(app))
+    cases = [c for c in cases if not ({"sort_by", "skip"} & set(c.params))]
+    capture.kind = "list"
+    for case in cases:
+        client.get(case.url(0), params=case.params)
+    log(f"{len(cases)} list requests")
+
+    capture.kind = "detail"
+    details = detail_cases(db_path, per_category)
+    requests = 0
+    for case in details:
+        for i in range(len(case.ids)):
+            client.get(case.url(i))
+            requests += 1
+    log(f"{requests} detail requests over {len(details)} categories")
+
+
+def audit(db_path: str, per_category: int = 3, log=None):
+    """
+    statements with their plan and findings; each statement carries the path
+    it was reached from (detail, list or unreached)
+    """
+    log = log or (lambda msg: None)
+    from fastapi.testclient import TestClient
+    from app import database
+    from app.main import app
+
+    static = []
+    for path in source_files():
+        static.extend(extract_statements(path))
+
+    client = TestClient(app, raise_server_exceptions=False)
+    with StatementCapture(database.engine) as capture:
+        drive_app(client, app, db_path, capture, per_category, log)
+
+    statements = []
+    for entry in capture.statements.values():
+        path = "detail" if "detail" in entry["kinds"] else "list"
+        statements.append(dict(entry, path=path, kinds=sorted(entry["kinds"])))
+    reached_sql = {(s["site"], normalize(s["sql"])) for s in statements}
+    reached_sites = {s["site"] for s in statements}
+    unresolved = []
+    for entry in static:
+        if entry["sql"] is None:
+            if entry["site"] not in reached_sites:
+                unresolved.append(entry)
+            continue
+        sql = re.sub(r":(\w+)", "?", entry["sql"])
+        if (entry["site"], normalize(sql)) in reached_sql:
+            continue
+        if entry["site"] in reached_sites and any(
+            normalize(sql) in normalize(s["sql"]) for s in statements if s["site"] == entry["site"]
+        ):
+            continue
+        # never ran: explain with unbound parameters, sqlite binds them as NULL
+        statements.append(
+            {"site": entry["site"], "sql": sql, "parameters": (), "kinds": [], "path": "unreached"}
+        )
+
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = table_columns(conn)
+        for statement in statements:
+            try:
+                rows = conn.execute("EXPLAIN QUERY PLAN " + statement["sql"], statement["parameters"])
+                plan = format_plan(rows.fetchall())
+            except sqlite3.Error as e:
+                statement["error"] = str(e)
+                plan = []
+            statement["plan"] = ["  " * depth + detail for depth, detail in plan]
+            statement["findings"] = analyze(statement["sql"], plan, columns)
+    finally:
+        conn.close()
+    return statements, static, unresolved
+
+
+def format_report(statements, static, unresolved, new_keys=()) -> str:
+    lines = []
+    counts = {}
+    for statement in statements:
+        for finding in statement["findings"]:
+            key = (statement["path"], finding["kind"])
+            counts[key] = counts.get(key, 0) + 1
+    lines.append(
+        f"{len(static)} text() call sites, {len(statements)} distinct statements explained, "
+        f"{len(unresolved)} runtime-built statements never reached"
+    )
+    for (path, kind), count in sorted(counts.items()):
+        lines.append(f"  {path:>9} {kind:<16} {count}")
+    for path in ("detail", "list", "unreached"):
+        for statement in statements:
+            if statement["path"] != path or not statement["findings"]:
+                continue
+            lines.append("")
+            lines.append(f"[{path}] {statement['site']}")
+            for finding in statement["findings"]:
+                marker = "NEW " if finding_key(statement, finding) in new_keys else ""
+                lines.append(f"  {marker}{finding['kind']}: {finding['detail'].strip()}")
+                lines.append(f"      -> {finding['suggestion']}")
+    for entry in unresolved:
+        lines.append(f"not reached, built at runtime: {entry['site']} line {entry['line']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="explain every router statement and flag full scans")
+    parser.add_argument("--db", help="sqlite file to audit, default is the app's own")
+    parser.add_argument("--per-category", type=int, default=3, help="detail ids per allData category")
+    parser.add_argument("--out", help="write statements, plans and findings as json")
+    parser.add_argument("--baseline", help="accepted findings; only new detail scans fail")
+    parser.add_argument("--write-baseline", help="store the current findings as accepted")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        # must be set before app.database is imported
+        os.environ["NOJOY_DATABASE"] = args.db
+    from app import database
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    db_path = database.engine.url.database
+    statements, static, unresolved = audit(db_path, args.per_category, log)
+
+    keys = sorted({finding_key(s, f) for s in statements for f in s["findings"]})
+    accepted = set()
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            accepted = set(json.load(f)["accepted"])
+    failing = sorted(
+        {
+            finding_key(s, f)
+        for s in statements
+        for f in s["findings"]
+            if s["path"] == "detail" and f["kind"] == "scan" and finding_key(s, f) not in accepted
+        }
+    )
+    print(format_report(statements, static, unresolved, set(failing)))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {"db": db_path, "statements": statements, "unresolved": unresolved},
+                f,
+                indent=1,
+                ensure_ascii=False,
+                default=list,
+            )
+    if args.write_baseline:
+        with open(args.write_baseline, "w", encoding="utf-8") as f:
+            json.dump({"db": db_path, "accepted": keys}, f, indent=1, ensure_ascii=False)
+        log(f"wrote {args.write_baseline}: {len(keys)} accepted findings")
+        return
+    if failing:
+        print(f"\n{len(failing)} full scans on detail paths not in the baseline:")
+        for key in failing:
+            print(f"  {key}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+regression check for reloading the served database file in place (what the
+file watcher and POST /api/admin/reload do after a copy over it): the reload
+has to see which tables the new content changed, so the sortindex and facet
+caches of those tables are rebuilt instead of carried over.
+
+    cd backend
+    python -m bench.synthetic_db --scale 1 --out ../dho_x1.sqlite3
+    python -m bench.reload_check --db ../dho_x1.sqlite3
+
+the database is copied to a temporary directory and changed there; exits
+with status 1 when a list route answers from the old content after reload
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+PURPOSE = "json_extract(category, '$.purpose')"
+
+
+def expected_ids(path: str, purpose: str) -> set:
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0] for row in conn.execute(f"SELECT id FROM ship WHERE {PURPOSE} = ?", (purpose,))}
+    finally:
+        conn.close()
+
+
+def listed_ids(client, purpose: str) -> set:
+    ret = client.get(
+        "/api/ships/",
+        params={"purpose_search": purpose, "sort_by": "max_cargo", "limit": 100000, "fields": "id"},
+    )
+    ret.raise_for_status()
+    body = ret.json()
+    ids = {item["id"] for item in body["items"]}
+    if body["total"] != len(ids):
+        raise AssertionError(f"total {body['total']} for {len(ids)} listed ships")
+    return ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="reload an overwritten database file and check the list routes")
+    parser.add_argument("--db", required=True, help="sqlite file to start from, not modified")
+    parser.add_argument("--rows", type=int, default=10, help="ships whose purpose is changed")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="nojoy-reload-")
+    served = os.path.join(workdir, "served.sqlite3")
+    shutil.copyfile(args.db, served)
+    # must be set before app.database is imported; admin makes startup hash the served file
+    os.environ["NOJOY_DATABASE"] = served
+    os.environ["NOJOY_ADMIN"] = "1"
+    os.environ["NOJOY_PRECOMPUTED_INDEX"] = "0"
+    from fastapi.testclient import TestClient
+
+    from app import reloader
+    from app.main import app
+
+    conn = sqlite3.connect(served)
+    purpose = conn.execute(f"SELECT {PURPOSE} FROM ship WHERE {PURPOSE} IS NOT NULL LIMIT 1").fetchone()[0]
+    conn.close()
+
+    failures = []
+    try:
+        with TestClient(app) as client:
+            before = listed_ids(client, purpose)
+            if before != expected_ids(served, purpose):
+                failures.append("list differs from the database before reload")
+
+            # the next release, written over the served file in place
+            changed = os.path.join(workdir, "changed.sqlite3")
+            shutil.copyfile(served, changed)
+            conn = sqlite3.connect(changed)
+            with conn:
+                conn.execute(
+                    f"UPDATE ship SET category = json_set(category, '$.purpose', 'reload-check') "
+                    f"WHERE id IN (SELECT id FROM ship WHERE {PURPOSE} = ? ORDER BY id LIMIT ?)",
+                    (purpose, args.rows),
+                )
+            conn.close()
+            shutil.copyfile(changed, served)
+            stat = os.stat(served)
+            # a copy within the same mtime tick still has to count as a new file
+            os.utime(served, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            generation = reloader.reload_database(served)
+            print(f"generation {generation.number}, changed tables: {generation.changed_tables}")
+            if "ship" not in generation.changed_tables:
+                failures.append("ship is not among the changed tables")
+            after = listed_ids(client, purpose)
+            expected = expected_ids(served, purpose)
+            print(f"{purpose}: {len(before)} ships before, {len(after)} listed after, {len(expected)} expected")
+            if after != expected:
+                failures.append("list still answers from the old content after reload")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
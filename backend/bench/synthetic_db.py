@@ -0,0 +1,1228 @@
+"""
+write a schema-compatible dhoDatabase.sqlite3 filled with synthetic rows, so
+endpoints can be benchmarked and load tested without the real database.
+
+    cd backend
+    python -m bench.synthetic_db --scale 10 --out ../dho_x10.sqlite3
+    NOJOY_DATABASE=../dho_x10.sqlite3 python run.py
+
+every table the routers query is created with the columns they read. ids share
+one space across tables and every object is registered in allData with the
+category key objects.py dispatches on, so /api/obj/{id} and the obtain-method
+lookups in common.py resolve the same way they do against the real file.
+json columns use the shapes the routers and common.py parse.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+SCALES = (1, 10, 100)
+
+# id ranges are allocated per table in this order starting here
+FIRST_ID = 10000
+
+_PREFIXES = [
+    "고대", "황금", "붉은", "푸른", "은빛", "검은", "하얀", "대형", "소형", "왕실",
+    "해적", "상인", "기사", "학자", "전설의", "낡은", "신비한", "동방", "서방", "북해",
+    "남해", "베네치아", "제노바", "리스본", "세비야", "런던", "암스테르담", "이스탄불",
+]
+_NOUNS = {
+    "item": [
+        "검", "방패", "모자", "장갑", "지도", "향신료", "비단", "포도주", "도자기", "보석",
+        "나침반", "망원경", "반지", "목걸이", "외투", "장화", "단검", "창", "활", "서적",
+    ],
+    "place": ["항구", "요새", "마을", "신전", "동굴", "섬", "해안", "숲", "사막", "유적"],
+    "person": ["선장", "항해사", "상인", "학자", "사제", "기사", "어부", "장인", "모험가", "귀족"],
+    "thing": ["전설", "기록", "보물", "비밀", "계약", "항로", "문서", "유물", "조각", "표식"],
+}
+_ERAS = ["대항해시대", "르네상스", "종교개혁", "절대왕정", "산업혁명"]
+_GRADES = ["초급", "중급", "상급", "명인"]
+
+
+class Context:
+    """
+    id pools per allData category plus the rng, shared by all row generators
+    """
+
+    def __init__(self, seed: int, scale: int):
+        self.rng = random.Random(seed)
+        self.scale = scale
+        self.ids = {}
+        # names[id - FIRST_ID]; picked from a fixed set of strings per kind so
+        # 100x runs hold references, not millions of distinct str objects
+        self.names = []
+        self._name_pool = {
+            kind: [f"{prefix} {noun}" for prefix in _PREFIXES for noun in nouns]
+            for kind, nouns in _NOUNS.items()
+        }
+
+    def name(self, kind: str = "item") -> str:
+        return self.rng.choice(self._name_pool[kind])
+
+    def name_of(self, obj_id):
+        if obj_id is None:
+            return None
+        return self.names[obj_id - FIRST_ID]
+
+    def text(self, words: int = 12) -> str:
+        rng = self.rng
+        pool = _PREFIXES + [noun for nouns in _NOUNS.values() for noun in nouns]
+        return " ".join(rng.choice(pool) for _ in range(words)) + "."
+
+    def pick(self, category: str):
+        pool = self.ids.get(category)
+        if not pool:
+            return None
+        return self.rng.choice(pool)
+
+    def sample(self, category: str, low: int, high: int):
+        pool = self.ids.get(category) or []
+        count = min(self.count(low, high), len(pool))
+        return self.rng.sample(pool, count)
+
+    def count(self, low: int, high: int) -> int:
+        # long tail: most lists are short, a few are long
+        span = high - low
+        return low + int(span * self.rng.random() ** 3)
+
+    def ref(self, category: str):
+        obj_id = self.pick(category)
+        if obj_id is None:
+            return None
+        return {"id": obj_id, "name": self.name_of(obj_id)}
+
+    def refs(self, category: str, low: int, high: int):
+        return [{"id": i, "name": self.name_of(i)} for i in self.sample(category, low, high)]
+
+    def item(self):
+        return self.pick(self.rng.choice(ITEM_CATEGORIES))
+
+    def items(self, low: int, high: int):
+        ret = []
+        for _ in range(self.count(low, high)):
+            ret.append(self.item())
+        return ret
+
+    def item_refs(self, low: int, high: int):
+        return [{"id": i, "name": self.name_of(i)} for i in self.items(low, high)]
+
+
+# allData categories drops / rewards / sales point at
+ITEM_CATEGORIES = [
+    "consumable", "equipment", "tradegoods", "recipebook", "shipmaterial", "cannon",
+    "studdingsail", "figurehead", "extraarmor", "specialequipment", "sailorequipment",
+    "crest", "shipdecor", "furniture", "ornament", "certificate",
+]
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _stats(ctx, keys, low=10, high=300):
+    return {key: ctx.rng.randint(low, high) for key in keys}
+
+
+def _requirements(ctx, kind: str, content):
+    return [{"type": kind, "content": content}]
+
+
+# -------------------------------
+# row generators: (ctx, id, name) -> column dict, or a list of them for
+# tables that store several rows per id
+# -------------------------------
+def gen_city(ctx, obj_id, name):
+    rng = ctx.rng
+    region = ctx.pick("region")
+    return {
+        "name": name,
+        "region": ctx.name_of(region),
+        "sea_area": ctx.name_of(ctx.pick("sea")),
+        "culture": ctx.name_of(ctx.pick("culture")),
+        "language": rng.choice(["포르투갈어", "스페인어", "영어", "네덜란드어", "이탈리아어", "아랍어"]),
+        "description": ctx.text(),
+        "map_image_point_x": str(rng.randint(0, 4000)),
+        "map_image_point_y": str(rng.randint(0, 2000)),
+        "city_coord_x": str(rng.randint(0, 16384)),
+        "city_coord_y": str(rng.randint(0, 8192)),
+        "category": rng.choice(["수도", "항구", "보급항", "마을"]),
+        "port_enter_permission": rng.choice(["", "허가증 필요"]),
+        "entry_point": rng.choice(["광장", "부두"]),
+        "facility": ", ".join(rng.sample(["교역소", "조선소", "은행", "교회", "주점", "도구점", "도서관"], 4)),
+        "flag_quest_id": "",
+        "investment_amount": str(rng.randint(0, 10**7)),
+        "investment_reward": "",
+        "transaction_amount": str(rng.randint(0, 10**7)),
+        "transaction_reward": "",
+        "fishing": rng.choice(["", "가능"]),
+    }
+
+
+def gen_culture(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "region": ctx.name_of(ctx.pick("region"))}
+
+
+def gen_nation(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "npc_nation": ctx.rng.randint(0, 1),
+        "is_basic": ctx.rng.randint(0, 1),
+    }
+
+
+def gen_sea(ctx, obj_id, name):
+    rng = ctx.rng
+    gatherable = {}
+    for activity in rng.sample(["낚시", "채집", "조사", "탐색"], rng.randint(1, 3)):
+        gatherable[activity] = [
+            {"랭크": rank, "아이템": ctx.item_refs(1, 5)} for rank in range(1, rng.randint(2, 5))
+        ]
+    return {
+        "name": name,
+        "region": _json(ctx.refs("region", 1, 2)),
+        "gatherable": _json(gatherable),
+        "boundary": ", ".join(f"{k} : {rng.randint(0, 16384)}" for k in ["북", "남", "동", "서"]),
+        "description": ctx.text(),
+    }
+
+
+def gen_field(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "fieldtype": rng.choice(["육지", "해저", "동굴"]),
+        "description": ctx.text(),
+        "coordinates": f"{rng.randint(0, 16384)}, {rng.randint(0, 8192)}",
+        "region": ctx.pick("region"),
+        "sea": ctx.pick("sea"),
+        "entrance": ctx.pick("city"),
+        "flag_quest": ctx.pick("quest") if rng.random() < 0.3 else None,
+        "survey": _json({"skill": ctx.name_of(ctx.pick("skill")), "rank": rng.randint(1, 20)}),
+        "resurvey_reward": _json(
+            [dict(ref, value=rng.randint(1, 5)) for ref in ctx.item_refs(0, 6)]
+        ),
+        "gatherable": _json(
+            [
+                {
+                    "method": rng.choice(["채집", "사냥", "낚시", "채굴"]),
+                    "rank": rng.randint(1, 15),
+                    "item": ctx.item_refs(1, 6),
+                }
+                for _ in range(ctx.count(0, 5))
+            ]
+        ),
+    }
+
+
+def gen_skill(ctx, obj_id, name):
+    rng = ctx.rng
+    # numeric looking columns are text in the real file, the Skill model expects str
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "type": rng.choice(["모험", "교역", "전투", "언어"]),
+        "action_point": str(rng.randint(0, 30)),
+        "apply_range": rng.choice(["자신", "함대", "선박"]),
+        "acquire_cost": str(rng.randint(1, 20)),
+        "equip_cost": str(rng.randint(1, 10)),
+        "max_rank_adjustment": str(rng.randint(0, 5)),
+        "adjutant_position": rng.choice(["", "항해사", "회계사", "포술장"]),
+        "refinement_effect": _json(ctx.ref("skillrefinementeffect")),
+        "acquire_requirement": _json(_requirements(ctx, "레벨", [{"name": "모험", "value": rng.randint(1, 80)}])),
+    }
+
+
+def gen_discovery(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "type": rng.choice(["발견물", "보물", "유물"]),
+        "name": name,
+        "additional_name": "",
+        "name_key": f"D{obj_id}",
+        "description": ctx.text(),
+        "category": rng.choice(["동물", "식물", "유적", "미술품", "종교", "지리"]),
+        "difficulty": rng.randint(1, 15),
+        "card_points": rng.randint(1, 100),
+        "discovery_experience": rng.randint(100, 50000),
+        "card_acquisition_experience": rng.randint(10, 5000),
+        "report_reputation": rng.randint(0, 3000),
+        "discovery_method": rng.choice(["관찰", "채집", "탐색"]),
+        "discovery_location": _json(ctx.sample("field", 1, 3) + ctx.sample("city", 0, 2)),
+        "discovery_rank": str(rng.randint(1, 10)),
+        "additional_description": "",
+        "era": rng.choice(_ERAS),
+        "time_period": rng.choice(["", "낮", "밤"]),
+        "weather": rng.choice(["", "맑음", "비"]),
+        "coordinates": f"{rng.randint(0, 16384)}, {rng.randint(0, 8192)}",
+    }
+
+
+def gen_quest(ctx, obj_id, name):
+    rng = ctx.rng
+    skills = {str(s): rng.randint(1, 15) for s in ctx.sample("skill", 1, 4)}
+    reward_items = {str(i): rng.randint(1, 10) for i in ctx.items(0, 5)}
+    required_items = {str(i): rng.randint(1, 3) for i in ctx.items(0, 3)}
+    previous = ctx.pick("quest") if rng.random() < 0.2 else None
+    preceding = [ctx.sample("discovery", 1, 2) + ctx.sample("quest", 0, 1) for _ in range(ctx.count(0, 3))]
+    return {
+        "type": rng.choice(["퀘스트", "연속 퀘스트"]),
+        "name": name,
+        "additional_name": "",
+        "description": ctx.text(20),
+        "series": rng.choice(["모험", "교역", "전투", "기사단", "조합"]),
+        "difficulty": rng.randint(1, 15),
+        "era": rng.choice(_ERAS),
+        "category": rng.choice(["발견", "운송", "토벌", "조사"]),
+        "location": ctx.name_of(ctx.pick("city")),
+        "destination": str(ctx.pick(rng.choice(["city", "field", "discovery"]))),
+        "destination_coordinates": f"{rng.randint(0, 16384)}, {rng.randint(0, 8192)}",
+        "discovery": str(ctx.pick("discovery")) if rng.random() < 0.5 else "",
+        "preceding_discovery_quest": _json(preceding) if preceding else "",
+        "required_items": _json(required_items) if required_items else "",
+        "deadline": rng.choice(["", "30일"]),
+        "guide": ctx.text(6),
+        "progress": "",
+        "previous_continuous_quest_id": str(previous) if previous else "",
+        "episode": rng.randint(0, 10),
+        "one_time_only": rng.randint(0, 1),
+        "rare": rng.randint(0, 1),
+        "association_required": rng.randint(0, 1),
+        "skills": _json(skills),
+        "additional_skills": "",
+        "association_skills": "",
+        "sophia_rank": rng.randint(0, 5),
+        "sophia_points": rng.randint(0, 100),
+        "nationality": "",
+        "occupation": "",
+        "port_permission": "",
+        "reputation": "",
+        "other": "",
+        "reward_money": rng.randint(0, 500000),
+        "advance_payment": rng.randint(0, 10000),
+        "report_experience": str(rng.randint(0, 30000)),
+        "report_reputation": str(rng.randint(0, 3000)),
+        "reward_items": _json(reward_items) if reward_items else "",
+        "reward_immigrants": "",
+        "reward_techniques": "",
+        "reward_title": "",
+    }
+
+
+def _effect_refs(ctx, category, low, high):
+    return [
+        {"ref": ref["id"], "name": ref["name"], "value": ctx.rng.randint(1, 10)}
+        for ref in ctx.refs(category, low, high)
+    ]
+
+
+def gen_consumable(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "type": "소모품",
+        "name": name,
+        "additional_Name": "",
+        "description": ctx.text(),
+        "category": rng.choice(["식량", "약품", "도구", "상자", "선박용품"]),
+        "usage_Effect": _json(_effect_refs(ctx, "itemeffect", 0, 3)),
+        "features": rng.choice(["", "거래 불가", "창고 보관 가능"]),
+        "Item": _json([{str(i): rng.randint(1, 5)} for i in ctx.items(0, 4)]),
+        "Duplicate": "",
+    }
+
+
+def gen_equipment(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "type": rng.choice(["무기", "방어구", "장신구"]),
+        "classification": rng.choice(["검", "총", "모자", "신발", "장갑", "몸", "액세서리"]),
+        "attack_power": rng.randint(0, 100),
+        "defense_power": rng.randint(0, 100),
+        "durability": rng.randint(10, 200),
+        "attire": rng.randint(0, 50),
+        "disguise": rng.randint(0, 1),
+        "use_effect": _json(ctx.refs("itemeffect", 0, 1)),
+        "equipped_effect": _json(ctx.refs("equippedeffect", 0, 2)),
+        "requirements": _json(_requirements(ctx, "레벨", [{"name": "모험", "value": rng.randint(1, 80)}])),
+        "skills": _json([{"id": s, "value": rng.randint(1, 3)} for s in ctx.sample("skill", 0, 4)]),
+    }
+
+
+def gen_tradegoods(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "classification": rng.choice(["식료품", "조미료", "주류", "섬유", "귀금속", "공예품", "미술품", "광석"]),
+        "culture": _json(ctx.refs("culture", 0, 3)),
+        "price": rng.randint(10, 5000),
+        "weight": rng.randint(1, 10),
+    }
+
+
+def gen_recipebook(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "additionalname": "",
+        "description": ctx.text(),
+        "productionNPC": ctx.name_of(ctx.pick("citynpc")),
+        "era": rng.choice(_ERAS),
+        "skill": ctx.name_of(ctx.pick("skill")),
+    }
+
+
+def gen_recipe(ctx, obj_id, name):
+    rng = ctx.rng
+    outputs = lambda low, high: [
+        {"ref": ref["id"], "name": ref["name"], "value": rng.randint(1, 5)}
+        for ref in ctx.item_refs(low, high)
+    ]
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "recipe_book_id": ctx.pick("recipebook"),
+        "required_Skill": _json(_effect_refs(ctx, "skill", 1, 2)),
+        "ingredients": _json(outputs(1, 5)),
+        "sophia": rng.randint(0, 1),
+        "era": rng.choice(_ERAS),
+        "home_production": "",
+        "development": "",
+        "Investment_cost": rng.randint(0, 100000),
+        "central_city": "",
+        "Industrial_revolution": "",
+        "own_Industrial_city": "",
+        "title": "",
+        "consumption_contribution": rng.randint(0, 10),
+        "other": "",
+        "success": _json(outputs(1, 2)),
+        "greatsuccess": _json(outputs(0, 2)),
+        "failure": _json(outputs(0, 1)),
+    }
+
+
+def gen_ship(ctx, obj_id, name):
+    rng = ctx.rng
+    perf_keys = ["durability", "vertical_sail", "horizontal_sail", "rowing_power", "maneuverability", "wave_resistance", "armor"]
+    cap_keys = ["cabin", "gunport", "cargo"]
+    return {
+        "name": name,
+        "extraname": rng.choice(["", "개량형", "상급"]),
+        "description": ctx.text(),
+        "required_levels": _json(_stats(ctx, ["adventure", "trade", "battle"], 1, 80)),
+        "base_material": _json(ctx.ref("shipbasematerial")),
+        "upgrade_count": _json({"base": rng.randint(1, 5), "re": rng.randint(0, 3)}),
+        "capacity": _json(dict(_stats(ctx, cap_keys, 10, 800), required_crew=rng.randint(5, 100))),
+        "category": _json(
+            {
+                "purpose": rng.choice(["모험", "교역", "전투"]),
+                "size": rng.choice(["소형", "중형", "대형"]),
+                "propulsion": rng.choice(["범선", "갤리선"]),
+            }
+        ),
+        "base_performance": _json(_stats(ctx, perf_keys)),
+        "improvement_limit": _json(_stats(ctx, perf_keys + cap_keys, 0, 60)),
+        "ship_skills": _json([{"skill": ref} for ref in ctx.refs("shipskill", 0, 4)]),
+        "ship_parts": _json(_stats(ctx, ["studdingsail", "figurehead", "crest", "special_equipment", "extraarmor"], 0, 2)),
+        "build_info": _json({"days": rng.randint(1, 30), "cost": rng.randint(10000, 10**7)}),
+        "ship_deco": _json(_stats(ctx, ["flag", "side"], 0, 4)),
+        "special_build_cities": _json(ctx.refs("city", 0, 3)),
+        "standard_build_cities": _json(ctx.refs("city", 0, 8)),
+    }
+
+
+def gen_shipwreck(ctx, obj_id, name):
+    rng = ctx.rng
+    items = ctx.items(1, 8)
+    ret = {
+        "type": "침몰선",
+        "name": name,
+        "explanation": ctx.text(),
+        "difficulty": rng.randint(1, 15),
+        "sea_area": ctx.name_of(ctx.pick("sea")),
+        "destination": str(ctx.pick("sea")),
+        "discovery_coordinates": f"{rng.randint(0, 16384)}, {rng.randint(0, 8192)}",
+        "skill": ctx.name_of(ctx.pick("skill")),
+        "characteristics": "",
+        "discovery": "",
+        "item_id": _json(items),
+    }
+    for column in [
+        "consumables", "trade_goods", "equipment", "recipebook", "aux_sail", "ship_material",
+        "cannon", "special_equipment", "additional_armor", "figurehead", "emblem", "ship_decoration",
+    ]:
+        ret[column] = ""
+        ret[f"{column.replace('consumables', 'consumable').replace('recipebook', 'recipe_book')}_code"] = ""
+    return ret
+
+
+def gen_treasuremap(ctx, obj_id, name):
+    rng = ctx.rng
+    preceding = ctx.sample("treasuremap", 0, 2)
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "required_skill": ctx.name_of(ctx.pick("skill")),
+        "category": rng.choice(["보물", "유적", "미술품"]),
+        "academic_field": rng.choice(["고고학", "미술", "종교학", "생물학", "지리학"]),
+        "library": ", ".join(rng.sample(["리스본", "세비야", "런던", "베네치아", "이스탄불"], rng.randint(1, 3))),
+        "destination": str(ctx.pick(rng.choice(["city", "field"]))),
+        "discovery": ctx.pick("discovery"),
+        "city_conditions": "",
+        "preceding": ",".join(str(p) for p in preceding),
+        "reward_dukat": rng.randint(0, 100000),
+        "reward_item": _json({str(i): rng.randint(1, 3) for i in ctx.items(0, 3)}),
+        "strategy": "",
+    }
+
+
+def gen_treasurebox(ctx, obj_id, name):
+    rng = ctx.rng
+    base = {
+        "name": name,
+        "description": ctx.text(),
+        "sell_period": rng.choice(["상시", "기간 한정"]),
+        "price": rng.randint(100, 5000),
+    }
+    rows = []
+    for setname in rng.sample(["", "A세트", "B세트", "C세트", "보너스"], rng.randint(1, 4)):
+        for _ in range(ctx.count(1, 4)):
+            refs = ctx.item_refs(1, 3)
+            rows.append(
+                dict(
+                    base,
+                    setname=setname,
+                    names=_json([r["name"] for r in refs]),
+                    item_ids=_json([r["id"] for r in refs]),
+                    extras=_json([] if rng.random() < 0.8 else ["x2"]),
+                    count=rng.randint(1, 5),
+                )
+            )
+    return rows
+
+
+def gen_npcsale(ctx, obj_id, name):
+    rng = ctx.rng
+    location = ctx.pick("city") if rng.random() < 0.85 else ctx.pick("field")
+    npc = rng.choice(_NOUNS["person"]) + " " + rng.choice(["상점", "노점", "대리인"])
+    rows = []
+    for item in ctx.items(3, 30):
+        rows.append(
+            {
+                "npc": npc,
+                "location_id": location,
+                "item_id": item,
+                "price": rng.randint(10, 50000),
+                "count": rng.randint(1, 99),
+                "progress": "",
+                "invest": "",
+                "contribution": "",
+                "centralcity": "",
+                "era": rng.choice(["", *_ERAS]),
+            }
+        )
+    return rows
+
+
+def gen_job(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category": rng.choice(["모험", "교역", "전투"]),
+        "reference_letter": ctx.pick("certificate"),
+        "cost": rng.randint(0, 100000),
+        "preferred_skills": _json(ctx.sample("skill", 3, 8)),
+        "requirements": _json(_requirements(ctx, "스킬", ctx.refs("skill", 1, 3))),
+    }
+
+
+def gen_certificate(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "classification": ctx.rng.choice(["추천장", "허가증", "증서"])}
+
+
+def gen_landnpc(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "level": rng.randint(1, 80),
+        "fields": _json(ctx.refs("field", 1, 3)),
+        "feature": rng.choice(["", "선공", "무리"]),
+        "techniques": _json(ctx.refs("technique", 0, 3)),
+        "drop_items": _json(ctx.item_refs(0, 6)),
+    }
+
+
+def gen_marinenpc(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "fleet_count": rng.randint(1, 5),
+        "sea_areas": _json(ctx.refs("sea", 1, 4)),
+        "acquired_items": _json(
+            [dict(ref, **{"획득 방법": rng.choice(["격침", "나포", "백병전"])}) for ref in ctx.item_refs(0, 6)]
+        ),
+        "nationality": _json(ctx.ref("nation")),
+        "feature": "",
+        "deck_battle": _json({"level": rng.randint(1, 80), "crew": rng.randint(10, 400)}),
+        "penalty_level": rng.randint(0, 3),
+    }
+
+
+def gen_citynpc(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "extraname": rng.choice(["", "견습", "노련한"]),
+        "description": ctx.text(),
+        "city": _json(ctx.ref("city")),
+        "preferential_report": rng.choice(["", "발견물", "교역"]),
+        "skills": _json(ctx.refs("skill", 0, 3)),
+        "tarot_cards": _json(ctx.refs("tarotcard", 0, 2)),
+        "gifts": _json([dict(ref, favor=rng.randint(1, 10)) for ref in ctx.item_refs(0, 5)]),
+    }
+
+
+def gen_ganador(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category": rng.choice(["전투", "탐색"]),
+        "era": rng.choice(_ERAS),
+        "difficulty": rng.randint(1, 15),
+        "durability": rng.randint(100, 5000),
+        "crew": rng.randint(10, 500),
+        "attack_power": rng.randint(10, 500),
+        "defense_power": rng.randint(10, 500),
+        "preparation_item": _json(ctx.item_refs(0, 2)),
+        "feature": "",
+        "requirements": "",
+        "acquired_items": _json(ctx.item_refs(1, 8)),
+    }
+
+
+def gen_dungeon(ctx, obj_id, name):
+    rng = ctx.rng
+    boxes = {
+        box: [{"items": ctx.item_refs(1, 6)} for _ in range(ctx.count(1, 3))]
+        for box in rng.sample(["일반 상자", "고급 상자", "보스 상자", "숨겨진 상자"], rng.randint(1, 3))
+    }
+    return {
+        "name": name,
+        "extraname": rng.choice(["", "심층"]),
+        "description": ctx.text(),
+        "category": rng.choice(["유적", "동굴", "지하수로"]),
+        "floors": rng.randint(1, 10),
+        "dungeon_rank": rng.randint(1, 15),
+        "dungeon_exploration": rng.randint(1, 15),
+        "boarding_pass": rng.randint(0, 1),
+        "entrance": _json(ctx.ref("city")),
+        "requirements": _json(_requirements(ctx, "선행 발견/퀘스트", ctx.refs("quest", 0, 2))),
+        "discoveries": _json([{"discovery": ref} for ref in ctx.refs("discovery", 0, 8)]),
+        "acquisition_items": _json(boxes),
+    }
+
+
+def gen_privatefarm(ctx, obj_id, name):
+    rng = ctx.rng
+    products = {}
+    for kind in rng.sample(["농장", "목장", "공방", "양식장"], rng.randint(1, 3)):
+        products[kind] = [
+            {
+                "facility": f"{kind} {level}단계",
+                "items": [ctx.item_refs(1, 3) for _ in range(ctx.count(1, 3))],
+            }
+            for level in range(1, rng.randint(2, 5))
+        ]
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "region": _json(ctx.ref("region")),
+        "sea_area": _json(ctx.ref("sea")),
+        "facilities": _json(list(products)),
+        "products": _json(products),
+    }
+
+
+def gen_aide(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category": rng.choice(["항해사", "회계사", "포술장", "조리장"]),
+        "job": _json(ctx.refs("job", 1, 2)),
+        "nationality": _json(ctx.ref("nation")),
+        "gender": rng.choice(["남", "여"]),
+        "hiring_city": _json(ctx.refs("city", 0, 2)),
+        "max_required_levels": rng.randint(1, 80),
+        "max_required_traits": rng.randint(1, 10),
+        "skills": _json(ctx.refs("skill", 1, 5)),
+        "rescue_needed": rng.randint(0, 1),
+        "rescue_area": "",
+    }
+
+
+def gen_plain(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text()}
+
+
+def gen_scoped(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "scope": ctx.rng.choice(["자신", "함대", "도시"])}
+
+
+def gen_courtrank(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "level": rng.randint(1, 10),
+        "ottoman": "",
+        "royal_fleet_rank": "",
+        "fame": rng.randint(0, 500000),
+    }
+
+
+def gen_debatecombo(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category_info": _json({"category": rng.choice(["동물", "식물", "유적"]), "bonus": rng.randint(1, 50)}),
+        "total_points": rng.randint(10, 500),
+        "discovery_cards": _json(ctx.refs("discovery", 2, 6)),
+    }
+
+
+def gen_extraarmor(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "durability": rng.randint(10, 300),
+        "armor": rng.randint(1, 50),
+        "speed": -rng.randint(0, 10),
+        "features": "",
+    }
+
+
+def gen_figurehead(ctx, obj_id, name):
+    rng = ctx.rng
+    ret = _stats(ctx, ["durability", "disaster_protection", "fatigue_reduction", "crew_control", "shell_evasion"], 0, 50)
+    ret.update(name=name, use_effect=_json({"name": ctx.name_of(ctx.pick("itemeffect"))}))
+    return ret
+
+
+def gen_furniture(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "extraname": "",
+        "description": ctx.text(),
+        "category": rng.choice(["의자", "책상", "침대", "장식"]),
+        "installation_effect": _json({"type": ctx.name_of(ctx.pick("installationeffect")), "value": rng.randint(1, 10)}),
+    }
+
+
+def gen_gradebonus(ctx, obj_id, name):
+    return {
+        "name": name,
+        "category": ctx.rng.choice(_GRADES),
+        "performance_improvement": ctx.rng.randint(1, 30),
+        "ship_skill": ctx.name_of(ctx.pick("shipskill")),
+    }
+
+
+def gen_gradeperformance(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "ship_size": rng.choice(["소형", "중형", "대형"]),
+        "ship_type": rng.choice(["범선", "갤리선"]),
+        "grade": rng.randint(1, 10),
+        "accumulated_stats": _json(_stats(ctx, ["durability", "vertical_sail", "horizontal_sail"], 0, 40)),
+    }
+
+
+def gen_itemeffect(ctx, obj_id, name):
+    return {
+        "name": name,
+        "extraname": "",
+        "description": ctx.text(),
+        "category": ctx.rng.choice(["회복", "강화", "특수"]),
+        "skill": _json(_effect_refs(ctx, "skill", 0, 2)),
+    }
+
+
+def gen_legacytheme(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "requirements": _json(_requirements(ctx, "선행 발견/퀘스트", ctx.refs("quest", 0, 3))),
+    }
+
+
+def gen_legacy(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "theme": _json(ctx.ref("legacytheme")),
+        "destination": _json(ctx.ref("city")),
+        "rewards": _json({"sophia": rng.randint(0, 50), "items": ctx.item_refs(0, 4)}),
+        "recommended_clues": _json(ctx.refs("legacyclue", 0, 3)),
+        "requirements": _json(_requirements(ctx, "선행 발견/퀘스트", ctx.refs("quest", 0, 2))),
+    }
+
+
+def gen_legacyclue(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "theme": _json(ctx.ref("legacytheme")),
+        "acquisition_method": rng.choice(["퀘스트", "조사", "교환"]),
+        "acquisition_method_detail": ctx.text(4),
+    }
+
+
+def gen_major(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category": ctx.rng.choice(["인문", "자연", "예술"]),
+        "acquisition_conditions": _json({"level": ctx.rng.randint(1, 80), "quest": ctx.ref("quest")}),
+    }
+
+
+def gen_memorialalbum(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category": ctx.rng.choice(["발견", "교역", "전투", "이벤트"]),
+        "reward_npc": _json(ctx.ref("citynpc")),
+        "reward_item": _json(ctx.item_refs(0, 2)),
+        "items": _json(ctx.refs("discovery", 3, 12)),
+    }
+
+
+def gen_ornament(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "acquisition": rng.choice(["제작", "교환", "퀘스트"]),
+        "crafter": ctx.name_of(ctx.pick("citynpc")),
+        "discovery_card": _json(ctx.refs("discovery", 0, 3)),
+        "installation_effect": _json(ctx.refs("installationeffect", 0, 2)),
+        "city": _json(ctx.ref("city")),
+        "cost": _json({"ducat": rng.randint(1000, 10**6)}),
+    }
+
+
+def gen_pet(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "extraname": "",
+        "description": ctx.text(),
+        "apartment_rank": rng.randint(1, 5),
+        "certificate": _json(ctx.ref("certificate")),
+        "feed": _json(ctx.item_refs(1, 3)),
+        "skills": _json(ctx.refs("skill", 0, 3)),
+    }
+
+
+def gen_portpermit(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "quests_select_one": _json(ctx.refs("quest", 1, 3)),
+        "fame_per_nation": _json({ctx.name_of(n): ctx.rng.randint(0, 10000) for n in ctx.sample("nation", 1, 4)}),
+    }
+
+
+def gen_protection(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "effect": ctx.text(5)}
+
+
+def gen_relic(ctx, obj_id, name):
+    return {
+        "name": name,
+        "extraname": "",
+        "description": ctx.text(),
+        "theme": _json(ctx.ref("treasurehunttheme")),
+        "relic_pieces": _json([{"relic_piece": ref} for ref in ctx.refs("relicpiece", 1, 6)]),
+        "adventure_log": ctx.text(6),
+    }
+
+
+def gen_relicpiece(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "theme": _json(ctx.ref("treasurehunttheme")),
+        "piece_rank": ctx.rng.randint(1, 10),
+        "quest": _json(ctx.ref("quest")) if ctx.rng.random() < 0.7 else None,
+    }
+
+
+def gen_research(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "category": rng.choice(["인문", "자연", "예술"]),
+        "building_level": rng.randint(1, 10),
+        "major": _json(ctx.ref("major")),
+        "job": _json(ctx.ref("job")),
+        "required_pages": rng.randint(10, 500),
+        "research_actions": _json(ctx.refs("researchaction", 1, 4)),
+        "rewards": _json(ctx.item_refs(0, 3)),
+    }
+
+
+def gen_researchaction(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "category": ctx.rng.choice(["조사", "분석", "토론"])}
+
+
+def gen_sailorequipment(ctx, obj_id, name):
+    ret = _stats(ctx, ["durability", "vertical_sail", "horizontal_sail", "wave_resistance", "armor", "maneuverability"], 0, 30)
+    ret.update(name=name, equipment_effect=ctx.text(4))
+    return ret
+
+
+def gen_shipbasematerial(ctx, obj_id, name):
+    ret = _stats(ctx, ["durability", "vertical_sail", "horizontal_sail"], 0, 30)
+    ret.update(name=name, description=ctx.text(), normal_build=ctx.rng.randint(0, 1))
+    return ret
+
+
+def gen_shipdecor(ctx, obj_id, name):
+    rng = ctx.rng
+    positions = {
+        key: rng.random() < 0.5
+        for key in ["flag", "side_front_right", "side_front_left", "side_rear_right", "side_rear_left"]
+    }
+    return {"name": name, "extraname": "", "description": ctx.text(), "positions": _json(positions)}
+
+
+def gen_shipmaterial(ctx, obj_id, name):
+    ret = _stats(
+        ctx,
+        ["durability", "vertical_sail", "horizontal_sail", "rowing_power", "maneuverability",
+         "wave_resistance", "armor", "cabin", "gunport", "cargo"],
+        -10, 30,
+    )
+    ret.update(
+        name=name,
+        extraname="",
+        base_ship_material=_json(ctx.ref("shipbasematerial")),
+        features=_json([ctx.text(3)]),
+    )
+    return ret
+
+
+def gen_shipskill(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "action_points": rng.randint(0, 30),
+        "apply_range": rng.choice(["자신", "함대"]),
+        "required_skill": _json(ctx.refs("skill", 0, 2)),
+        "dedicated_skill": _json(ctx.refs("skill", 0, 1)),
+    }
+
+
+def gen_skillrefinementeffect(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "action_power": str(ctx.rng.randint(0, 10))}
+
+
+def gen_cannon(ctx, obj_id, name):
+    rng = ctx.rng
+    ret = _stats(ctx, ["durability", "penetration", "shoot_range", "shell_speed", "blast_radius", "reload_speed"], 1, 100)
+    ret.update(name=name, category=rng.choice(["컬버린", "카로네이드", "박격포"]), shell_type=rng.choice(["구형탄", "쇄탄", "유탄"]))
+    return ret
+
+
+def gen_specialequipment(ctx, obj_id, name):
+    ret = _stats(
+        ctx,
+        ["durability", "vertical_sail", "horizontal_sail", "melee_support", "ballistic_defense", "fire_resistance",
+         "firepower", "shoot_range", "shoot_area", "cooling_speed", "ramming", "proximity_effect"],
+        0, 30,
+    )
+    ret.update(name=name, effect=ctx.text(4))
+    return ret
+
+
+def gen_studdingsail(ctx, obj_id, name):
+    ret = _stats(ctx, ["durability", "vertical_sail", "horizontal_sail", "maneuverability"], 0, 30)
+    ret.update(name=name, category=ctx.rng.choice(["횡범", "종범"]), features="")
+    return ret
+
+
+def gen_tarotcard(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "effect": ctx.text(5), "summary": ctx.text(3)}
+
+
+def gen_technique(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "extraname": "",
+        "description": ctx.text(),
+        "technique_type": rng.choice(["공격", "방어", "보조"]),
+        "weapon_type": rng.choice(["검", "총", "격투"]),
+        "rank": rng.randint(1, 10),
+        "gauge_cost": rng.randint(0, 100),
+        "hitrange": rng.randint(1, 5),
+        "area": rng.randint(1, 5),
+        "requirements": _json({"skill": ctx.ref("skill"), "rank": rng.randint(1, 15)}),
+        "effect": _json({"damage": rng.randint(10, 300)}),
+    }
+
+
+def gen_title(ctx, obj_id, name):
+    return {"name": name, "description": ctx.text(), "requirements": ctx.text(5), "effect": ctx.text(3) + "\n" + ctx.text(3)}
+
+
+def gen_transmutation(ctx, obj_id, name):
+    rng = ctx.rng
+    return {
+        "name": name,
+        "extraname": "",
+        "description": ctx.text(),
+        "base_material": _json(ctx.item_refs(1, 1)),
+        "policy": rng.choice(["", "무작위"]),
+        "requirements": _json(
+            _requirements(ctx, "스킬", ctx.refs("skill", 1, 2))
+            + _requirements(ctx, "재료", ctx.item_refs(1, 3))
+        ),
+        "products": _json([{"product": ref, "quantity": rng.randint(1, 5)} for ref in ctx.item_refs(1, 3)]),
+    }
+
+
+def gen_treasurehunttheme(ctx, obj_id, name):
+    return {
+        "name": name,
+        "description": ctx.text(),
+        "theme_rank": ctx.rng.randint(1, 10),
+        "requirements": _json(_requirements(ctx, "역사적 사건", ctx.text(3))),
+    }
+
+
+# (table, allData category, rows at scale 1, name kind, generator). ids are handed
+# out in this order, generators run after every pool exists so cross references
+# resolve in both directions
+TABLES = [
+    ("region", "region", 40, "place", None),
+    ("nation", "nation", 12, "place", gen_nation),
+    ("culture", "culture", 40, "place", gen_culture),
+    ("sea", "sea", 150, "place", gen_sea),
+    ("city", "city", 450, "place", gen_city),
+    ("field", "field", 350, "place", gen_field),
+    ("skill", "skill", 300, "thing", gen_skill),
+    ("skillrefinementeffect", "skillrefinementeffect", 120, "thing", gen_skillrefinementeffect),
+    ("discovery", "discovery", 4500, "thing", gen_discovery),
+    ("quest", "quest", 6000, "thing", gen_quest),
+    ("consumable", "consumable", 1500, "item", gen_consumable),
+    ("equipment", "equipment", 3000, "item", gen_equipment),
+    ("tradegoods", "tradegoods", 1200, "item", gen_tradegoods),
+    ("recipebook", "recipebook", 600, "item", gen_recipebook),
+    ("recipe", "recipe", 6000, "item", gen_recipe),
+    ("ship", "ship", 700, "thing", gen_ship),
+    ("shipwreck", "shipwreck", 250, "place", gen_shipwreck),
+    ("treasuremap", "treasuremap", 1500, "thing", gen_treasuremap),
+    ("treasurebox", "treasurebox", 120, "thing", gen_treasurebox),
+    ("npcsale", "sellernpc", 1500, "person", gen_npcsale),
+    ("job", "job", 80, "person", gen_job),
+    ("certificate", "certificate", 120, "item", gen_certificate),
+    ("landnpc", "landnpc", 500, "person", gen_landnpc),
+    ("marinenpc", "marinenpc", 400, "person", gen_marinenpc),
+    ("citynpc", "citynpc", 1500, "person", gen_citynpc),
+    ("ganador", "ganador", 100, "place", gen_ganador),
+    ("dungeon", "dungeon", 60, "place", gen_dungeon),
+    ("privatefarm", "privatefarm", 30, "place", gen_privatefarm),
+    ("aide", "aide", 300, "person", gen_aide),
+    ("courtrank", "courtrank", 20, "thing", gen_courtrank),
+    ("crest", "crest", 200, "item", gen_plain),
+    ("debatecombo", "debatecombo", 200, "thing", gen_debatecombo),
+    ("equippedeffect", "equippedeffect", 300, "thing", gen_scoped),
+    ("installationeffect", "installationeffect", 100, "thing", gen_scoped),
+    ("extraarmor", "extraarmor", 100, "item", gen_extraarmor),
+    ("figurehead", "figurehead", 150, "item", gen_figurehead),
+    ("furniture", "furniture", 400, "item", gen_furniture),
+    ("gradebonus", "gradebonus", 100, "thing", gen_gradebonus),
+    ("gradeperformance", "gradeperformance", 200, "thing", gen_gradeperformance),
+    ("itemeffect", "itemeffect", 200, "thing", gen_itemeffect),
+    ("legacytheme", "legacytheme", 30, "thing", gen_legacytheme),
+    ("legacy", "legacy", 300, "thing", gen_legacy),
+    ("legacyclue", "legacyclue", 600, "thing", gen_legacyclue),
+    ("major", "major", 20, "thing", gen_major),
+    ("memorialalbum", "memorialalbum", 100, "thing", gen_memorialalbum),
+    ("ornament", "ornament", 300, "item", gen_ornament),
+    ("pet", "pet", 100, "person", gen_pet),
+    ("portpermit", "portpermit", 40, "item", gen_portpermit),
+    ("protection", "protection", 50, "thing", gen_protection),
+    ("relic", "relic", 150, "thing", gen_relic),
+    ("relicpiece", "relicpiece", 600, "thing", gen_relicpiece),
+    ("research", "research", 200, "thing", gen_research),
+    ("researchaction", "researchaction", 100, "thing", gen_researchaction),
+    ("sailorequipment", "sailorequipment", 100, "item", gen_sailorequipment),
+    ("shipbasematerial", "shipbasematerial", 40, "item", gen_shipbasematerial),
+    ("shipdecor", "shipdecor", 200, "item", gen_shipdecor),
+    ("shipmaterial", "shipmaterial", 300, "item", gen_shipmaterial),
+    ("shipskill", "shipskill", 200, "thing", gen_shipskill),
+    ("cannon", "cannon", 200, "item", gen_cannon),
+    ("specialequipment", "specialequipment", 100, "item", gen_specialequipment),
+    ("studdingsail", "studdingsail", 150, "item", gen_studdingsail),
+    ("tarotcard", "tarotcard", 80, "thing", gen_tarotcard),
+    ("technique", "technique", 200, "thing", gen_technique),
+    ("title", "title", 300, "thing", gen_title),
+    ("transmutation", "transmutation", 300, "item", gen_transmutation),
+    ("treasurehunttheme", "treasurehunttheme", 60, "thing", gen_treasurehunttheme),
+]
+
+# one row per (id, item) in these, so id is not unique
+MULTI_ROW_TABLES = {"npcsale", "treasurebox"}
+
+# game enumerations that do not grow with the rest of the data
+FIXED_SIZE = {"region", "nation", "major", "courtrank"}
+
+
+def _column_type(values) -> str:
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool) or isinstance(value, int):
+            return "INTEGER"
+        if isinstance(value, float):
+            return "REAL"
+        return "TEXT"
+    return "TEXT"
+
+
+def _write_table(conn, table, rows, primary_key: bool, batch_size: int = 5000):
+    """
+    create the table from the columns of the first batch and insert rows batch by
+    batch, so 100x tables never sit in memory whole. returns the row count
+    """
+    batch = list(itertools.islice(rows, batch_size))
+    columns = ["id"] + [c for c in batch[0] if c != "id"]
+    definitions = []
+    for column in columns:
+        if column == "id":
+            definitions.append('"id" INTEGER PRIMARY KEY' if primary_key else '"id" INTEGER')
+        else:
+            definitions.append(f'"{column}" {_column_type(row.get(column) for row in batch[:50])}')
+    conn.execute(f'CREATE TABLE "{table}" ({", ".join(definitions)})')
+    placeholders = ", ".join("?" for _ in columns)
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    insert = f'INSERT INTO "{table}" ({quoted}) VALUES ({placeholders})'
+    total = 0
+    while batch:
+        conn.executemany(insert, [[row.get(c) for c in columns] for row in batch])
+        total += len(batch)
+        batch = list(itertools.islice(rows, batch_size))
+    return total
+
+
+def _rows(ctx, category, generator):
+    for obj_id in ctx.ids[category]:
+        generated = generator(ctx, obj_id, ctx.name_of(obj_id))
+        if isinstance(generated, list):
+            for row in generated:
+                yield dict(row, id=obj_id)
+        else:
+            yield dict(generated, id=obj_id)
+
+
+def table_counts(scale: int):
+    return {
+        table: count if table in FIXED_SIZE else count * scale
+        for table, _, count, _, _ in TABLES
+    }
+
+
+def generate(path: str, scale: int = 1, seed: int = 0, primary_keys: bool = True, log=print):
+    """
+    write the synthetic database to path, replacing any existing file.
+    returns {table: row count}
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    ctx = Context(seed, scale)
+    counts = table_counts(scale)
+
+    # pass 1: ids and names for every object, so generators can reference any table
+    next_id = FIRST_ID
+    categories = []
+    for table, category, _, kind, _ in TABLES:
+        ids = range(next_id, next_id + counts[table])
+        next_id += counts[table]
+        ctx.ids[category] = ids
+        ctx.names.extend(ctx.name(kind) for _ in ids)
+        categories.append((ids, category))
+    all_data = (
+        (obj_id, ctx.name_of(obj_id), category)
+        for ids, category in categories
+        for obj_id in ids
+    )
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    ret = {}
+    try:
+        conn.execute('CREATE TABLE "allData" ("id" INTEGER PRIMARY KEY, "name" TEXT, "category" TEXT)')
+        conn.executemany("INSERT INTO allData (id, name, category) VALUES (?, ?, ?)", all_data)
+        ret["allData"] = len(ctx.names)
+
+        # pass 2: rows
+        for table, category, _, _, generator in TABLES:
+            if generator is None:
+                continue
+            started = time.perf_counter()
+            multi_row = table in MULTI_ROW_TABLES
+            rows = _rows(ctx, category, generator)
+            count = _write_table(conn, table, rows, primary_keys and not multi_row)
+            conn.commit()
+            ret[table] = count
+            log(f"{table:<24} {count:>9} rows  {time.perf_counter() - started:6.2f}s")
+    finally:
+        conn.close()
+    return ret
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, choices=SCALES, help="row count multiplier")
+    parser.add_argument("--out", default="dhoDatabase.synthetic.sqlite3", help="output path")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, same seed gives the same file")
+    parser.add_argument(
+        "--no-primary-keys",
+        action="store_true",
+        help="create id as a plain column, like a bare spreadsheet import",
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = generate(args.out, args.scale, args.seed, not args.no_primary_keys)
+    print(
+        f"wrote {args.out}: {len(counts)} tables, {sum(counts.values())} rows "
+        f"in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
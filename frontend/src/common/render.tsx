@@ -2,6 +2,7 @@ import "./render.css";
 // import mui chip
 import {Paper, Chip, Table,TableContainer, TableBody, TableCell, TableRow } from "@mui/material";
 import { useNavigate } from "react-router-dom";
+import type { HTMLAttributes, Key } from "react";
 
 type NavigateFunction = ReturnType<typeof useNavigate>;
 // create function that will take in array of json object with field (ref, name, value) and return mui chip array
@@ -128,3 +129,17 @@ export function renderObjectChip(
     />
   );
 }
+
+// autocomplete option with its match count, from the facets of a list response (?facet_counts=true)
+export function renderFacetOption(
+  props: HTMLAttributes<HTMLLIElement> & { key?: Key },
+  label: string,
+  counts?: Record<string, number>
+) {
+  const { key, ...rest } = props;
+  return (
+    <li key={key} {...rest}>
+      {counts && label in counts ? `${label} (${counts[label]})` : label}
+    </li>
+  );
+}
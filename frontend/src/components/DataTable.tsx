@@ -1,4 +1,4 @@
-import React from "react";
+import React, { useMemo } from "react";
 import {
   Table,
   TableBody,
@@ -20,9 +20,16 @@ interface Column {
   format?: (value: any) => React.ReactNode;
 }
 
+// list endpoints answer ?format=columnar with the column names once and one
+// array per row, instead of one object per row
+export interface ColumnarData {
+  columns: string[];
+  rows: any[][];
+}
+
 interface DataTableProps {
   columns: Column[];
-  data: any[];
+  data: any[] | ColumnarData;
   loading?: boolean;
   total?: number;
   page: number;
@@ -49,6 +56,25 @@ const DataTable: React.FC<DataTableProps> = ({
   sortDirection,
   onSortChange,
 }) => {
+  const columnar = Array.isArray(data) ? null : data;
+  const rows: any[] = columnar ? columnar.rows : (data as any[]);
+  const columnIndex = useMemo(() => {
+    const index: Record<string, number> = {};
+    columnar?.columns.forEach((name, i) => {
+      index[name] = i;
+    });
+    return index;
+  }, [columnar]);
+
+  const cellValue = (row: any, id: string) =>
+    columnar ? (id in columnIndex ? row[columnIndex[id]] : undefined) : row[id];
+
+  // row clicks get the row as an object either way
+  const rowObject = (row: any) =>
+    columnar
+      ? Object.fromEntries(columnar.columns.map((name, i) => [name, row[i]]))
+      : row;
+
   const handleChangePage = (_event: unknown, newPage: number) => {
     onPageChange(newPage);
   };
@@ -120,16 +146,16 @@ const DataTable: React.FC<DataTableProps> = ({
               </TableRow>
             </TableHead>
             <TableBody>
-              {data.map((row, index) => (
+              {rows.map((row, index) => (
                 <TableRow
                   hover
                   tabIndex={-1}
                   key={index}
-                  onClick={() => onRowClick?.(row)}
+                  onClick={() => onRowClick?.(rowObject(row))}
                   sx={{ cursor: onRowClick ? "pointer" : "default" }}
                 >
                   {columns.map((column, index) => {
-                    const value = row[column.id];
+                    const value = cellValue(row, column.id);
                     let isSticky = index === 0;
                     return (
                       <TableCell
@@ -10,6 +10,7 @@ import {
   Chip,
 } from "@mui/material";
 import DataTable from "../../components/DataTable";
+import { renderFacetOption } from "../../common/render";
 import api from "../../api";
 import {
   SHIP_PURPOSE_ARRAY,
@@ -118,16 +119,22 @@ const Ships: React.FC = () => {
           sort_order,
           skip: page * rowsPerPage,
           limit: rowsPerPage,
+          format: "columnar",
+          facet_counts: true,
         },
       });
-      console.log(response.data);
-      const processedItems = response.data.items.map((item: any) => {
-        if (item.extraname) {
-          return { ...item, name: `${item.name} ${item.extraname}` };
+      const { columns, rows } = response.data;
+      const nameIndex = columns.indexOf("name");
+      const extranameIndex = columns.indexOf("extraname");
+      const processedRows = rows.map((row: any[]) => {
+        if (row[extranameIndex]) {
+          const processed = [...row];
+          processed[nameIndex] = `${row[nameIndex]} ${row[extranameIndex]}`;
+          return processed;
         }
-        return item;
+        return row;
       });
-      return { ...response.data, items: processedItems };
+      return { ...response.data, rows: processedRows };
     },
   });
 
@@ -353,6 +360,9 @@ const Ships: React.FC = () => {
           id="purpose-filter"
           options={SHIP_PURPOSE_ARRAY}
           getOptionLabel={(option) => option.name}
+          renderOption={(props, option) =>
+            renderFacetOption(props, option.name, data?.facets?.purpose_search)
+          }
           value={purposeSearch}
           onChange={(_, newValue) => setPurposeSearch(newValue)}
           renderInput={(params) => (
@@ -378,6 +388,9 @@ const Ships: React.FC = () => {
           id="size-filter"
           options={SHIP_SIZE_ARRAY}
           getOptionLabel={(option) => option.name}
+          renderOption={(props, option) =>
+            renderFacetOption(props, option.name, data?.facets?.size_search)
+          }
           value={sizeSearch}
           onChange={(_, newValue) => setSizeSearch(newValue)}
           renderInput={(params) => (
@@ -403,6 +416,9 @@ const Ships: React.FC = () => {
           id="propulsion-filter"
           options={SHIP_PROPULSION_ARRAY}
           getOptionLabel={(option) => option.name}
+          renderOption={(props, option) =>
+            renderFacetOption(props, option.name, data?.facets?.propulsion_search)
+          }
           value={propulsionSearch}
           onChange={(_, newValue) => setPropulsionSearch(newValue)}
           renderInput={(params) => (
@@ -448,7 +464,7 @@ const Ships: React.FC = () => {
 
       <DataTable
         columns={columns}
-        data={data?.items || []}
+        data={data || []}
         loading={isLoading}
         total={data?.total || 0}
         page={page}
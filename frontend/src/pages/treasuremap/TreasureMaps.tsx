@@ -10,6 +10,7 @@ import {
   Autocomplete,
 } from "@mui/material";
 import DataTable from "../../components/DataTable";
+import { renderFacetOption } from "../../common/render";
 import api from "../../api";
 import {
   TREASUREMAP_CATEGORY_ARRAY,
@@ -110,6 +111,7 @@ const TreasureMaps: React.FC = () => {
           sort_order,
           skip: page * rowsPerPage,
           limit: rowsPerPage,
+          facet_counts: true,
         },
       });
       return response.data; // Expecting { items: [], total: 0 }
@@ -210,6 +212,9 @@ const TreasureMaps: React.FC = () => {
           id="category-filter"
           options={sampleCategories}
           // getOptionLabel={(option) => option.name}
+          renderOption={(props, option) =>
+            renderFacetOption(props, option, data?.facets?.category_search)
+          }
           value={categorySearch}
           onChange={handleCategoryChange}
           renderInput={(params) => (
@@ -225,6 +230,9 @@ const TreasureMaps: React.FC = () => {
           id="academic-field-filter"
           options={sampleAcademicFields}
           // getOptionLabel={(option) => option.name}
+          renderOption={(props, option) =>
+            renderFacetOption(props, option, data?.facets?.academic_field_search)
+          }
           value={academicFieldSearch}
           onChange={handleAcademicFieldChange}
           renderInput={(params) => (
@@ -241,6 +249,9 @@ const TreasureMaps: React.FC = () => {
           id="library-filter"
           options={sampleLibraries}
           // getOptionLabel={(option) => option.name}
+          renderOption={(props, option) =>
+            renderFacetOption(props, option, data?.facets?.library_search)
+          }
           value={librarySearch}
           onChange={handleLibraryChange}
           renderInput={(params) => (